@@ -1,12 +1,16 @@
 # ai_logic.py
-import re
 import json
-import requests
-from concurrent.futures import Future
+from concurrent.futures import Future, CancelledError
 from sentence_transformers import SentenceTransformer
 import faiss
 import numpy as np
 import time
+from datetime import datetime
+from functools import lru_cache
+from ollama_client import OllamaClient
+from llm_backend import OllamaBackend, GeminiBackend, SlotStream
+from conversation_history import estimate_tokens, messages_tokens, clip_text
+from streaming_json import IncrementalJSONParser, extract_json_object
 
 
 # --- Embedding and RAG Components ---
@@ -21,73 +25,103 @@ def load_embedding_model(log_callback):
         except Exception as e:
             log_callback(f"FATAL: Could not load embedding model. Error: {e}", "ERROR")
 
+# --- Ollama Client (one pooled keep-alive session for every call) ---
+OLLAMA_CLIENT = None
+def get_ollama_client(app):
+    global OLLAMA_CLIENT
+    if OLLAMA_CLIENT is None:
+        OLLAMA_CLIENT = OllamaClient(app.config.get("ollama", {}), app.queue_log)
+    else:
+        OLLAMA_CLIENT.configure(app.config.get("ollama", {}))
+    return OLLAMA_CLIENT
+
+# --- LLM backends (one per engine, each with its own request scheduler) ---
+BACKENDS = {}
+def get_backend(app, ai_engine=None):
+    """The backend for an engine ("ollama_offline" or "gemini_online"); defaults to config['ai_engine']."""
+    ai_engine = ai_engine or app.config.get("ai_engine", "gemini_online")
+    if ai_engine != "ollama_offline":
+        ai_engine = "gemini_online"
+    backend = BACKENDS.get(ai_engine)
+    if backend is None:
+        backend = OllamaBackend(app, get_ollama_client(app)) if ai_engine == "ollama_offline" else GeminiBackend(app)
+        BACKENDS[ai_engine] = backend
+    else:
+        if ai_engine == "ollama_offline": get_ollama_client(app)  # Applies changed client settings
+        backend.configure()
+    return backend
+
+def backend_stats_lines():
+    return [backend.stats_line() for backend in BACKENDS.values()]
+
 # --- AI Communication Helper Functions ---
+def log_prompt_size(app, label, system_prompt, history, user_message):
+    """Logs the estimated token size of a prompt, split by part, for tuning the history budgets."""
+    system_tokens, history_tokens, user_tokens = estimate_tokens(system_prompt), messages_tokens(history), estimate_tokens(user_message)
+    app.queue_log(f"{label} prompt: ~{system_tokens + history_tokens + user_tokens} tokens "
+                  f"(system {system_tokens}, history {history_tokens} in {len(history)} messages, request {user_tokens}).")
+
 def _extract_json_from_response(text):
-    """Finds and parses the first valid JSON object embedded in a string."""
-    json_match = re.search(r'\{.*\}', text, re.DOTALL)
-    if json_match:
-        json_string = json_match.group(0)
-        try: return json.loads(json_string)
-        except json.JSONDecodeError: return None
-    return None
-
-def get_ollama_streaming_response(app, prompt, model_name):
-    """A generic utility to get a streaming response from an Ollama model."""
+    """Finds and parses the first JSON object embedded in a string, repairing it if truncated."""
+    return extract_json_object(text or "")
+
+def get_ollama_streaming_response(app, prompt, model_name, cancel_group="interactive"):
+    """
+    A generic utility to get a streaming response from an Ollama model.
+    Requests in the "interactive" group are cut off mid-stream by the stop button.
+    """
     try:
-        url = "http://localhost:11434/api/generate"
+        backend = get_backend(app, "ollama_offline")
         payload = {"model": model_name, "prompt": prompt, "stream": True, "options": {"temperature": 0.6}}
-        
-        def generator():
-            with requests.post(url, json=payload, stream=True, timeout=120) as response:
-                response.raise_for_status()
-                for line in response.iter_lines():
-                    if line:
-                        yield json.loads(line).get("response", "")
-        return generator()
+        return backend.stream("/api/generate", payload, group=cancel_group, transform=lambda chunk: chunk.get("response", ""))
 
     except Exception as e:
         app.queue_log(f"Ollama Request Error: {e}", "ERROR")
-        return iter([]) # Return an empty iterator on failure
+        return SlotStream(()) # Return an empty stream on failure
     
 
-def get_ollama_chat_response(app, messages, model_name, temperature=0.7, output_format=None):
+def get_ollama_chat_stream(app, messages, model_name, temperature=0.6, cancel_group="interactive"):
+    """Streams the assistant's reply from /api/chat, yielding text chunks."""
+    try:
+        return get_backend(app, "ollama_offline").chat_stream(messages, model_name, temperature, group=cancel_group)
+    except Exception as e:
+        app.queue_log(f"Ollama Request Error: {e}", "ERROR")
+        return SlotStream(())
+
+def get_ollama_chat_response(app, messages, model_name, temperature=0.7, output_format=None, cancel_group="interactive"):
     """
     A generic utility to get a response from an Ollama chat model.
     Supports forcing JSON output and adjusting temperature.
     """
-    url = "http://localhost:11434/api/chat"
-    
-    payload = {
-        "model": model_name,
-        "messages": messages,
-        "stream": False, 
-        "options": {"temperature": temperature}
-    }
-
-    if output_format:
-        payload["format"] = output_format
-
     try:
-        with requests.post(url, json=payload, stream=False, timeout=120) as response:
-            response.raise_for_status()
-            content = response.json().get("message", {}).get("content", "")
-            return content
+        return get_backend(app, "ollama_offline").chat(messages, model_name, temperature, output_format, group=cancel_group)
+    except CancelledError:
+        app.queue_log(f"Ollama request to {model_name} cancelled.")
+        return None
     except Exception as e:
         app.queue_log(f"Ollama Request Error: {e}", "ERROR")
         return None
 
 
 
-# --- Main AI Logic Entry Point ---
-def get_tool_decision(app, history, user_prompt, model_name, available_tools):
+# --- Router prompt: compact tool list, built once per tool subset ---
+def _router_prompt_key(available_tools):
+    """Hashable (name, description, params) view of a tool list, used as the prompt cache key."""
+    return tuple(
+        (tool["name"], tool["description"], tuple(tool.get("parameters", {}).get("properties", {})))
+        for tool in available_tools
+    )
+
+@lru_cache(maxsize=64)
+def _build_router_system_prompt(tool_key):
     """
-    Calls a specialized AI model (the Router) to decide which tool to use.
-    It returns a structured JSON object with the decision.
+    Router system prompt for one tool subset. Tools are listed one per line as
+    `name(params): description` (every parameter is a required string) instead of indented
+    JSON schemas. The user's request is sent as its own message, so the prompt is identical
+    for every request with this subset.
     """
-    log = app.queue_log
-    
-    # --- MODIFIED PROMPT ---
-    system_prompt = f"""You are a highly specialized AI that routes a user's request to the correct tool. Your ONLY job is to respond with a JSON object. Do not add any other text.
+    tool_lines = "\n".join(f"- {name}({', '.join(params)}): {description}" for name, description, params in tool_key)
+    return f"""You are a highly specialized AI that routes a user's request to the correct tool. Your ONLY job is to respond with a JSON object. Do not add any other text.
 
 Your JSON response MUST contain two keys: 'tool_name' and 'parameters'.
 
@@ -95,15 +129,28 @@ Your JSON response MUST contain two keys: 'tool_name' and 'parameters'.
 2.  If it matches a tool, provide the tool's name in the 'tool_name' field and extract any necessary arguments into the 'parameters' field.
 3.  If the request is general conversation (e.g., "hello", "thank you") or does not match any tool, you MUST set the 'tool_name' field to null.
 
-# AVAILABLE TOOLS:
-{json.dumps(available_tools, indent=2)}
-
-# User's Request:
-{user_prompt}
+# AVAILABLE TOOLS (name(parameters): description):
+{tool_lines}
 
 # RESPONSE (JSON only):
 """
-    # --- END MODIFIED PROMPT ---
+
+def get_router_system_prompt(available_tools):
+    return _build_router_system_prompt(_router_prompt_key(available_tools))
+
+# --- Main AI Logic Entry Point ---
+def get_tool_decision(app, history, user_prompt, model_name, available_tools, on_tool_name=None):
+    """
+    Calls a specialized AI model (the Router) to decide which tool to use.
+    Returns (decision, complete): the structured JSON decision, and whether the Router sent the
+    whole object. A truncated reply is only used if every value in it arrived in full (just the
+    closing brace is missing); it is never complete, so callers shouldn't cache it.
+    The reply is streamed and parsed as it arrives: on_tool_name(name) is called as soon as the
+    tool name is known (so the skill can warm up while the parameters stream), and the stream is
+    closed the moment the JSON object is complete instead of waiting for the model to stop.
+    """
+    log = app.queue_log
+    system_prompt = get_router_system_prompt(available_tools)
 
     messages = [
         {"role": "system", "content": system_prompt}
@@ -113,91 +160,305 @@ Your JSON response MUST contain two keys: 'tool_name' and 'parameters'.
     messages.append({"role": "user", "content": user_prompt})
 
     log(f"Asking Router AI ({model_name}) for a tool decision...")
+    log_prompt_size(app, "Router", system_prompt, history, user_prompt)
     
-    raw_decision_response = get_ollama_chat_response(app, messages, model_name, temperature=0.0, output_format="json")
-
+    parser = IncrementalJSONParser()
+    start_time = time.perf_counter()
+    announced = False
+    raw_chunks = []
     try:
-        decision = json.loads(raw_decision_response)
-        # --- ADDED VALIDATION ---
-        if 'tool_name' not in decision or 'parameters' not in decision:
-            log(f"Router AI response is missing required keys. Response: {decision}", "WARNING")
-            return {"tool_name": None, "parameters": {}}
-        # --- END VALIDATION ---
-        log(f"Router AI decided: {decision}")
-        return decision
-    except (json.JSONDecodeError, TypeError):
-        log(f"Could not decode JSON from Router AI. Raw response: '{raw_decision_response}'", "ERROR")
+        # Leaving the block closes the stream: that drops the connection, so Ollama stops generating trailing tokens.
+        with get_backend(app, "ollama_offline").chat_stream(messages, model_name, 0.0, output_format="json", group="interactive") as chunks:
+            for chunk in chunks:
+                raw_chunks.append(chunk)
+                complete = parser.feed(chunk)
+                if not announced and parser.fields.get("tool_name"):
+                    announced = True
+                    log(f"Router AI named '{parser.fields['tool_name']}' after {(time.perf_counter() - start_time) * 1000:.0f} ms.")
+                    if on_tool_name:
+                        on_tool_name(parser.fields["tool_name"])
+                if complete:
+                    log(f"Router AI JSON complete after {(time.perf_counter() - start_time) * 1000:.0f} ms; closing the stream.")
+                    break
+    except CancelledError:
+        log(f"Router AI request to {model_name} cancelled.")
+        return {"tool_name": None, "parameters": {}}, False
+    except Exception as e:
+        log(f"Ollama Request Error: {e}", "ERROR")
+        return {"tool_name": None, "parameters": {}}, False
+
+    decision = parser.result()
+    if not isinstance(decision, dict):
+        log(f"Could not decode JSON from Router AI. Raw response: '{''.join(raw_chunks)}'", "ERROR")
+        return {"tool_name": None, "parameters": {}}, False
+    if not parser.done:
+        cut_off = [key for key in decision if key not in parser.complete_keys]
+        if cut_off:
+            # Repairing closed a value mid-way (e.g. a query cut off mid-word); don't act on it.
+            log(f"Router AI response was truncated inside {', '.join(map(str, cut_off))}; ignoring it. "
+                f"Raw response: '{''.join(raw_chunks)}'", "WARNING")
+            return {"tool_name": None, "parameters": {}}, False
+        log(f"Router AI response was truncated after its last value; repaired to: {decision}", "WARNING")
+    if 'tool_name' not in decision:
+        log(f"Router AI response is missing required keys. Response: {decision}", "WARNING")
+        return {"tool_name": None, "parameters": {}}, False
+    if not isinstance(decision.get('parameters'), dict):
+        decision['parameters'] = {}
+    log(f"Router AI decided: {decision}")
+    return decision, parser.done
 
-        return {"tool_name": None, "parameters": {}}
 
+# --- Chat prompt: one byte-stable system prompt for every turn, tool or not ---
+CHAT_SYSTEM_PROMPT = (
+    "You are AURA, a helpful and friendly AI assistant. Give direct, conversational responses. "
+    "When a message starts with 'Information:', a tool has provided it: use it to directly and "
+    "concisely answer the original question, and do not mention the tool."
+)
 
-def get_conversational_response_stream(app, history, user_prompt, model_name, tool_output=None):
+def build_chat_user_message(user_prompt, tool_output=None):
+    """The user turn as sent to the Chat model. Store this in history so later prompts match byte for byte."""
+    if tool_output:
+        return f"Information: '{tool_output}'\n\nOriginal Question: '{user_prompt}'"
+    return user_prompt
+
+def get_conversational_response_stream(app, history, user_prompt, model_name, tool_output=None, cancel_group="interactive"):
     """
-    Generates a natural, streaming response using the Chat model.
-    It now correctly includes conversation history for context.
+    Generates a natural, streaming response using the Chat model via /api/chat.
+    The system prompt never changes and history is sent exactly as it was sent on earlier
+    turns, so Ollama can reuse its cached prompt and only evaluate the new message.
     """
     log = app.queue_log
-    
-    # --- PROMPT CONSTRUCTION LOGIC ---
     if tool_output:
-        # If a tool was used, the prompt is about synthesizing the result
-        system_prompt = "You are AURA, a helpful AI assistant. A tool has provided information. Use it to directly and concisely answer the user's original question. Do not mention the tool."
-        final_user_prompt = f"Information: '{tool_output}'\n\nOriginal Question: '{user_prompt}'"
         log(f"Asking Chat AI ({model_name}) to synthesize tool output...")
     else:
-        # If no tool was used, it's a direct conversational query
-        system_prompt = "You are AURA, a helpful and friendly AI assistant. Please provide a direct, conversational response to the user."
-        final_user_prompt = user_prompt
         log(f"Asking Chat AI ({model_name}) for a conversational response...")
 
-    # --- NEW HISTORY FORMATTING ---
-    # Build the prompt string, including the full conversation history
-    full_prompt_for_streaming = f"{system_prompt}\n\n"
-    for message in history:
-        if message['role'] == 'user':
-            full_prompt_for_streaming += f"USER: {message['content']}\n"
-        elif message['role'] == 'model':
-            full_prompt_for_streaming += f"ASSISTANT: {message['content']}\n"
-    
-    # Add the latest user prompt
-    full_prompt_for_streaming += f"USER: {final_user_prompt}\nASSISTANT:"
-    # --- END NEW HISTORY FORMATTING ---
+    user_message = build_chat_user_message(user_prompt, tool_output)
+    messages = [{"role": "system", "content": CHAT_SYSTEM_PROMPT}]
+    messages.extend(history)
+    messages.append({"role": "user", "content": user_message})
+    log_prompt_size(app, "Chat", CHAT_SYSTEM_PROMPT, history, user_message)
+    return get_ollama_chat_stream(app, messages, model_name, cancel_group=cancel_group)
 
-    return get_ollama_streaming_response(app, full_prompt_for_streaming, model_name)
+def summarize_conversation(app, previous_summary, messages):
+    """Folds evicted conversation turns into the running summary. Runs in the background, off the command path."""
+    model_name = app.config.get("chat_model", "llama3.1")
+    transcript = "\n".join(f"{'USER' if m['role'] == 'user' else 'AURA'}: {m['content']}" for m in messages)
+    prompt = (f"--- SUMMARY SO FAR ---\n{previous_summary or '(none)'}\n\n"
+              f"--- NEW CONVERSATION TURNS ---\n{transcript}\n\n--- UPDATED SUMMARY ---")
+    summary_messages = [
+        {"role": "system", "content": "You maintain a running summary of a conversation between a user and AURA, an AI assistant. "
+                                      "Merge the new turns into the summary. Keep facts, names, numbers, preferences and open requests; "
+                                      "drop small talk. Respond with ONLY the updated summary, in at most 150 words."},
+        {"role": "user", "content": prompt},
+    ]
+    app.queue_log(f"Summarizing {len(messages)} evicted history messages with {model_name}...")
+    return get_ollama_chat_response(app, summary_messages, model_name, temperature=0.2, cancel_group="background")
+
+# --- Meeting summaries: incremental and hierarchical ---
+# Each transcript batch becomes a short section summary; every few sections are merged into a
+# bounded overview. An update only ever reads one batch, or the overview plus a few sections,
+# so its cost stays flat however long the meeting runs.
+SECTION_SUMMARY_PROMPT = (
+    "You are summarizing a live meeting transcript, one part at a time. Summarize ONLY the new part below "
+    "as 1-4 short bullet points starting with '- '. Capture decisions, action items (with owners), and key facts. "
+    "Respond with ONLY the bullet points."
+)
+OVERVIEW_MERGE_PROMPT = (
+    "You maintain the overview of a live meeting. Merge the recent section notes into the current overview. "
+    "Keep decisions, action items (with owners), and key facts; drop repetition. Respond with ONLY bullet points "
+    "starting with '- ', at most {max_words} words in total."
+)
+
+def _stream_meeting_completion(app, system_prompt, user_prompt):
+    """Streams a meeting-summary completion from the configured AI engine, at background priority."""
+    messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}]
+    return get_backend(app).chat_stream(messages, app.config.get("ollama_model", "llama3"), temperature=0.3, group="background")
+
+def _render_meeting_summary(state):
+    parts = []
+    if state["overview"]:
+        parts.append(f"**## Overview ##**\n{state['overview']}\n")
+    for timestamp, text in state["sections"]:
+        parts.append(f"**## {timestamp} ##**\n{text}\n")
+    return "\n".join(parts)
+
+def get_streaming_summary(app, session_id, batch_text):
+    """
+    Folds a new transcript batch into the session's summary and streams the full summary text:
+    the stored parts are yielded at once, only new model output streams token by token.
+    Every `merge_every` sections, the overview is rebuilt from itself and those sections first.
+    """
+    log = app.queue_log
+    session = app.meeting_sessions[session_id]
+    settings = app.config.get("meeting_summary", {})
+    merge_every = max(1, int(settings.get("merge_every", 4)))
+    max_words = int(settings.get("overview_words", 200))
+    max_batch_chars = int(settings.get("max_batch_chars", 6000))
+    state = session.setdefault("summary_state", {"overview": "", "sections": [], "unsummarized": ""})
 
-def answer_question_on_summary(app_controller, summary, question):
-    """Uses the selected AI to answer a question based on a provided summary."""
+    # 1. Merge: rebuild the bounded overview from the previous overview and the oldest sections.
+    if len(state["sections"]) >= merge_every:
+        merging = state["sections"][:merge_every]
+        notes = "\n".join(f"[{timestamp}]\n{text}" for timestamp, text in merging)
+        start = time.perf_counter()
+        overview = ""
+        yield "**## Overview ##**\n"
+        try:
+            with _stream_meeting_completion(app, OVERVIEW_MERGE_PROMPT.format(max_words=max_words),
+                                            f"--- CURRENT OVERVIEW ---\n{state['overview'] or '(empty)'}\n\n"
+                                            f"--- RECENT SECTIONS ---\n{notes}\n\n--- UPDATED OVERVIEW ---") as chunks:
+                for chunk in chunks:
+                    overview += chunk
+                    yield chunk
+        except Exception as e:  # Includes PreemptedError: a partial overview is not kept
+            log(f"Meeting overview merge failed, keeping the previous overview: {e}", "ERROR")
+            overview = ""
+        if overview.strip():
+            state["overview"] = overview.strip()
+            del state["sections"][:merge_every]
+            log(f"Merged {len(merging)} meeting sections into the overview in {(time.perf_counter() - start) * 1000:.0f} ms.")
+        elif state["overview"]:
+            yield state["overview"]
+        yield "\n"
+        remaining = _render_meeting_summary({"overview": "", "sections": state["sections"]})
+        if remaining:
+            yield "\n" + remaining
+    else:
+        yield _render_meeting_summary(state)
+
+    # 2. Section: summarize only the new batch (plus any batch a failed update left behind).
+    batch_text = (state["unsummarized"] + " " + batch_text).strip()[-max_batch_chars:]
+    timestamp = datetime.now().strftime("%H:%M")
+    section = ""
+    yield f"\n**## {timestamp} ##**\n" if state["overview"] or state["sections"] else f"**## {timestamp} ##**\n"
+    start = time.perf_counter()
+    try:
+        with _stream_meeting_completion(app, SECTION_SUMMARY_PROMPT, f"--- NEW TRANSCRIPT PART ---\n{batch_text}\n\n--- SUMMARY ---") as chunks:
+            for chunk in chunks:
+                section += chunk
+                yield chunk
+    except Exception as e:  # Includes PreemptedError: a partial section is not kept
+        log(f"Meeting section summary failed, the batch will be retried with the next one: {e}", "ERROR")
+        section = ""
+    if section.strip():
+        state["sections"].append((timestamp, section.strip()))
+        state["unsummarized"] = ""
+        log(f"Summarized a {len(batch_text)}-character transcript batch in {(time.perf_counter() - start) * 1000:.0f} ms "
+            f"({len(state['sections'])} sections since the last merge).")
+    else:
+        state["unsummarized"] = batch_text
+    yield "\n"
+
+# --- Meeting Q&A: transcript passages retrieved from the session index, plus the summary ---
+MEETING_QNA_DEFAULTS = {
+    "top_k": 6,                 # Transcript chunks retrieved per question
+    "context_window": 1,        # Neighbouring chunks kept on each side of a hit (live chunks are only a few words)
+    "max_context_tokens": 1500, # Summary plus excerpts; the prompt stays this size however long the meeting is
+    "summary_tokens": 500,
+}
+MEETING_QNA_STATS = {"retrieval": [0, 0.0], "generation": [0, 0.0]}  # stage -> [count, total ms]
+
+def retrieve_meeting_passages(meeting_index, question, top_k, context_window, token_budget):
+    """
+    Transcript passages relevant to a question, as [(timestamp, text)] in meeting order.
+    Each hit is widened by context_window chunks on each side; overlapping or adjacent spans are
+    coalesced so no chunk is sent twice. Passages are taken best hit first until token_budget is used up.
+    """
+    if meeting_index is None or EMBEDDING_MODEL is None:
+        return []
+    query = EMBEDDING_MODEL.encode([question], normalize_embeddings=True).astype('float32')
+    return _pack_passages(meeting_index, _coalesce_spans(meeting_index.search(query, top_k), context_window), token_budget)
+
+def _coalesce_spans(rows, context_window):
+    """
+    [start, end) spans around hit rows (best first), merged where they overlap or touch.
+    Each merged span is ranked by its best hit.
+    """
+    spans = sorted(([max(0, row - context_window), row + context_window + 1, rank] for rank, row in enumerate(rows)))
+    merged = []
+    for span in spans:
+        if merged and span[0] <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], span[1])
+            merged[-1][2] = min(merged[-1][2], span[2])
+        else:
+            merged.append(span)
+    return [(start, end) for start, end, _ in sorted(merged, key=lambda span: span[2])]
+
+def _pack_passages(meeting_index, spans, token_budget):
+    """[(timestamp, text)] of the spans that fit the budget, taken in rank order and returned in meeting order."""
+    passages, used = [], 0
+    for start, end in spans:
+        chunks = meeting_index.chunk_range(start, end)
+        if not chunks: continue
+        text = "".join(text for _, text in chunks).strip()
+        tokens = estimate_tokens(text)
+        if used + tokens > token_budget:
+            continue  # A shorter, lower-ranked passage may still fit
+        used += tokens
+        passages.append((start, chunks[0][0], text))
+    return [(timestamp, text) for _, timestamp, text in sorted(passages)]
+
+def _record_meeting_qna(stage, elapsed_ms):
+    MEETING_QNA_STATS[stage][0] += 1
+    MEETING_QNA_STATS[stage][1] += elapsed_ms
+
+def meeting_qna_stats_line():
+    parts = [f"{stage} avg {total / count:.0f} ms (n={count})" for stage, (count, total) in MEETING_QNA_STATS.items() if count]
+    return "Meeting Q&A: " + (", ".join(parts) or "no questions yet")
+
+def answer_meeting_question(app_controller, session, question):
+    """
+    Answers a question about a meeting from the summary plus the transcript passages retrieved for
+    it from the session index, so long meetings get precise answers without sending the whole
+    transcript. Retrieval and generation are timed separately.
+    """
     config = app_controller.config
     log_callback = app_controller.queue_log
-    ai_engine = config.get("ai_engine", "gemini_online")
+    backend = get_backend(app_controller)
+    settings = {**MEETING_QNA_DEFAULTS, **config.get("meeting_qna", {})}
+
+    start = time.perf_counter()
+    summary = clip_text(session.get('summary', '').strip(), settings["summary_tokens"])
+    meeting_index = session.get('faiss_index')
+    try:
+        passages = retrieve_meeting_passages(meeting_index, question, settings["top_k"], settings["context_window"],
+                                             settings["max_context_tokens"] - estimate_tokens(summary))
+    except Exception as e:
+        log_callback(f"Meeting transcript retrieval failed, answering from the summary only: {e}", "WARNING")
+        passages = []
+    retrieval_ms = (time.perf_counter() - start) * 1000
+    _record_meeting_qna("retrieval", retrieval_ms)
 
+    excerpts = "\n".join(f"[{datetime.fromtimestamp(timestamp).strftime('%H:%M:%S')}] {text}" for timestamp, text in passages)
     messages = [
-        {"role": "system", "content": "Based ONLY on the provided meeting notes below, answer the user's question. Do not use any outside knowledge. If the answer is not in the notes, say so."},
-        {"role": "user", "content": f"--- MEETING NOTES ---\n{summary}\n\n--- USER QUESTION ---\n{question}\n\n--- ANSWER ---"}
+        {"role": "system", "content": "Based ONLY on the meeting notes and timestamped transcript excerpts below, answer the user's question. "
+                                      "Do not use any outside knowledge. Mention when something was said if it helps. "
+                                      "If the answer is not in the notes or excerpts, say so."},
+        {"role": "user", "content": f"--- MEETING NOTES ---\n{summary or '(no summary yet)'}\n\n"
+                                    f"--- TRANSCRIPT EXCERPTS ---\n{excerpts or '(none found)'}\n\n"
+                                    f"--- USER QUESTION ---\n{question}\n\n--- ANSWER ---"}
     ]
+    log_callback(f"Meeting Q&A: retrieved {len(passages)} passages from {meeting_index.ntotal if meeting_index else 0} chunks "
+                 f"in {retrieval_ms:.0f} ms; prompt ~{messages_tokens(messages)} tokens; answering with {backend.name}.")
 
-    if ai_engine == "ollama_offline":
-        model_name = config.get("ollama_model", "llama3")
-        log_callback(f"Answering question on summary with Ollama model: {model_name}")
-        return get_ollama_chat_response(app_controller, messages, model_name)
-    else: # Default to Gemini Online
-        log_callback("Answering question on summary with Gemini.")
-        answer_model = app_controller.answer_model
-        if not answer_model:
-            return "Cannot answer question: Gemini model is not initialized."
-        try:
-            prompt = f"Based ONLY on the provided meeting notes below, answer the user's question. Do not use any outside knowledge. If the answer is not in the notes, say so.\n\n--- MEETING NOTES ---\n{summary}\n\n--- USER QUESTION ---\n{question}\n\n--- ANSWER ---"
-            response = answer_model.generate_content(prompt)
-            return response.text.strip()
-        except Exception as e:
-            log_callback(f"Gemini Q&A Error: {e}", "ERROR")
-            return f"[Error getting answer from Gemini: {e}]"
+    start = time.perf_counter()
+    try:
+        # The user is waiting on this one, so it runs ahead of (and preempts) summarization.
+        answer = backend.chat(messages, config.get("ollama_model", "llama3"), group="meeting_qna").strip()
+    except Exception as e:
+        log_callback(f"Meeting Q&A Error ({backend.name}): {e}", "ERROR")
+        return f"[Error getting answer from {backend.name}: {e}]"
+    generation_ms = (time.perf_counter() - start) * 1000
+    _record_meeting_qna("generation", generation_ms)
+    log_callback(f"Meeting Q&A answered in {generation_ms:.0f} ms (retrieval {retrieval_ms:.0f} ms).")
+    return answer
 
 def generate_session_title(app_controller, text_to_title):
     """Uses the selected AI to create a short, descriptive title for a session."""
     config = app_controller.config
     log_callback = app_controller.queue_log
-    ai_engine = config.get("ai_engine", "gemini_online")
+    backend = get_backend(app_controller)
 
     messages = [
         {"role": "system", "content": "Analyze the following text from a meeting. Create a short, descriptive title (3-5 words) that accurately describes the main topic. Respond with ONLY the title itself, and nothing else."},
@@ -206,18 +467,9 @@ def generate_session_title(app_controller, text_to_title):
 
     log_callback("Generating session title...")
 
-    if ai_engine == "ollama_offline":
-        model_name = config.get("ollama_model", "llama3")
-        title = get_ollama_chat_response(app_controller, messages, model_name)
-        return title.strip().strip('"')
-    else: # Default to Gemini Online
-        answer_model = app_controller.answer_model
-        if not answer_model:
-            return "Untitled Session"
-        try:
-            prompt = f"Analyze the following text from a meeting. Create a short, descriptive title (3-5 words) that accurately describes the main topic. Respond with ONLY the title itself, and nothing else.\n\n--- TEXT ---\n{text_to_title}\n\n--- TITLE ---"
-            response = answer_model.generate_content(prompt)
-            return response.text.strip().strip('"')
-        except Exception as e:
-            log_callback(f"Gemini Title Generation Error: {e}", "ERROR")
-            return "Untitled Session"
\ No newline at end of file
+    try:
+        title = backend.chat(messages, config.get("ollama_model", "llama3"), group="background")
+        return title.strip().strip('"') or "Untitled Session"
+    except Exception as e:
+        log_callback(f"Title Generation Error ({backend.name}): {e}", "ERROR")
+        return "Untitled Session"
\ No newline at end of file
@@ -8,6 +8,7 @@ from datetime import datetime
 import time
 import queue
 import traceback
+from contextlib import closing
 from multiprocessing import Queue as mp_Queue
 import pythoncom
 import pyperclip
@@ -17,22 +18,27 @@ from playsound import playsound
 from apscheduler.schedulers.background import BackgroundScheduler
 import uuid
 import numpy as np
-import faiss
 import random
 import logging
 from logging import LogRecord
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
-from skills import web_skill as web
-
 import queue
 from gui import AutoWrappingText
 from gui import GUI
 from stt import SpeechToText
 from command_handler import CommandHandler
+from multi_intent import MultiIntentRunner
+from command_queue import CommandScheduler
+from speculative_chat import SpeculativeChatStream
+from connectivity import is_online
+from conversation_history import ConversationHistory
+from model_warmup import ModelWarmupService
+from meeting_index import MeetingStore, EmbeddingWorker
 import ai_logic
 from ai_logic import get_tool_decision, get_conversational_response_stream
+from skill_executor import SkillTimeoutError, SkillCancelledError
 
 # --- Logging Setup for Progress ---
 class QueueHandler(logging.Handler):
@@ -75,7 +81,7 @@ class AURAApp:
         self.last_progress_value = 0
         self.LOADING_TIME_SECONDS = 15  # A reasonable default loading time
 
-        self.conversation_history = []
+        self.conversation_history = ConversationHistory(self, lambda summary, messages: ai_logic.summarize_conversation(self, summary, messages))
         self.is_listening = False
         self.speaking_active = False
         self.is_mic_testing = False
@@ -92,11 +98,19 @@ class AURAApp:
         self.global_hotkey_listener = None
         self._old_config = self.config.copy()
         self.meeting_sessions = {}
+        self.multi_intent = MultiIntentRunner(self, initializer=pythoncom.CoInitialize)
+        self.command_scheduler = CommandScheduler(self, self._execute_command_task)
+        self.model_warmup = ModelWarmupService(self)
+        self.meeting_embedder = EmbeddingWorker(self)
+        self.meeting_store = MeetingStore(self.config.get("meeting_index", {}).get("path", "meeting_sessions"), self.queue_log,
+                                          get_settings=lambda: self.config.get("meeting_index", {}))
+        self.meeting_load_lock = threading.Lock()
+        self.ttfa_stats = {}  # AI path -> [count, total ms] for time to first audio
 
         def routine_proxy_open_app(**kwargs):
             alias = kwargs.get('alias')
             if alias:
-                self.execute_command(f"open {alias}")
+                self.execute_command(f"open {alias}", source="routine")
 
         self.routine_actions = {
             "Open Application": {"params": {"alias": "e.g., notepad"}, "func": routine_proxy_open_app},
@@ -283,48 +297,11 @@ class AURAApp:
 
         self.root.after(100, self._check_loading_status)
 
-    def _preload_ollama_models(self):
-        """Warms up the selected Ollama models to prevent cold start delays."""
-        preload_setting = self.config.get("preload_models", "None")
-        if preload_setting == "None":
-            return
-
-        self.queue_log(f"Preloading Ollama models based on setting: {preload_setting}")
-
-        models_to_load = set()
-        if preload_setting in ["Router Model Only", "Both"]:
-            models_to_load.add(self.config.get("router_model", "nexusraven:latest"))
-        if preload_setting in ["Chat Model Only", "Both"]:
-            models_to_load.add(self.config.get("chat_model", "llama3.1"))
-
-        if not models_to_load:
-            return
-
-        def preloader_task():
-            from ai_logic import get_ollama_chat_response
-            import time
-
-            for model_name in models_to_load:
-                self.queue_log(f"Warming up model: {model_name}...")
-                
-                messages = [{"role": "user", "content": "hello"}]
-                result = get_ollama_chat_response(self, messages, model_name)
-                
-                if result is not None:
-                    self.queue_log(f"Successfully preloaded {model_name}.")
-                else:
-                    self.queue_log(f"Failed to preload model {model_name}. Ensure Ollama is running.", "ERROR")
-                time.sleep(1)
-        
-        threading.Thread(target=preloader_task, daemon=True).start()
-
     def _get_local_ollama_models(self):
         """Fetches the list of locally available Ollama models via the Ollama API."""
         try:
             # The /api/tags endpoint lists all local models
-            response = requests.get("http://localhost:11434/api/tags")
-            response.raise_for_status()
-            models_data = response.json()
+            models_data = ai_logic.get_ollama_client(self).get_json("/api/tags")
             # We extract just the name of each model
             model_names = [model['name'] for model in models_data.get('models', [])]
             self.queue_log(f"Found local Ollama models: {model_names}")
@@ -354,6 +331,7 @@ class AURAApp:
 
         self.gui = GUI(self)
         self._poll_animation_queue()
+        self._restore_meeting_sessions()
         
         if not self.scheduler.running:
             self.scheduler.start()
@@ -361,7 +339,7 @@ class AURAApp:
 
         self.queue_log("Application startup complete.")
 
-        self._preload_ollama_models()
+        self.model_warmup.start()
 
         def on_welcome_message_done():
             self.queue_log("Welcome message finished. Starting background services.")
@@ -414,9 +392,17 @@ class AURAApp:
         self.stop_hotkey_listener()
         self.stop_file_watcher()
         self.stop_clipboard_manager()
+        if self.command_handler:
+            self.command_handler.stop_skill_watcher()
+            self.command_handler.executor.shutdown()
+        self.multi_intent.shutdown()
+        self.command_scheduler.shutdown()
+        self.model_warmup.stop()
+        self.meeting_embedder.shutdown()
         
         if self.tts_engine: self.tts_engine.shutdown()
         if self.stt_engine: self.stt_engine.stop_listening()
+        if ai_logic.OLLAMA_CLIENT: ai_logic.OLLAMA_CLIENT.shutdown()
         
         if self.scheduler.running:
             try:
@@ -486,7 +472,28 @@ class AURAApp:
             # --- NEW DUAL-MODEL DEFAULTS ---
             "router_model": "nexusraven:latest",
             "chat_model": "llama3.1",
-            "preload_models": "None"
+            "preload_models": "None",
+            "model_warmup": {"heartbeat": True, "heartbeat_fraction": 0.8, "release_after_minutes": 30},
+            # --- Embedding fast-path router (cosine similarity) ---
+            "semantic_router": {"enabled": True, "threshold": 0.72, "margin": 0.05},
+            "router_cache": {"enabled": True, "max_entries": 256, "ttl_seconds": 600},
+            "router_tool_retrieval": {"enabled": True, "top_k": 8},
+            "skill_hot_reload": True,
+            "multi_intent": {"enabled": True, "max_workers": 4},
+            "skill_executor": {"max_workers": 4, "default_timeout": 30},
+            "skill_cache": {"enabled": True, "path": "skill_cache.json"},
+            "command_queue": {"max_size": 16, "preempt": True, "coalesce_window": 2.0},
+            "ollama": {"base_url": "http://localhost:11434", "connect_timeout": 3.0, "read_timeout": 120.0, "retries": 2, "backoff": 0.5, "keep_alive": "30m"},
+            "speculative_chat": {"enabled": True},
+            "meeting_summary": {"merge_every": 4, "overview_words": 200, "max_batch_chars": 6000},
+            "meeting_embedding": {"batch_size": 16, "max_wait_ms": 500},
+            "meeting_index": {"path": "meeting_sessions", "upgrade_at": 20000, "upgrade_to": "hnsw",
+                              "hnsw_m": 32, "hnsw_ef_search": 64, "ivf_nlist": 0, "ivf_nprobe": 16},
+            "meeting_qna": {"top_k": 6, "context_window": 1, "max_context_tokens": 1500, "summary_tokens": 500},
+            "memory": {"top_k": 5, "min_score": 0.2},
+            "llm_backends": {"ollama": {"max_in_flight": 2}, "gemini": {"max_in_flight": 4}, "preempt_background": True,
+                             "max_idle_hold": 30},
+            "conversation_history": {"router_budget": 512, "chat_budget": 2048, "max_message_tokens": 768, "summarize": True}
         }
         for key, value in defaults.items():
             self.config.setdefault(key, value)
@@ -498,6 +505,8 @@ class AURAApp:
         if self.config.get("clipboard_manager", {}).get("enabled"):
             self.start_clipboard_manager()
         self.start_hotkey_listener()
+        if self.config.get("skill_hot_reload", True) and self.command_handler:
+            self.command_handler.start_skill_watcher()
         if self.stt_engine:
             self.stt_engine.start_wake_word_listener()
 
@@ -512,20 +521,42 @@ class AURAApp:
         self.execute_command(message, attached_file=attached_file)
 
     def _save_sessions_on_exit(self):
-        """Saves all meeting session data to a JSON file."""
-        if not self.meeting_sessions: return
-        sessions_to_save = [
-            {
-                "id": s.get('id'), "title": s.get('title'),
-                "transcript": s.get('transcript'), "summary": s.get('summary')
-            } for s in self.meeting_sessions.values()
-        ]
-        try:
-            with open("sessions.json", "w", encoding="utf-8") as f:
-                json.dump(sessions_to_save, f, indent=4)
-            self.queue_log("Meeting sessions saved successfully.")
-        except Exception as e:
-            self.queue_log(f"Error saving sessions: {e}", "ERROR")
+        """Saves the transcript and summary of every opened meeting session (their vectors are already on disk)."""
+        loaded = [s for s in self.meeting_sessions.values() if s.get('loaded')]
+        if not loaded: return
+        self.meeting_embedder.flush(timeout=5)  # Let the last chunks reach the index files
+        for session in loaded:
+            self.meeting_store.save(session)
+        self.queue_log(f"Saved {len(loaded)} meeting sessions.")
+
+    def _new_meeting_session_dict(self, session_id, title, loaded):
+        return {
+            "id": session_id, "title": title,
+            "transcript_chunks": [], "transcript": "",
+            "faiss_index": None, "summary": "", "status": "stopped",
+            "transcript_queue": queue.Queue(), "summarizer_thread": None,
+            "loaded": loaded,
+        }
+
+    def _restore_meeting_sessions(self):
+        """Lists the saved meeting sessions from the store's manifest; their data is read when first opened."""
+        for session_id, header in self.meeting_store.headers.items():
+            self.meeting_sessions[session_id] = self._new_meeting_session_dict(session_id, header["title"], loaded=False)
+            self.gui.add_meeting_session_to_list(session_id, header["title"])
+            self.gui.update_session_list_status(session_id, "Stopped")
+        if self.meeting_store.headers:
+            self.queue_log(f"Restored {len(self.meeting_store.headers)} saved meeting sessions.")
+
+    def _load_meeting_session(self, session):
+        """Reads a restored session's transcript, summary and index from disk, once."""
+        with self.meeting_load_lock:
+            if session.get('loaded'): return
+            data = self.meeting_store.load(session['id'])
+            session.update(data)
+            session['transcript_chunks'] = [text for _, text in data['faiss_index'].chunks]
+            if data['summary_state'] is None:
+                session.pop('summary_state')
+            session['loaded'] = True
 
     def start_new_meeting_session(self):
         """Creates a new, blank meeting session."""
@@ -537,13 +568,8 @@ class AURAApp:
         session_title = f"Meeting - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
         
         embedding_dim = ai_logic.EMBEDDING_MODEL.get_sentence_embedding_dimension()
-        new_session = {
-            "id": session_id, "title": session_title,
-            "transcript_chunks": [], "transcript": "",
-            "faiss_index": faiss.IndexFlatL2(embedding_dim),
-            "summary": "", "status": "stopped",
-            "transcript_queue": queue.Queue(), "summarizer_thread": None
-        }
+        new_session = self._new_meeting_session_dict(session_id, session_title, loaded=True)
+        new_session['faiss_index'] = self.meeting_store.create(session_id, session_title, embedding_dim)
         
         self.meeting_sessions[session_id] = new_session
         self.gui.add_meeting_session_to_list(session_id, session_title)
@@ -556,14 +582,29 @@ class AURAApp:
         if not session: return
 
         if session['status'] == 'stopped':
+            if not session.get('loaded'):
+                # Resuming a restored session appends to its saved index: read that off the Tk thread first.
+                session['status'] = 'loading'  # Further clicks are ignored until it's read
+                self.gui.update_session_list_status(session_id, "Loading...")
+                def load_then_start():
+                    try:
+                        self._load_meeting_session(session)
+                    except Exception as e:
+                        self.queue_log(f"Could not load meeting session '{session['title']}': {e}\n{traceback.format_exc()}", "ERROR")
+                        session['status'] = 'stopped'
+                        self.root.after(0, self.gui.update_session_list_status, session_id, "Stopped")
+                        return
+                    session['status'] = 'stopped'
+                    self.root.after(0, self.toggle_meeting_session_status, session_id)
+                threading.Thread(target=load_then_start, daemon=True).start()
+                return
             session['status'] = 'active'
             
             def on_transcription(text_chunk):
                 if session.get("status") == "active":
                     session['transcript_chunks'].append(text_chunk)
                     session['transcript'] += text_chunk
-                    embedding = ai_logic.EMBEDDING_MODEL.encode([text_chunk])
-                    session['faiss_index'].add(embedding.astype('float32'))
+                    self.meeting_embedder.submit(session['faiss_index'], text_chunk)  # Encoded off the Tk thread
                     if self.active_meeting_session_id == session_id:
                         self.gui.update_transcript_display(text_chunk)
                     session['transcript_queue'].put(text_chunk)
@@ -590,7 +631,6 @@ class AURAApp:
         if not session or not session.get('transcript_queue'): return
 
         transcript_batch = []
-        batch_interval = self.config.get("meeting_mode_batch_interval", 15)
         last_update_time = time.time()
         
         while session.get('status') == 'active':
@@ -601,30 +641,49 @@ class AURAApp:
             except queue.Empty:
                 pass
 
+            # Re-read every pass so a changed interval applies to the running meeting.
+            batch_interval = self.config.get("meeting_mode_batch_interval", 15)
             now = time.time()
             if transcript_batch and (now - last_update_time > batch_interval):
                 batch_str = "".join(transcript_batch)
                 transcript_batch.clear()
-                
-                if self.active_meeting_session_id == session_id: self.root.after(0, self.gui.show_summary_status, "Thinking...")
-                
-                summary_stream = ai_logic.get_streaming_summary(self, session_id, batch_str)
-                
-                full_summary = ""
-                if self.active_meeting_session_id == session_id: self.root.after(0, self.gui.update_summary_display, "[CLEAR_SUMMARY]")
-                for chunk in summary_stream:
-                    if chunk != "[CLEAR_SUMMARY]":
-                        full_summary += chunk
-                        if self.active_meeting_session_id == session_id: self.root.after(0, self.gui.update_summary_display, chunk)
-
-                session['summary'] = full_summary
-                
-                if self.active_meeting_session_id == session_id: self.root.after(0, self.gui.hide_summary_status)
+                self._update_meeting_summary(session_id, batch_str)
                 last_update_time = time.time()
+
+        # Summarize whatever was said since the last update instead of dropping it.
+        while True:
+            try:
+                chunk = session['transcript_queue'].get_nowait()
+            except queue.Empty:
+                break
+            if chunk is not None: transcript_batch.append(chunk)
+        if transcript_batch:
+            self._update_meeting_summary(session_id, "".join(transcript_batch))
+        self.meeting_store.save(session)
         
         session['status'] = 'stopped'
         self.root.after(0, self.gui.update_session_list_status, session_id, "Stopped")
 
+    def _update_meeting_summary(self, session_id, batch_str):
+        """Folds one transcript batch into the session summary, streaming it to the summary view."""
+        session = self.meeting_sessions[session_id]
+        if self.active_meeting_session_id == session_id: self.root.after(0, self.gui.show_summary_status, "Thinking...")
+
+        # Only the new batch is summarized; earlier sections and the overview are reused.
+        summary_stream = ai_logic.get_streaming_summary(self, session_id, batch_str)
+
+        full_summary = ""
+        if self.active_meeting_session_id == session_id: self.root.after(0, self.gui.update_summary_display, "[CLEAR_SUMMARY]")
+        for chunk in summary_stream:
+            if chunk != "[CLEAR_SUMMARY]":
+                full_summary += chunk
+                if self.active_meeting_session_id == session_id: self.root.after(0, self.gui.update_summary_display, chunk)
+
+        session['summary'] = full_summary
+        self.meeting_store.save(session)
+
+        if self.active_meeting_session_id == session_id: self.root.after(0, self.gui.hide_summary_status)
+
     def stop_meeting_session(self, session_id):
         """Stops an active meeting session."""
         session = self.meeting_sessions.get(session_id)
@@ -651,7 +710,10 @@ class AURAApp:
         if session_id in self.meeting_sessions:
             if self.meeting_sessions[session_id]['status'] == 'active':
                 self.toggle_meeting_session_status(session_id)
-            self.meeting_sessions.pop(session_id, None)
+            session = self.meeting_sessions.pop(session_id, None)
+            if session and session.get('faiss_index') is not None:
+                session['faiss_index'].detach()
+            self.meeting_store.delete(session_id)
             self.gui.remove_session_from_list(session_id)
             if self.active_meeting_session_id == session_id:
                 self.active_meeting_session_id = None
@@ -679,18 +741,25 @@ class AURAApp:
             messagebox.showerror("Error", f"Could not save session: {e}")
 
     def handle_meeting_qna(self):
-        """Handles a question asked about the current meeting summary."""
+        """Handles a question asked about the current meeting (its summary and indexed transcript)."""
         question = self.gui.meeting_qna_input.get()
         if not question.strip() or not self.active_meeting_session_id: return
         self.gui.meeting_qna_input.delete(0, tk.END)
         session = self.meeting_sessions[self.active_meeting_session_id]
-        if not session['summary'].strip():
-            self.gui.update_summary_display(f"\n\nQ: {question}\nA: The summary is currently empty. Cannot answer.")
-            return
         self.gui.update_summary_display(f"\n\nQ: {question}\nA: Thinking...")
         
         def answer_task():
-            answer = ai_logic.answer_question_on_summary(self, session['summary'], question)
+            try:
+                self._load_meeting_session(session)  # A restored session is read here, not on the Tk thread
+            except Exception as e:
+                self.queue_log(f"Could not load meeting session '{session['title']}': {e}\n{traceback.format_exc()}", "ERROR")
+                self.root.after(0, self.gui.replace_last_qna_answer, "[Could not load this meeting session.]")
+                return
+            if not session['summary'].strip() and not session['transcript'].strip():
+                answer = "Nothing has been transcribed yet. Cannot answer."
+            else:
+                self.meeting_embedder.flush(timeout=1.0)  # Make what was just said searchable
+                answer = ai_logic.answer_meeting_question(self, session, question)
             self.root.after(0, self.gui.replace_last_qna_answer, answer)
         
         threading.Thread(target=answer_task, daemon=True).start()
@@ -700,32 +769,55 @@ class AURAApp:
         if self.active_meeting_session_id == session_id: return
         self.active_meeting_session_id = session_id
         session = self.meeting_sessions.get(session_id)
-        if session:
-            self.gui.show_view('meeting')
+        if not session: return
+        self.gui.show_view('meeting')
+        if session.get('loaded'):
             self.gui.load_session_data(session['transcript'], session['summary'])
+            return
+
+        # Restored session: read it off the Tk thread, then show it if it's still the one selected.
+        self.gui.load_session_data("Loading session...", "")
+        def load_task():
+            try:
+                self._load_meeting_session(session)
+            except Exception as e:
+                self.queue_log(f"Could not load meeting session '{session['title']}': {e}\n{traceback.format_exc()}", "ERROR")
+                return
+            if self.active_meeting_session_id == session_id:
+                self.root.after(0, self.gui.load_session_data, session['transcript'], session['summary'])
+        threading.Thread(target=load_task, daemon=True).start()
 
     def update_wakeword_score(self, score):
         """Updates the wake word detection meter in the GUI."""
         if self.gui: self.gui.update_wakeword_meter(score)
 
-    def execute_command(self, command, attached_file=None):
-        """Executes a command in a background thread."""
-        if self.is_executing_command: # NEW CHECK
-            self.queue_log("Command already in progress. Ignoring new command.", level='WARNING')
-            return
+    def execute_command(self, command, attached_file=None, source="user"):
+        """Queues a command for the command worker. `source` sets its priority (see command_queue)."""
+        if self.command_scheduler.submit(command, source=source, attached_file=attached_file):
+            if self.gui and source == "user": self.gui.update_status("Thinking...")
 
-        if self.gui: self.gui.update_status("Thinking...")
-        threading.Thread(target=self._execute_command_task, args=(command, attached_file), daemon=True).start()
+    def announce(self, text, source="reminder"):
+        """Queues something to say that isn't a reply to the user (reminders, file watcher...)."""
+        self.command_scheduler.submit(text, source=source, kind="announcement")
 
     def _execute_command_task(self, cmd, file_path):
         """
         New Hybrid Flow: Tries fast regex skills first, then falls back to the dual-model AI.
         """
         self.is_executing_command = True
+        self.stop_generating_event.clear()  # A stop from the previous interaction must not cancel this one
+        interaction_start = time.perf_counter()
+        speculative = None
         pythoncom.CoInitialize()
         try:
+            # --- Step 0: Compound commands ("X and Y") run each part concurrently ---
+            if self.config.get("multi_intent", {}).get("enabled", True):
+                if self.multi_intent.try_execute(cmd, attached_file=file_path):
+                    return
+
             # --- Step 1: Try to handle with a simple, fast regex skill ---
             skill_response = self.command_handler.handle(cmd, attached_file=file_path)
+            self._report_perf_stats()
 
             if skill_response is not None:
                 self.queue_log(f"Command '{cmd}' handled by a direct regex skill.")
@@ -739,13 +831,37 @@ class AURAApp:
             self.queue_log(f"No direct skill match. Passing to AI Router.")
             self.root.after(0, self.gui.update_action_button, "generating")
             self.root.after(0, self.gui.update_status, "AURA: Routing...")
-            self.stop_generating_event.clear()
 
             # === ROUTER: Get Tool Decision ===
-            router_model = self.config.get("router_model", "nexusraven:latest")
-            available_tools = self.command_handler.get_tools_for_ai()
-            
-            decision = get_tool_decision(self, self.conversation_history, cmd, router_model, available_tools)
+            # 1. Repeated phrasings reuse an earlier Router AI decision.
+            router_cache = self.command_handler.router_cache
+            schema_hash = self.command_handler.tool_schema_hash
+            cache_enabled = self.config.get("router_cache", {}).get("enabled", True)
+            decision = router_cache.get(cmd, schema_hash) if cache_enabled else None
+            if decision is not None:
+                self.queue_log(f"Router cache hit: {decision}")
+
+            # 2. Fast path: obvious intents are matched by embedding similarity, skipping the Router AI.
+            semantic_router = self.command_handler.semantic_router
+            if decision is None:
+                decision = semantic_router.route(cmd)
+
+            # 3. Everything else goes to the Router AI, shown only the tools most similar to the request.
+            #    Meanwhile the no-tool chat answer is generated speculatively, in case no tool is chosen.
+            if decision is None:
+                router_model = self.config.get("router_model", "nexusraven:latest")
+                available_tools = semantic_router.select_tools(cmd, self.command_handler.get_tools_for_ai())
+                if self.config.get("speculative_chat", {}).get("enabled", True):
+                    speculative = self._start_speculative_chat(cmd)
+
+                router_start = time.perf_counter()
+                decision, complete = get_tool_decision(self, self.conversation_history.router_messages(), cmd, router_model,
+                                                       available_tools, on_tool_name=self.command_handler.warm_skill)
+                semantic_router.record_llm_router_latency((time.perf_counter() - router_start) * 1000)
+                if cache_enabled and complete:  # A repaired (truncated) reply is used once, never replayed
+                    router_cache.put(cmd, schema_hash, decision)
+            self._report_perf_stats()
+            if self.stop_generating_event.is_set(): return  # Stopped while the Router AI was deciding
             
             # --- ADDED VALIDATION BLOCK ---
             # Validate the structure of the decision from the AI
@@ -761,14 +877,25 @@ class AURAApp:
             
             tool_output = None
 
-            if tool_name and tool_name in self.command_handler.command_map:
+            command_map = self.command_handler.command_map  # One snapshot; hot-reloads swap the map
+            if speculative and tool_name and tool_name in command_map:
+                speculative.cancel()  # The answer will be about the tool's output instead
+            if tool_name and tool_name in command_map:
                 # === EXECUTOR: Execute the Chosen Tool ===
                 self.queue_log(f"AI Router chose tool: {tool_name} with params: {parameters}")
                 self.root.after(0, self.gui.update_status, f"AURA: Using {tool_name}...")
                 
-                tool_data = self.command_handler.command_map[tool_name]
-                tool_handler = tool_data['handler']
-                tool_result = tool_handler(self, **parameters)
+                tool_data = command_map[tool_name]
+                try:
+                    tool_result = self.command_handler.executor.run(tool_name, tool_data, parameters)
+                except SkillTimeoutError:
+                    fallback = self.command_handler.executor.fallback_message(tool_name, tool_data)
+                    self.root.after(0, lambda: self.speak_response(fallback, on_done=self.return_to_idle_state))
+                    return
+                except SkillCancelledError:
+                    return
+                finally:
+                    self._report_perf_stats()
 
                 if isinstance(tool_result, dict) and 'error' in tool_result:
                     tool_output = tool_result['error']
@@ -785,9 +912,14 @@ class AURAApp:
             chat_model = self.config.get("chat_model", "llama3.1")
             
             # Get the streaming generator from our new AI logic function
-            response_stream = get_conversational_response_stream(
-                self, self.conversation_history, cmd, chat_model, tool_output
-            )
+            if speculative and not speculative.cancelled.is_set():
+                response_stream = speculative.commit()
+                ttfa_path = "speculative"
+            else:
+                response_stream = get_conversational_response_stream(
+                    self, self.conversation_history.chat_messages(), cmd, chat_model, tool_output
+                )
+                ttfa_path = "tool" if tool_output is not None else "chat"
 
             # --- Stream the final response to the GUI and TTS ---
             aura_bubble_widget = self.gui.add_chat_message("AURA", "")
@@ -796,28 +928,32 @@ class AURAApp:
 
             sentence_buffer = ""
             full_response_text = ""
-            for chunk in response_stream:
-                if self.stop_generating_event.is_set(): break
-                full_response_text += chunk
-                for char in chunk:
-                    if aura_bubble_widget: aura_bubble_widget.char_queue.put(char)
-                    sentence_buffer += char
-                    if char in '.!?\n':
-                        to_speak = sentence_buffer.strip()
-                        if to_speak: self.speak_response(to_speak)
-                        sentence_buffer = ""
+            with closing(response_stream):  # Stopping early closes the request and frees its backend slot
+                for chunk in response_stream:
+                    if self.stop_generating_event.is_set(): break
+                    full_response_text += chunk
+                    for char in chunk:
+                        if aura_bubble_widget: aura_bubble_widget.char_queue.put(char)
+                        sentence_buffer += char
+                        if char in '.!?\n':
+                            to_speak = sentence_buffer.strip()
+                            if to_speak:
+                                if interaction_start: self._record_ttfa(ttfa_path, interaction_start)
+                                interaction_start = None
+                                self.speak_response(to_speak)
+                            sentence_buffer = ""
             
             if sentence_buffer.strip() and not self.stop_generating_event.is_set():
+                if interaction_start: self._record_ttfa(ttfa_path, interaction_start)
                 self.speak_response(sentence_buffer.strip())
 
             if aura_bubble_widget: aura_bubble_widget.char_queue.put(None)
             if self.stop_generating_event.is_set(): return
 
             # --- Finalize and update history ---
-            self.conversation_history.append({"role": "user", "content": cmd})
-            self.conversation_history.append({"role": "model", "content": full_response_text})
-            if len(self.conversation_history) > 10:
-                self.conversation_history = self.conversation_history[-10:]
+            # Append exactly what the Chat model saw, so the next turn's prompt starts with this one's.
+            # Over the chat budget, old turns are evicted in a block and summarized in the background.
+            self.conversation_history.add_turn(ai_logic.build_chat_user_message(cmd, tool_output), full_response_text)
 
             self.update_ai_monitor(full_response_text)
 
@@ -825,9 +961,29 @@ class AURAApp:
             self.queue_log(f"Error executing command task: {e}\n{traceback.format_exc()}", "ERROR")
             if self.is_running: self.root.after(0, lambda: self.speak_response("I ran into an error processing that.", on_done=self.return_to_idle_state))
         finally:
+            if speculative: speculative.cancel()  # No-op once committed
             self.is_executing_command = False
             pythoncom.CoUninitialize()
 
+    def _start_speculative_chat(self, cmd):
+        """Starts the no-tool chat stream for `cmd` in the background, buffering it until committed."""
+        chat_model = self.config.get("chat_model", "llama3.1")
+        history = self.conversation_history.chat_messages()
+        client = ai_logic.get_ollama_client(self)
+        return SpeculativeChatStream(
+            lambda: get_conversational_response_stream(self, history, cmd, chat_model, None, cancel_group="speculative"),
+            lambda: client.cancel("speculative"),
+            self.queue_log,
+        )
+
+    def _record_ttfa(self, path, interaction_start):
+        """Time from the start of the command to the first sentence handed to TTS, per AI path."""
+        elapsed_ms = (time.perf_counter() - interaction_start) * 1000
+        count, total = self.ttfa_stats.get(path, (0, 0.0))
+        self.ttfa_stats[path] = (count + 1, total + elapsed_ms)
+        self.queue_log(f"Time to first audio ({path} path): {elapsed_ms:.0f} ms.")
+        self._report_perf_stats()
+
     def clear_conversation_history(self):
         """Clears the AI's conversational memory."""
         self.conversation_history.clear()
@@ -864,9 +1020,20 @@ class AURAApp:
         """
         self.queue_log("Unified stop command received. Stopping all AI activity.")
         
+        self.signal_stop()
+        self.stop_speech_and_idle()
+
+    def signal_stop(self):
+        """Stops the current interaction's generation. Touches no GUI or TTS, so it is safe from any thread."""
         # 1. Signal the generation loop to stop producing new content.
         self.stop_generating_event.set()
+        # Close in-flight router/chat requests so Ollama stops generating too (meeting work is left alone).
+        if ai_logic.OLLAMA_CLIENT:
+            ai_logic.OLLAMA_CLIENT.cancel("interactive")
+            ai_logic.OLLAMA_CLIENT.cancel("speculative")
 
+    def stop_speech_and_idle(self):
+        """Silences TTS and returns to idle. Runs on the Tk thread."""
         # 2. Stop the TTS engine from playing any current or queued audio.
         if self.tts_engine:
             self.tts_engine.stop()
@@ -957,7 +1124,7 @@ class AURAApp:
         """The part of starting to listen that must run on the main thread."""
         self.is_listening = True
         if self.gui: self.gui.update_status("Listening...", is_listening=True)
-        if self.stt_engine: self.stt_engine.start_listening(self.process_speech_input, lambda: web.is_online(self.queue_log))
+        if self.stt_engine: self.stt_engine.start_listening(self.process_speech_input, lambda: is_online(self.queue_log))
 
     def stop_listening(self):
         """Stops the STT engine from listening but does NOT restart the wake word listener."""
@@ -1004,6 +1171,9 @@ class AURAApp:
             else:
                 self.stop_clipboard_manager()
 
+        if new_config.get("enabled_skills", {}) != old_config.get("enabled_skills", {}) and self.command_handler:
+            self.command_handler.apply_enabled_skills(old_config.get("enabled_skills", {}), new_config.get("enabled_skills", {}))
+
         if new_config.get("hotkeys", []) != old_config.get("hotkeys", []):
             self.stop_hotkey_listener()
             self.start_hotkey_listener()
@@ -1014,6 +1184,9 @@ class AURAApp:
         if new_config.get("audio") != old_config.get("audio"):
             threading.Thread(target=self.reinitialize_audio_engines, daemon=True).start()
 
+        if any(new_config.get(key) != old_config.get(key) for key in ("preload_models", "router_model", "chat_model")):
+            self.model_warmup.warm_now()
+
     @property
     def hotkey_actions(self):
         """Maps hotkey action names to their corresponding functions."""
@@ -1060,6 +1233,26 @@ class AURAApp:
             widget.insert('1.0', text)
             widget.config(state='disabled')
 
+    def _report_perf_stats(self):
+        """Pushes the performance counters to the Logs view."""
+        if not self.gui or not self.command_handler: return
+        lines = [
+            self.command_handler.router_cache.stats_line(),
+            self.command_handler.manifest.timings_line(),
+            self.command_scheduler.stats_line(),
+            self.conversation_history.stats_line(),
+            ai_logic.get_ollama_client(self).stats_line(),
+            ai_logic.get_ollama_client(self).load_stats_line(),
+            self.model_warmup.stats_line(),
+            self.meeting_embedder.stats_line(),
+            ai_logic.meeting_qna_stats_line(),
+            *ai_logic.backend_stats_lines(),
+            "Time to first audio: " + (", ".join(f"{path} avg {total / count:.0f} ms (n={count})"
+                                                 for path, (count, total) in self.ttfa_stats.items()) or "no AI answers yet"),
+            *self.command_handler.executor.stats_lines(),
+        ]
+        self.root.after(0, self.gui.update_perf_stats, "\n".join(lines))
+
     def _reinitialize_tts_worker(self):
         """Worker thread to re-initialize the TTS engine with a new voice."""
         self.is_tts_reinitializing = True
@@ -1179,4 +1372,4 @@ class AURAApp:
             self.app = app_controller
         def on_created(self, event):
             if not event.is_directory:
-                self.app.root.after(0, self.app.speak_response, f"New file detected: {os.path.basename(event.src_path)}")
+                self.app.announce(f"New file detected: {os.path.basename(event.src_path)}", source="file_watcher")
@@ -0,0 +1,133 @@
+# benchmarks/bench_chat_prompt_cache.py
+"""
+Compares prompt evaluation per conversation turn for the old chat path
+(history flattened into a USER:/ASSISTANT: string for /api/generate, system
+prompt switching with tool output) against the /api/chat path (one stable
+system prompt, append-only history).
+
+Always reports, per turn, how much of the prompt is a byte-identical prefix
+of the previous turn's prompt (the part Ollama can reuse from its cache).
+With Ollama running it also replays the conversation against the chat model
+and reports prompt_eval_count and prompt_eval_duration per turn.
+
+Run from the repository root:
+    python benchmarks/bench_chat_prompt_cache.py [chat_model]
+"""
+import os
+import sys
+import json
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ai_logic
+
+OLLAMA_URL = "http://localhost:11434"
+
+# (user turn, tool output or None)
+CONVERSATION = [
+    ("hi there, how are you today?", None),
+    ("what's the weather in paris", "Paris: 18°C, light rain, wind 12 km/h."),
+    ("should I take an umbrella then?", None),
+    ("what's the stock price of apple", "AAPL: $228.40 (+1.2%)."),
+    ("is that higher than last week?", None),
+    ("tell me a fun fact about octopuses", None),
+    ("what time is it in tokyo", "It is 22:14 in Tokyo."),
+    ("thanks, that's all for now", None),
+]
+CANNED_REPLY = "Sure! Here's a short answer to that."
+
+
+def legacy_prompt(history, user_prompt, tool_output):
+    """The prompt get_conversational_response_stream built before the switch to /api/chat."""
+    if tool_output:
+        system_prompt = "You are AURA, a helpful AI assistant. A tool has provided information. Use it to directly and concisely answer the user's original question. Do not mention the tool."
+        final_user_prompt = f"Information: '{tool_output}'\n\nOriginal Question: '{user_prompt}'"
+    else:
+        system_prompt = "You are AURA, a helpful and friendly AI assistant. Please provide a direct, conversational response to the user."
+        final_user_prompt = user_prompt
+    prompt = f"{system_prompt}\n\n"
+    for message in history:
+        prompt += f"{'USER' if message['role'] == 'user' else 'ASSISTANT'}: {message['content']}\n"
+    return prompt + f"USER: {final_user_prompt}\nASSISTANT:"
+
+
+def chat_messages(history, user_prompt, tool_output):
+    messages = [{"role": "system", "content": ai_logic.CHAT_SYSTEM_PROMPT}]
+    messages.extend(history)
+    messages.append({"role": "user", "content": ai_logic.build_chat_user_message(user_prompt, tool_output)})
+    return messages
+
+
+def render(messages):
+    """Approximates the chat template: what matters is that earlier turns render identically."""
+    return "".join(f"<|{m['role']}|>{m['content']}\n" for m in messages)
+
+
+def shared_prefix(a, b):
+    length = 0
+    for x, y in zip(a, b):
+        if x != y: break
+        length += 1
+    return length
+
+
+def build_turns():
+    """Returns [(legacy prompt, chat messages)] per turn, with history stored as each path stores it."""
+    legacy_history, chat_history, turns = [], [], []
+    for user_prompt, tool_output in CONVERSATION:
+        turns.append((legacy_prompt(legacy_history, user_prompt, tool_output), chat_messages(chat_history, user_prompt, tool_output)))
+        # Old app: stored the raw command. New app: stores the message exactly as sent.
+        legacy_history += [{"role": "user", "content": user_prompt}, {"role": "model", "content": CANNED_REPLY}]
+        chat_history += [{"role": "user", "content": ai_logic.build_chat_user_message(user_prompt, tool_output)},
+                         {"role": "assistant", "content": CANNED_REPLY}]
+    return turns
+
+
+def ollama_available():
+    try:
+        requests.get(f"{OLLAMA_URL}/api/tags", timeout=2).raise_for_status()
+        return True
+    except requests.RequestException:
+        return False
+
+
+def evaluate(model, endpoint, body):
+    payload = {"model": model, "stream": False, "keep_alive": "30m",
+               "options": {"temperature": 0.0, "num_predict": 1}, **body}
+    data = requests.post(f"{OLLAMA_URL}/api/{endpoint}", json=payload, timeout=300).json()
+    return data.get("prompt_eval_count", 0), data.get("prompt_eval_duration", 0) / 1e6
+
+
+def main(model="llama3.1"):
+    turns = build_turns()
+    print("Reusable prompt prefix per turn (characters identical to the previous turn's prompt):\n")
+    print(f"{'turn':>4}  {'legacy /api/generate':>24}  {'/api/chat':>24}")
+    previous_legacy = previous_chat = ""
+    for i, (legacy, messages) in enumerate(turns, 1):
+        chat = render(messages)
+        legacy_reuse = shared_prefix(previous_legacy, legacy)
+        chat_reuse = shared_prefix(previous_chat, chat)
+        print(f"{i:>4}  {legacy_reuse:>7}/{len(legacy):<6} ({legacy_reuse / len(legacy):4.0%})  "
+              f"{chat_reuse:>7}/{len(chat):<6} ({chat_reuse / len(chat):4.0%})")
+        previous_legacy, previous_chat = legacy, chat
+
+    if not ollama_available():
+        print(f"\nOllama not reachable at {OLLAMA_URL}; skipping prompt-eval measurements.")
+        return
+
+    print(f"\nPrompt evaluation per turn with {model} (tokens evaluated, ms):\n")
+    print(f"{'turn':>4}  {'legacy tokens':>13} {'legacy ms':>9}  {'chat tokens':>11} {'chat ms':>8}")
+    # Alternating the two paths would evict each other's cache, so each runs as its own conversation.
+    legacy_runs = [evaluate(model, "generate", {"prompt": legacy, "raw": False}) for legacy, _ in turns]
+    chat_runs = [evaluate(model, "chat", {"messages": messages}) for _, messages in turns]
+    for i, ((lt, lms), (ct, cms)) in enumerate(zip(legacy_runs, chat_runs), 1):
+        print(f"{i:>4}  {lt:>13} {lms:>9.0f}  {ct:>11} {cms:>8.0f}")
+    print(f"\ntotal {sum(t for t, _ in legacy_runs):>9} {sum(ms for _, ms in legacy_runs):>9.0f}  "
+          f"{sum(t for t, _ in chat_runs):>11} {sum(ms for _, ms in chat_runs):>8.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "llama3.1")
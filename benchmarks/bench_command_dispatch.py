@@ -0,0 +1,105 @@
+# benchmarks/bench_command_dispatch.py
+"""
+Compares the old per-command regex loop in CommandHandler.handle against the
+precompiled SkillDispatcher over a few thousand generated utterances.
+
+Run from the repository root:  python benchmarks/bench_command_dispatch.py
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from command_handler import CommandHandler
+
+TEMPLATES = [
+    "open {app}", "close the {app} app", "what's the weather in {city}", "what's the weather",
+    "set volume to {num}", "set the volume for {app} to {num}", "remind me in {num} minutes to {task}",
+    "add {task} to my to-do list", "remove {task} from my to-do list", "what's the time in {city}",
+    "convert {num} km to miles", "translate 'hello' to french", "tell me a joke", "what do you remember",
+    "remember that {task}", "what is the stock price for {ticker}", "google {topic}", "list windows",
+    "tell me about {topic}", "how are you doing today", "what do you think about {topic}",
+    "can you explain {topic} to me", "thanks a lot", "who won the game last night",
+]
+FILLERS = {
+    "app": ["notepad", "chrome", "spotify", "discord", "calculator"],
+    "city": ["paris", "london", "tokyo", "new york", "dubai"],
+    "num": ["10", "30", "55", "80"],
+    "task": ["buy milk", "call mom", "water the plants", "send the report"],
+    "ticker": ["aapl", "msft", "tsla"],
+    "topic": ["black holes", "the roman empire", "quantum computing", "cats"],
+}
+
+
+class _BenchApp:
+    """Minimal stand-in for AURAApp: just enough for CommandHandler to load skills."""
+    def __init__(self):
+        self.config = {"enabled_skills": {}}
+
+    def queue_log(self, message, level='INFO', progress_percent=None):
+        if level in ("ERROR", "WARNING"):
+            print(f"[{level}] {message.splitlines()[0]}")
+
+
+def build_corpus(size, seed=0):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        template = rng.choice(TEMPLATES)
+        corpus.append(re.sub(r"\{(\w+)\}", lambda m: rng.choice(FILLERS[m.group(1)]), template))
+    return corpus
+
+
+def legacy_match(command_map, command):
+    """The matching half of the original CommandHandler.handle, without calling the handler."""
+    command_lower = command.lower().strip()
+    for cmd_name in sorted(command_map.keys()):
+        regex_pattern = command_map[cmd_name].get('regex')
+        if not regex_pattern:
+            continue
+        if re.match(r'^\s*' + regex_pattern.lstrip('^'), command_lower, re.IGNORECASE):
+            match = re.search(regex_pattern, command_lower, re.IGNORECASE)
+            return cmd_name, match.groups()
+    return None
+
+
+def dispatcher_match(dispatcher, command):
+    result = dispatcher.match(command.lower().strip())
+    if result is None:
+        return None
+    _, cmd_name, _, groups = result
+    return cmd_name, groups
+
+
+def _time(label, func, corpus, rounds=3):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for utterance in corpus:
+            func(utterance)
+        best = min(best, time.perf_counter() - start)
+    per_call_us = best / len(corpus) * 1e6
+    print(f"{label:<22} {best * 1000:8.1f} ms total   {per_call_us:7.1f} us/utterance")
+    return best
+
+
+def main(size=5000):
+    handler = CommandHandler(_BenchApp())
+    command_map = handler.command_map
+    corpus = build_corpus(size)
+    print(f"{len(handler.dispatcher.entries)} regex skills loaded, {len(corpus)} utterances\n")
+
+    mismatches = [u for u in corpus if legacy_match(command_map, u) != dispatcher_match(handler.dispatcher, u)]
+    if mismatches:
+        print(f"WARNING: {len(mismatches)} utterances dispatched differently, e.g. {mismatches[:3]}")
+
+    legacy = _time("legacy loop", lambda u: legacy_match(command_map, u), corpus)
+    current = _time("SkillDispatcher", lambda u: dispatcher_match(handler.dispatcher, u), corpus)
+    print(f"\nspeedup: {legacy / current:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,219 @@
+# benchmarks/bench_e2e_latency.py
+"""
+End-to-end latency of the command path, without a real Ollama or a GUI.
+
+Starts the stub Ollama server (ollama_stub.py) with scripted Router AI
+decisions, builds a headless AURAApp (real CommandHandler, skills, router
+cache and semantic router; GUI, Tk and TTS replaced by recorders), and pushes
+an utterance corpus through _execute_command_task. Reports p50/p95 per path:
+
+  routing  - command start until the tool decision is known
+  tool     - time spent in the skill
+  ttft     - first token reaching the chat bubble
+  ttfs     - first sentence handed to TTS (time to first audio)
+  total    - whole interaction
+
+Needs the app's own dependencies (embedding model, pythoncom, ...), like the
+app itself. Run from the repository root:
+    python benchmarks/bench_e2e_latency.py [--repeats 5] [--tokens-per-sec 40] [--first-token-ms 150]
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ai_logic
+import app_controller
+from app_controller import AURAApp
+from command_handler import CommandHandler
+from ollama_stub import OllamaStubServer
+
+# (utterance, expected path) - the path is only used to group the report.
+CORPUS = [
+    ("tell me a joke", "regex"),
+    ("what's the time", "regex"),
+    ("convert 5 km to miles", "regex"),
+    ("how much is 10 miles in kilometers", "router+tool"),
+    ("could you tell me what day it is", "router+tool"),
+    ("I could use a good laugh right now", "router+tool"),
+    ("how are you doing today", "chat"),
+    ("explain why the sky is blue", "chat"),
+    ("write a short poem about coffee", "chat"),
+]
+ROUTER_RULES = [
+    (r"miles in kilometers", "convert_units", {"value": "10", "from_unit": "miles", "to_unit": "kilometers"}),
+    (r"what day it is", "get_date", {}),
+    (r"laugh", "tell_joke", {}),
+]
+CHAT_REPLY = ("That's a great question. Here is a short answer from the stub model, "
+              "long enough to span a few sentences. It ends here.")
+METRICS = ("routing", "tool", "ttft", "ttfs", "total")
+
+
+class _Recorder:
+    """Timestamps of one interaction, relative to its start."""
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.start = time.perf_counter()
+        self.marks = {}
+        self.tool_ms = 0.0
+
+    def mark(self, name, once=True):
+        if once and name in self.marks:
+            return
+        self.marks[name] = (time.perf_counter() - self.start) * 1000
+
+
+class _Bubble:
+    """Chat bubble whose typewriter queue records when the first character arrives."""
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.char_queue = self
+
+    def put(self, char):
+        if char is not None: self.recorder.mark("ttft")
+
+    def start_typewriter_animation(self):
+        pass
+
+
+class _HeadlessGUI:
+    """Accepts every GUI call; chat bubbles report their first character."""
+    def __init__(self, recorder):
+        self.recorder = recorder
+
+    def add_chat_message(self, *args, **kwargs):
+        return _Bubble(self.recorder)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class _ImmediateRoot:
+    """Stands in for Tk: `after` callbacks run right away on the calling thread."""
+    def after(self, delay_ms, callback=None, *args):
+        if callback: callback(*args)
+
+    def winfo_exists(self):
+        return False
+
+
+def build_app(server, recorder, verbose=False):
+    app = AURAApp.__new__(AURAApp)
+    app.queue_log = lambda message, level='INFO', progress_percent=None: (
+        print(f"[{level}] {message.splitlines()[0]}") if verbose or level in ("ERROR", "WARNING") else None)
+    AURAApp.__init__(app, use_tk=False)
+    app.config = app._get_default_config()  # Never the user's config.json
+    app._initialize_config_defaults()
+    app.config["ollama"]["base_url"] = server.base_url
+    app.config["router_model"] = app.config["chat_model"] = "stub:latest"
+
+    app.root = _ImmediateRoot()
+    app.gui = _HeadlessGUI(recorder)
+    app.speak_response = lambda text, on_done=None, priority='normal': recorder.mark("ttfs")
+    app.return_to_idle_state = lambda: None
+    app.update_ai_monitor = lambda text: None
+
+    ai_logic.load_embedding_model(app.queue_log)
+    app.command_handler = CommandHandler(app)
+    _instrument(app, recorder)
+    return app
+
+
+def _instrument(app, recorder):
+    """Wraps the routing and skill entry points to timestamp them."""
+    semantic_router = app.command_handler.semantic_router
+    route = semantic_router.route
+    def timed_route(*args, **kwargs):
+        decision = route(*args, **kwargs)
+        if decision is not None: recorder.mark("routing", once=False)
+        return decision
+    semantic_router.route = timed_route
+
+    get_tool_decision = app_controller.get_tool_decision
+    def timed_tool_decision(*args, **kwargs):
+        decision = get_tool_decision(*args, **kwargs)
+        recorder.mark("routing", once=False)
+        return decision
+    app_controller.get_tool_decision = timed_tool_decision
+
+    executor = app.command_handler.executor
+    run = executor.run
+    def timed_run(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return run(*args, **kwargs)
+        finally:
+            recorder.tool_ms += (time.perf_counter() - start) * 1000
+            recorder.marks["tool"] = recorder.tool_ms
+    executor.run = timed_run
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--tokens-per-sec", type=float, default=40.0, help="Chat model generation rate")
+    parser.add_argument("--first-token-ms", type=float, default=150.0, help="Chat model first-token delay")
+    parser.add_argument("--router-tokens-per-sec", type=float, default=80.0)
+    parser.add_argument("--router-first-token-ms", type=float, default=250.0)
+    parser.add_argument("--keep-caches", action="store_true", help="Don't clear the router and skill caches between runs")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = OllamaStubServer(
+        reply=CHAT_REPLY, router_rules=ROUTER_RULES,
+        first_token_delay=args.first_token_ms / 1000, token_delay=OllamaStubServer.token_delay_for(args.tokens_per_sec),
+        router_first_token_delay=args.router_first_token_ms / 1000,
+        router_token_delay=OllamaStubServer.token_delay_for(args.router_tokens_per_sec),
+    ).start()
+    recorder = _Recorder()
+    app = build_app(server, recorder, args.verbose)
+    print(f"Stub Ollama on {server.base_url}: chat {args.tokens_per_sec:g} tok/s after {args.first_token_ms:g} ms, "
+          f"router {args.router_tokens_per_sec:g} tok/s after {args.router_first_token_ms:g} ms\n")
+
+    samples = {}  # path -> metric -> [ms]
+    for _ in range(args.repeats):
+        for utterance, path in CORPUS:
+            if not args.keep_caches:
+                app.command_handler.router_cache.clear()
+                app.command_handler.executor.result_cache.entries.clear()
+            app.clear_conversation_history()
+            recorder.reset()
+            app._execute_command_task(utterance, None)
+            recorder.mark("total")
+            for metric, value in recorder.marks.items():
+                samples.setdefault(path, {}).setdefault(metric, []).append(value)
+            # Let abandoned speculative streams and background work settle between runs.
+            while any(t.name in ("speculative-chat", "history-summary") for t in threading.enumerate()):
+                time.sleep(0.01)
+
+    print("ms, p50/p95 per path:\n")
+    print(f"{'path':<12} {'n':>3}  " + "  ".join(f"{metric:^15}" for metric in METRICS))
+    for path, metrics in samples.items():
+        cells = []
+        for metric in METRICS:
+            values = metrics.get(metric)
+            cells.append(f"{percentile(values, 0.5):7.0f}/{percentile(values, 0.95):<7.0f}" if values else f"{'-':^15}")
+        print(f"{path:<12} {len(metrics['total']):>3}  " + "  ".join(cells))
+    print(f"\n{server.requests} Ollama requests ({server.router_requests} router), {server.connections} TCP connection(s)")
+    print(ai_logic.get_ollama_client(app).stats_line())
+    print(ai_logic.get_ollama_client(app).load_stats_line())
+    for line in ai_logic.backend_stats_lines():
+        print(line)
+    app.command_handler.executor.shutdown()
+    ai_logic.get_ollama_client(app).shutdown()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
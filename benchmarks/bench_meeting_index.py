@@ -0,0 +1,151 @@
+# benchmarks/bench_meeting_index.py
+"""
+Recall versus search latency of the meeting index types (meeting_index.py).
+
+Synthetic, clustered unit vectors stand in for transcript embeddings. For each
+size, exact flat search gives the ground truth; HNSW and IVF are built with
+the app's defaults and searched one query at a time (as Q&A does) at several
+ef_search / nprobe values. Reported: build time, mean and p95 query latency,
+recall@k against flat.
+
+A last run appends to a MeetingIndex past its upgrade threshold while another
+thread keeps searching, to show the background rebuild and swap don't stall
+readers.
+
+Needs faiss and numpy (and the app's own imports). Run from the repository root:
+    python benchmarks/bench_meeting_index.py [--sizes 5000,20000,100000] [--dim 384] [--queries 200]
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import faiss
+from meeting_index import INDEX_DEFAULTS, MeetingIndex, build_index, apply_search_settings
+
+EF_SEARCH = (16, 32, 64, 128)
+NPROBE = (1, 4, 16, 64)
+
+
+class EmbeddingSpace:
+    """
+    Unit vectors around topic centres in a low-dimensional latent space projected up to `dim`:
+    sentence embeddings have far fewer effective dimensions than coordinates, and isotropic
+    random vectors would make every approximate index look worse than it is on real text.
+    """
+    def __init__(self, rng, dim, latent_dim=64, topics=200, spread=1.0, noise=0.05):
+        self.rng, self.dim, self.spread, self.noise = rng, dim, spread, noise
+        self.projection = rng.standard_normal((latent_dim, dim)).astype('float32')
+        self.topics = rng.standard_normal((topics, latent_dim)).astype('float32')
+
+    def sample(self, count):
+        latent = self.topics[self.rng.integers(0, len(self.topics), count)]
+        latent = latent + self.spread * self.rng.standard_normal(latent.shape).astype('float32')
+        vectors = latent @ self.projection
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors += self.noise * self.rng.standard_normal(vectors.shape).astype('float32')
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def timed_search(index, queries, k):
+    """Searches one query at a time. Returns (row ids, per-query ms)."""
+    ids, times = [], []
+    for query in queries:
+        start = time.perf_counter()
+        _, rows = index.search(query[None, :], k)
+        times.append((time.perf_counter() - start) * 1000)
+        ids.append(rows[0])
+    return np.array(ids), np.array(times)
+
+
+def recall(found, truth):
+    return np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)])
+
+
+def report(name, build_ms, times, found, truth):
+    build = f"{build_ms:.0f}" if build_ms is not None else "-"
+    print(f"  {name:<22} {build:>9} {times.mean():>9.3f} {np.percentile(times, 95):>9.3f} {recall(found, truth):>8.3f}")
+
+
+def bench_size(space, count, args):
+    vectors = space.sample(count)
+    queries = space.sample(args.queries)
+    print(f"\n{count} vectors, dim {args.dim}, {args.queries} queries, recall@{args.k}")
+    print(f"  {'index':<22} {'build ms':>9} {'mean ms':>9} {'p95 ms':>9} {'recall':>8}")
+
+    flat = faiss.IndexFlatL2(args.dim)
+    flat.add(vectors)
+    truth, times = timed_search(flat, queries, args.k)
+    report("flat (exact)", None, times, truth, truth)
+
+    for kind, knob, values in (("hnsw", "hnsw_ef_search", EF_SEARCH), ("ivf", "ivf_nprobe", NPROBE)):
+        start = time.perf_counter()
+        index = build_index(kind, args.dim, vectors, INDEX_DEFAULTS)
+        build_ms = (time.perf_counter() - start) * 1000
+        for value in values:
+            apply_search_settings(index, {**INDEX_DEFAULTS, knob: value})
+            found, times = timed_search(index, queries, args.k)
+            report(f"{kind} {knob.split('_', 1)[1]}={value}", build_ms, times, found, truth)
+            build_ms = None  # Built once per type
+
+
+def bench_live_upgrade(space, args):
+    """Appends batches past upgrade_at while a reader searches; reports the slowest search around the swap."""
+    settings = {"upgrade_at": args.upgrade_at, "upgrade_to": args.upgrade_to}
+    messages = []
+    meeting_index = MeetingIndex(args.dim, get_settings=lambda: settings,
+                                 log_callback=lambda message, level='INFO': messages.append(message))
+    queries = space.sample(50)
+    stop = threading.Event()
+    search_ms = []
+
+    def reader():
+        i = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            meeting_index.search(queries[i % len(queries)][None, :], args.k)
+            search_ms.append((time.perf_counter() - start) * 1000)
+            i += 1
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    batch = 16
+    for _ in range(int(args.upgrade_at * 1.5) // batch):
+        meeting_index.add(space.sample(batch), [(0, "")] * batch)
+    while meeting_index.upgrading:
+        time.sleep(0.01)
+    stop.set()
+    thread.join()
+
+    times = np.array(search_ms)
+    print(f"\nLive upgrade to {args.upgrade_to} at {args.upgrade_at} vectors, appending {batch}-vector batches while searching:")
+    for message in messages:
+        print(f"  {message.splitlines()[0]}")
+    print(f"  {len(times)} searches during the run: mean {times.mean():.3f} ms, p99 {np.percentile(times, 99):.3f} ms, "
+          f"max {times.max():.1f} ms; final index {meeting_index.kind} with {meeting_index.ntotal} vectors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="5000,20000,100000", help="Comma-separated vector counts")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension (all-MiniLM-L6-v2 is 384)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--upgrade-at", type=int, default=20000)
+    parser.add_argument("--upgrade-to", choices=("hnsw", "ivf"), default=INDEX_DEFAULTS["upgrade_to"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    space = EmbeddingSpace(np.random.default_rng(args.seed), args.dim)
+    for count in (int(size) for size in args.sizes.split(",")):
+        bench_size(space, count, args)
+    bench_live_upgrade(space, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/bench_model_warmup.py
+"""
+Cold versus warm first-token latency, against the stub Ollama server with a
+simulated model load time and keep_alive expiry (ollama_stub.py).
+
+Scenarios, each followed by one chat request:
+  cold start        - no warm-up: the request pays the model load
+  sequential warm   - the old preloader: models loaded one after another
+  parallel warm     - ModelWarmupService.start(): router, chat and embedding at once
+  idle, no ping     - idle past keep_alive without the heartbeat: unloaded again
+  idle, heartbeat   - same idle time with the heartbeat running
+
+Needs the app's own dependencies (embedding model), like the app itself.
+Run from the repository root:
+    python benchmarks/bench_model_warmup.py [--load-ms 1500] [--keep-alive 4]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ai_logic
+from model_warmup import ModelWarmupService
+from ollama_stub import OllamaStubServer
+
+
+class _App:
+    """Just what ai_logic and the warm-up service read from AURAApp."""
+    def __init__(self, config, verbose):
+        self.config = config
+        self.answer_model = None
+        self.verbose = verbose
+
+    def queue_log(self, message, level='INFO', progress_percent=None):
+        if self.verbose or level in ("ERROR", "WARNING"):
+            print(f"  [{level}] {message.splitlines()[0]}")
+
+
+def first_token_ms(app, model):
+    """Streams a whole reply (the load time is only in the final chunk) and returns its TTFT."""
+    start = time.perf_counter()
+    ttft = None
+    for chunk in ai_logic.get_ollama_chat_stream(app, [{"role": "user", "content": "hello"}], model):
+        if chunk and ttft is None:
+            ttft = (time.perf_counter() - start) * 1000
+    return ttft
+
+
+def wait_for_warmup(service):
+    while service.startup_total_ms is None:
+        time.sleep(0.01)
+    return service.startup_total_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--load-ms", type=float, default=1500.0, help="Simulated model load time")
+    parser.add_argument("--keep-alive", type=float, default=4.0, help="keep_alive in seconds (the stub unloads after it)")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = OllamaStubServer(reply="Hi there, a short reply.", first_token_delay=0.05,
+                              load_delay=args.load_ms / 1000, model_ttl=args.keep_alive).start()
+    app = _App({
+        "ollama": {"base_url": server.base_url, "keep_alive": f"{args.keep_alive:g}s"},
+        "model_warmup": {"heartbeat": False, "heartbeat_fraction": 0.5, "min_heartbeat_seconds": 0.5},
+        "preload_models": "Both",
+    }, args.verbose)
+    ai_logic.load_embedding_model(app.queue_log)
+    service = ModelWarmupService(app)
+    results = []
+
+    ttft = first_token_ms(app, "cold:latest")
+    results.append(("cold start", None, ttft))
+
+    start = time.perf_counter()
+    for model in ("seq-router:latest", "seq-chat:latest"):
+        service.ping(model)
+    sequential_ms = (time.perf_counter() - start) * 1000
+    results.append(("sequential warm", sequential_ms, first_token_ms(app, "seq-chat:latest")))
+
+    app.config.update(router_model="router:latest", chat_model="chat:latest")
+    service.start()
+    results.append(("parallel warm", wait_for_warmup(service), first_token_ms(app, "chat:latest")))
+
+    idle = args.keep_alive * 1.5
+    time.sleep(idle)
+    results.append(("idle, no ping", None, first_token_ms(app, "chat:latest")))
+
+    app.config["model_warmup"]["heartbeat"] = True
+    time.sleep(idle)
+    results.append(("idle, heartbeat", None, first_token_ms(app, "chat:latest")))
+    service.stop()
+
+    print(f"\nSimulated load {args.load_ms:g} ms, keep_alive {args.keep_alive:g} s, idle periods {idle:g} s\n")
+    print(f"{'scenario':<18} {'warm-up ms':>10} {'TTFT ms':>9}")
+    for name, warmup_ms, ttft in results:
+        warmup = f"{warmup_ms:.0f}" if warmup_ms is not None else "-"
+        print(f"{name:<18} {warmup:>10} {ttft:>9.0f}")
+    print()
+    print(ai_logic.get_ollama_client(app).load_stats_line())
+    print(service.stats_line())
+    print(f"Stub: {server.model_loads} model loads")
+    ai_logic.get_ollama_client(app).shutdown()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# benchmarks/bench_ollama_client.py
+"""
+Shows connection reuse in the shared OllamaClient against a local stub server:
+the same sequence of chat / streaming requests is sent with bare requests.post
+calls (the old code path) and through one OllamaClient, and the TCP connections
+the server accepted are counted for each.
+
+Then shows mid-stream cancellation: a long stream is consumed the old way
+(break out of the loop) and with OllamaClient.cancel(), and the tokens the
+server still had to produce after the consumer stopped are compared.
+
+Run from the repository root:  python benchmarks/bench_ollama_client.py [requests]
+"""
+import os
+import json
+import statistics
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ollama_client import OllamaClient
+from ollama_stub import OllamaStubServer
+
+CHAT_PAYLOAD = {"model": "stub:latest", "messages": [{"role": "user", "content": "hello"}], "stream": False}
+STREAM_PAYLOAD = {"model": "stub:latest", "prompt": "hello", "stream": True}
+
+
+def bare_requests(base_url, count):
+    """What ai_logic did before: a new requests.post (and TCP connection) per call."""
+    timings = []
+    for i in range(count):
+        start = time.perf_counter()
+        if i % 2 == 0:
+            with requests.post(f"{base_url}/api/chat", json=CHAT_PAYLOAD, stream=False, timeout=120) as response:
+                response.json()
+        else:
+            with requests.post(f"{base_url}/api/generate", json=STREAM_PAYLOAD, stream=True, timeout=120) as response:
+                for line in response.iter_lines():
+                    if line: json.loads(line)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def shared_client(client, count):
+    timings = []
+    for i in range(count):
+        start = time.perf_counter()
+        if i % 2 == 0:
+            client.post_json("/api/chat", CHAT_PAYLOAD)
+        else:
+            for _ in client.stream("/api/generate", STREAM_PAYLOAD):
+                pass
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def cancellation(server, client, stop_after=5):
+    """Returns (tokens the old code path left generating, ms OllamaClient.cancel took to close the stream)."""
+    server.reply = " ".join(f"token{i}" for i in range(400))
+    server.reset_counters()
+
+    # Old path: _execute_command_task breaks out of the loop but still holds `response_stream`,
+    # so the connection stays open (and the model keeps generating) until the task returns.
+    response = requests.post(f"{server.base_url}/api/generate", json=STREAM_PAYLOAD, stream=True, timeout=120)
+    lines = response.iter_lines()
+    for i, line in enumerate(lines):
+        if i >= stop_after: break
+    time.sleep(0.5)
+    still_generating = server.aborted_streams == 0
+    lines.close()
+    response.close()
+    deadline = time.perf_counter() + 5
+    while server.aborted_streams == 0 and time.perf_counter() < deadline:
+        time.sleep(0.01)  # Let the old stream's handler notice before resetting the counters
+
+    # OllamaClient: cancel() from another thread, as the stop button does.
+    server.reset_counters()
+    start = None
+    for i, _ in enumerate(client.stream("/api/generate", STREAM_PAYLOAD)):
+        if i + 1 == stop_after:
+            start = time.perf_counter()
+            client.cancel("interactive")
+    while server.aborted_streams == 0 and time.perf_counter() - start < 5:
+        time.sleep(0.001)
+    cancel_ms = (time.perf_counter() - start) * 1000
+    return still_generating, cancel_ms, server.tokens_after_abort
+
+
+def main(count=40):
+    server = OllamaStubServer().start()
+    print(f"Stub Ollama server on {server.base_url}, {count} requests per run\n")
+
+    runs = {}
+    runs["bare requests.post"] = (bare_requests(server.base_url, count), server.connections)
+    server.reset_counters()
+
+    client = OllamaClient({"base_url": server.base_url})
+    runs["OllamaClient"] = (shared_client(client, count), server.connections)
+
+    for label, (timings, connections) in runs.items():
+        print(f"{label:<20} {connections:3d} TCP connections   "
+              f"mean {statistics.mean(timings):6.1f} ms   median {statistics.median(timings):6.1f} ms")
+    print(f"\nClient-side view: {client.connections_opened()} connection(s) opened")
+    print(client.stats_line())
+
+    still_generating, cancel_ms, tokens_saved = cancellation(server, client)
+    print(f"\nBreaking out of a held requests stream: server {'still generating' if still_generating else 'stopped'} 0.5 s later")
+    print(f"OllamaClient.cancel(): server saw the disconnect after {cancel_ms:.0f} ms, "
+          f"{tokens_saved} of 400 tokens never generated")
+    client.shutdown()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 40)
@@ -0,0 +1,135 @@
+# benchmarks/bench_router_prompt.py
+"""
+Compares the Router AI prompt before and after top-k tool retrieval:
+the old prompt (every tool as indented JSON, user request inlined) against the
+compact prompt listing only the k tools closest to the utterance.
+
+Prompt size is always reported (characters and a ~4 chars/token estimate).
+With Ollama running, each prompt is also sent to the router model and the
+real prompt token count (prompt_eval_count) and latency are reported.
+
+Run from the repository root:
+    python benchmarks/bench_router_prompt.py [router_model] [top_k]
+"""
+import os
+import json
+import statistics
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ai_logic
+from command_handler import CommandHandler
+
+OLLAMA_CHAT_URL = "http://localhost:11434/api/chat"
+
+UTTERANCES = [
+    "what's the weather like in tokyo right now", "could you turn the volume down to 20",
+    "remind me to call mom in 15 minutes", "look up the stock price of microsoft",
+    "find me a recipe for banana bread", "what movies has christopher nolan directed",
+    "take a screenshot of my screen", "add buy milk to my to-do list",
+    "what's on my calendar today", "translate good morning into spanish",
+    "how long until christmas", "tell me something funny",
+]
+
+
+class _BenchApp:
+    """Minimal stand-in for AURAApp: just enough for CommandHandler and the semantic router."""
+    def __init__(self, top_k):
+        self.config = {"enabled_skills": {}, "router_tool_retrieval": {"enabled": True, "top_k": top_k}}
+
+    def queue_log(self, message, level='INFO', progress_percent=None):
+        if level in ("ERROR", "WARNING"):
+            print(f"[{level}] {message.splitlines()[0]}")
+
+
+def legacy_system_prompt(available_tools, user_prompt):
+    """The Router system prompt as get_tool_decision built it before tool retrieval."""
+    return f"""You are a highly specialized AI that routes a user's request to the correct tool. Your ONLY job is to respond with a JSON object. Do not add any other text.
+
+Your JSON response MUST contain two keys: 'tool_name' and 'parameters'.
+
+1.  Analyze the user's request to see if it matches any of the available tools.
+2.  If it matches a tool, provide the tool's name in the 'tool_name' field and extract any necessary arguments into the 'parameters' field.
+3.  If the request is general conversation (e.g., "hello", "thank you") or does not match any tool, you MUST set the 'tool_name' field to null.
+
+# AVAILABLE TOOLS:
+{json.dumps(available_tools, indent=2)}
+
+# User's Request:
+{user_prompt}
+
+# RESPONSE (JSON only):
+"""
+
+
+def ask_router(model, system_prompt, utterance):
+    """Returns (prompt tokens, wall-clock ms, tool_name) or None if Ollama is not reachable."""
+    payload = {
+        "model": model, "stream": False, "format": "json", "options": {"temperature": 0.0},
+        "messages": [{"role": "system", "content": system_prompt}, {"role": "user", "content": utterance}],
+    }
+    start = time.perf_counter()
+    try:
+        response = requests.post(OLLAMA_CHAT_URL, json=payload, timeout=300)
+        response.raise_for_status()
+    except requests.RequestException:
+        return None
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    data = response.json()
+    try:
+        tool_name = json.loads(data.get("message", {}).get("content", "")).get("tool_name")
+    except (json.JSONDecodeError, AttributeError):
+        tool_name = None
+    return data.get("prompt_eval_count", 0), elapsed_ms, tool_name
+
+
+def _summary(label, values, unit):
+    print(f"  {label:<9} mean {statistics.mean(values):8.0f} {unit}   median {statistics.median(values):8.0f} {unit}")
+
+
+def main(model="nexusraven:latest", top_k=8):
+    ai_logic.load_embedding_model(print)
+    app = _BenchApp(top_k)
+    handler = CommandHandler(app)
+    all_tools = handler.get_tools_for_ai()
+    router = handler.semantic_router
+    print(f"{len(all_tools)} tools registered, top_k={top_k}, {len(UTTERANCES)} utterances\n")
+
+    prompts = []
+    for utterance in UTTERANCES:
+        subset = router.select_tools(utterance, all_tools)
+        prompts.append((utterance, legacy_system_prompt(all_tools, utterance), ai_logic.get_router_system_prompt(subset)))
+
+    print("Prompt size (characters, ~tokens at 4 chars/token):")
+    before = [len(old) for _, old, _ in prompts]
+    after = [len(new) for _, _, new in prompts]
+    print(f"  before    {statistics.mean(before):8.0f} chars  ~{statistics.mean(before) / 4:6.0f} tokens")
+    print(f"  after     {statistics.mean(after):8.0f} chars  ~{statistics.mean(after) / 4:6.0f} tokens")
+    print(f"  prompt cache: {ai_logic._build_router_system_prompt.cache_info()}\n")
+
+    if ask_router(model, "Reply with {}.", "ping") is None:
+        print(f"Ollama not reachable at {OLLAMA_CHAT_URL}; skipping latency measurements.")
+        return
+
+    results = {"before": [], "after": []}
+    for utterance, old, new in prompts:
+        results["before"].append(ask_router(model, old, utterance))
+        results["after"].append(ask_router(model, new, utterance))
+        print(f"  {utterance[:40]:<40} before -> {results['before'][-1][2]}, after -> {results['after'][-1][2]}")
+
+    for label, runs in results.items():
+        runs = [run for run in runs if run is not None]
+        if not runs:
+            continue
+        print(f"\n{label} ({model}):")
+        _summary("tokens", [run[0] for run in runs], "tok")
+        _summary("latency", [run[1] for run in runs], "ms ")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "nexusraven:latest",
+         int(sys.argv[2]) if len(sys.argv) > 2 else 8)
@@ -0,0 +1,207 @@
+# benchmarks/ollama_stub.py
+"""
+A tiny in-process stand-in for the Ollama HTTP API, for benchmarks.
+Speaks HTTP/1.1 keep-alive and counts the TCP connections it accepts, so a
+benchmark can tell whether a client reuses its connection.
+
+Supports /api/tags, /api/chat and /api/generate (streaming or not). Responses
+carry Ollama's eval counters so clients can compute tokens/sec.
+
+Requests with "format": "json" are treated as Router AI calls and answered
+from scripted rules: the first rule whose pattern matches the last user
+message gives the decision, else no tool. Token rate and first-token delay
+are configurable separately for router and chat replies.
+
+With load_delay set, a request whose model isn't loaded waits that long
+first and reports it as load_duration, like a cold Ollama. A model stays
+loaded for model_ttl seconds after its last request (None: forever).
+
+fail_next(count, status) answers the next `count` POSTs with an error
+status (e.g. 503 while Ollama is still starting), to exercise retries.
+"""
+import re
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like Ollama
+    disable_nagle_algorithm = True  # Small streamed chunks must not wait for delayed ACKs
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, body, status=200):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # Client cancelled the request
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": "stub:latest"}]})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        is_chat = self.path == "/api/chat"
+        is_router = payload.get("format") == "json"
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.router_requests += is_router
+            failing = self.server.failures > 0
+            self.server.failures -= failing
+        if failing:
+            self._send_json({"error": "stub failure"}, status=self.server.failure_status)
+            return
+        load_seconds = self.server.load_model(payload.get("model"))
+        time.sleep(load_seconds)
+
+        if not payload.get("messages") and not payload.get("prompt"):
+            # Empty request: Ollama just loads the model (warm-up / keep-alive ping).
+            self._send_json({"model": payload.get("model"), "done": True, "done_reason": "load",
+                             "load_duration": int(load_seconds * 1e9)})
+            return
+
+        if is_router:
+            text = json.dumps(self.server.route(payload))
+            tokens = [text[i:i + 4] for i in range(0, len(text), 4)]  # JSON streams in small pieces
+            first_token_delay, token_delay = self.server.router_first_token_delay, self.server.router_token_delay
+        else:
+            text = self.server.reply
+            tokens = [token if i == 0 else " " + token for i, token in enumerate(text.split(" "))]
+            first_token_delay, token_delay = self.server.first_token_delay, self.server.token_delay
+        prompt_chars = len(json.dumps(payload.get("messages") or payload.get("prompt")))
+        counters = {
+            "done": True, "load_duration": int(load_seconds * 1e9), "prompt_eval_count": prompt_chars // 4, "eval_count": len(tokens),
+            "eval_duration": int(len(tokens) * token_delay * 1e9),
+        }
+        time.sleep(first_token_delay)
+
+        if not payload.get("stream", True):
+            time.sleep(len(tokens) * token_delay)
+            body = {"message": {"role": "assistant", "content": text}} if is_chat else {"response": text}
+            self._send_json({**body, **counters})
+            return
+
+        # Streaming: newline-delimited JSON over chunked transfer encoding.
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, token in enumerate(tokens):
+            body = {"message": {"role": "assistant", "content": token}} if is_chat else {"response": token}
+            try:
+                self._write_chunk(json.dumps({**body, "done": False}) + "\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # The client hung up mid-stream; a real Ollama server stops generating here.
+                with self.server.lock:
+                    self.server.aborted_streams += 1
+                    self.server.tokens_after_abort += len(tokens) - i
+                self.close_connection = True
+                return
+            time.sleep(token_delay)
+        final = {"message": {"role": "assistant", "content": ""}} if is_chat else {"response": ""}
+        try:
+            self._write_chunk(json.dumps({**final, **counters}) + "\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # Hung up after the last token (e.g. the router's JSON was complete)
+
+    def _write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+class OllamaStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, reply="This is a stub reply from the mock Ollama server.", first_token_delay=0.02, token_delay=0.005,
+                 router_rules=None, router_first_token_delay=None, router_token_delay=None, load_delay=0.0, model_ttl=None):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.reply = reply
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.router_first_token_delay = first_token_delay if router_first_token_delay is None else router_first_token_delay
+        self.router_token_delay = token_delay if router_token_delay is None else router_token_delay
+        self.router_rules = []  # [(compiled pattern, decision)]
+        for pattern, tool_name, parameters in router_rules or []:
+            self.script_router(pattern, tool_name, parameters)
+        self.load_delay = load_delay
+        self.model_ttl = model_ttl
+        self.loaded = {}  # model -> (monotonic time it is ready, time it unloads or None)
+        self.model_loads = 0
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.router_requests = 0
+        self.aborted_streams = 0
+        self.tokens_after_abort = 0  # Tokens that were never generated thanks to the client disconnecting
+        self.failures = 0           # POSTs still to be answered with failure_status
+        self.failure_status = 503
+
+    @staticmethod
+    def token_delay_for(tokens_per_sec):
+        return 1.0 / tokens_per_sec if tokens_per_sec else 0.0
+
+    def script_router(self, pattern, tool_name, parameters=None):
+        """Router calls whose last user message matches `pattern` (case-insensitive) get this decision."""
+        self.router_rules.append((re.compile(pattern, re.IGNORECASE), {"tool_name": tool_name, "parameters": parameters or {}}))
+
+    def fail_next(self, count, status=503):
+        """Answers the next `count` POST requests with `status` instead of a reply."""
+        with self.lock:
+            self.failures = count
+            self.failure_status = status
+
+    def load_model(self, model):
+        """Seconds a request must wait for its model (0 if loaded). Every request restarts the model's TTL."""
+        with self.lock:
+            now = time.monotonic()
+            ready_at, unload_at = self.loaded.get(model, (None, 0.0))
+            if ready_at is None or (unload_at is not None and now >= unload_at):
+                ready_at = now + self.load_delay
+                self.model_loads += 1
+            unload_at = None if self.model_ttl is None else max(now, ready_at) + self.model_ttl
+            self.loaded[model] = (ready_at, unload_at)
+            return max(0.0, ready_at - now)
+
+    def route(self, payload):
+        messages = payload.get("messages") or [{"role": "user", "content": payload.get("prompt", "")}]
+        utterance = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+        for pattern, decision in self.router_rules:
+            if pattern.search(utterance):
+                return decision
+        return {"tool_name": None, "parameters": {}}
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def reset_counters(self):
+        with self.lock:
+            self.connections = 0
+            self.requests = 0
+            self.router_requests = 0
+            self.aborted_streams = 0
+            self.tokens_after_abort = 0
+            self.model_loads = 0
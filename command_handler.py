@@ -1,61 +1,259 @@
 # command_handler.py
-import re
 import traceback
 import os
-import importlib
-import inspect # <-- Make sure this import is present
+import time
+import threading
+import socket
+from semantic_router import SemanticRouter
+from router_cache import RouterDecisionCache, hash_tool_schema
+from skill_manifest import SkillManifest
+from skill_dispatcher import SkillDispatcher
+from skill_executor import SkillExecutor, SkillTimeoutError, SkillCancelledError
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+
+
+class SkillFileWatcher(FileSystemEventHandler):
+    """Watchdog handler that hot-reloads a single skill module when its file changes."""
+    DEBOUNCE_SECONDS = 0.5  # Editors often emit several events for one save
+
+    def __init__(self, command_handler):
+        self.handler = command_handler
+        self.timers = {}
+        self.lock = threading.Lock()
+
+    def _schedule(self, path):
+        filename = os.path.basename(path)
+        if not filename.endswith(".py") or filename.startswith("__"):
+            return
+        with self.lock:
+            timer = self.timers.pop(filename, None)
+            if timer: timer.cancel()
+            timer = threading.Timer(self.DEBOUNCE_SECONDS, self._fire, args=(filename,))
+            timer.daemon = True
+            self.timers[filename] = timer
+            timer.start()
+
+    def _fire(self, filename):
+        with self.lock:
+            self.timers.pop(filename, None)
+        self.handler.reload_skill(filename)
+
+    def on_modified(self, event):
+        if not event.is_directory: self._schedule(event.src_path)
+
+    def on_created(self, event):
+        if not event.is_directory: self._schedule(event.src_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory: self._schedule(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._schedule(event.src_path)
+            self._schedule(event.dest_path)
+
 
 class CommandHandler:
     def __init__(self, app_controller):
         self.app = app_controller
         self.log = self.app.queue_log
+        self.skills_dir = "skills"
         self.command_map = {}
+        self.skill_commands = {}   # skill filename -> its register() entries, in load order
+        self.tool_schemas = {}     # tool name -> (cmd_data, tool_info) for get_tools_for_ai
+        self.dispatcher = SkillDispatcher({})
+        self.semantic_router = SemanticRouter(self.app)
+        self.router_cache = RouterDecisionCache()
+        self.tool_schema_hash = None
+        self.manifest = SkillManifest(self.skills_dir, self.log)
+        self.executor = SkillExecutor(self.app, self.log)
+        self.reload_lock = threading.Lock()
+        self.skill_observer = None
         self._load_skills()
 
+    def _skill_files(self):
+        return [f for f in os.listdir(self.skills_dir) if f.endswith(".py") and not f.startswith("__")]
+
+    def _load_skill_file(self, filename):
+        """Returns a skill file's command entries, or an empty dict if it fails to load."""
+        try:
+            return self.manifest.get_commands(filename)
+        except Exception as e:
+            self.log(f"ERROR loading skill '{filename[:-3]}': {e}\n{traceback.format_exc()}", "ERROR")
+            return {}
+
     def _load_skills(self):
-        """Loads all skills and their regex commands from the skills directory."""
+        """
+        Loads all skills and their regex commands from the skills directory.
+        Unchanged skills are served from the generated manifest and are only imported
+        the first time one of their handlers runs.
+        """
         self.log("Loading skill commands for Hybrid Engine...")
-        self.command_map.clear()
-        skills_dir = "skills"
+        start = time.perf_counter()
         enabled_skills = self.app.config.get("enabled_skills", {})
 
-        for filename in os.listdir(skills_dir):
-            if filename.endswith(".py") and not filename.startswith("__"):
-                if not enabled_skills.get(filename, True):
-                    continue
-                
-                skill_name = filename[:-3]
-                module_name = f"skills.{skill_name}"
-                try:
-                    skill_module = importlib.import_module(module_name)
-                    importlib.reload(skill_module)
-                    if hasattr(skill_module, 'register'):
-                        self.command_map.update(skill_module.register())
-                except Exception as e:
-                    self.log(f"ERROR loading skill '{skill_name}': {e}\n{traceback.format_exc()}", "ERROR")
-        self.log("Hybrid Engine regex commands loaded.")
-
-    # --- THIS IS THE CORRECTED METHOD ---
+        with self.reload_lock:
+            skill_files = self._skill_files()
+            self.manifest.prune(skill_files)
+
+            skill_commands = {}
+            for filename in skill_files:
+                if enabled_skills.get(filename, True):
+                    skill_commands[filename] = self._load_skill_file(filename)
+            self.manifest.save()
+            self.log(f"Skill metadata loaded in {(time.perf_counter() - start) * 1000:.0f} ms. {self.manifest.timings_line()}")
+
+            self._publish(skill_commands, affected_tools=None)
+        self.log(f"Hybrid Engine regex commands loaded ({len(self.dispatcher.entries)} patterns compiled).")
+
+    def reload_skill(self, filename):
+        """
+        Re-registers a single skill file (edited, added, deleted or toggled) and swaps its
+        entries into the live command map. Other skills keep their compiled state and caches.
+        """
+        enabled = self.app.config.get("enabled_skills", {}).get(filename, True)
+        exists = os.path.exists(os.path.join(self.skills_dir, filename))
+
+        with self.reload_lock:
+            skill_commands = dict(self.skill_commands)
+            old_names = set(skill_commands.pop(filename, {}).keys())
+
+            if exists and enabled:
+                skill_commands[filename] = self._load_skill_file(filename)
+            if not exists:
+                self.manifest.prune(self._skill_files())
+            self.manifest.save()
+
+            new_names = set(skill_commands.get(filename, {}).keys())
+            self._publish(skill_commands, affected_tools=old_names | new_names)
+
+        action = "Reloaded" if exists and enabled else "Unloaded"
+        self.log(f"{action} skill '{filename[:-3]}' ({len(new_names)} commands).")
+
+    def apply_enabled_skills(self, old_enabled, new_enabled):
+        """Loads or unloads only the skills whose enabled toggle changed."""
+        for filename in self._skill_files():
+            if old_enabled.get(filename, True) != new_enabled.get(filename, True):
+                self.reload_skill(filename)
+
+    def _publish(self, skill_commands, affected_tools):
+        """
+        Builds the command map, dispatcher index and tool schemas for a set of skills, then swaps
+        them in. Commands already running keep the objects they started with, so nothing blocks.
+        `affected_tools` limits cache invalidation; None means everything changed.
+        """
+        command_map = {}
+        for filename in self._ordered(skill_commands):
+            command_map.update(skill_commands[filename])
+
+        dispatcher = SkillDispatcher(command_map, self.log)
+        tool_schemas = self._build_tool_schemas(command_map)
+        tools = [tool_info for _, tool_info in tool_schemas.values() if tool_info is not None]
+
+        try:
+            self.semantic_router.rebuild(command_map, tools)
+        except Exception as e:
+            self.log(f"ERROR building semantic router index: {e}\n{traceback.format_exc()}", "ERROR")
+
+        # --- The swap: plain attribute assignment, readers never see a half-built index ---
+        self.skill_commands = skill_commands
+        self.command_map = command_map
+        self.dispatcher = dispatcher
+        self.tool_schemas = tool_schemas
+
+        # Cached Router AI decisions are only valid for the tool schema they were made against.
+        cache_settings = self.app.config.get("router_cache", {})
+        self.router_cache.configure(cache_settings.get("max_entries", 256), cache_settings.get("ttl_seconds", 600))
+        schema_hash = hash_tool_schema(tools)
+        if affected_tools is None:
+            if self.tool_schema_hash is not None and schema_hash != self.tool_schema_hash:
+                self.log("Tool schema changed. Router decision cache cleared.")
+                self.router_cache.clear()
+        else:
+            dropped = self.router_cache.rekey(self.tool_schema_hash, schema_hash, affected_tools)
+            if dropped:
+                self.log(f"Dropped {dropped} cached Router decisions for reloaded tools.")
+            dropped = self.executor.result_cache.invalidate(affected_tools)
+            if dropped:
+                self.log(f"Dropped {dropped} cached results of reloaded skills.")
+        self.tool_schema_hash = schema_hash
+
+    def _ordered(self, skill_commands):
+        """Skill files in directory order, so later files override duplicate command names as before."""
+        order = {filename: i for i, filename in enumerate(self._skill_files())}
+        return sorted(skill_commands, key=lambda filename: order.get(filename, len(order)))
+
+    def _build_tool_schemas(self, command_map):
+        """Router AI tool schemas, reusing the cached schema of every command whose entry is unchanged."""
+        tool_schemas = {}
+        for name, data in command_map.items():
+            cached = self.tool_schemas.get(name)
+            if cached is not None and cached[0] is data:
+                tool_schemas[name] = cached
+            else:
+                tool_schemas[name] = (data, self._tool_info(name, data))
+        return tool_schemas
+
+    def start_skill_watcher(self):
+        """Watches the skills directory and hot-reloads only the skill files that change."""
+        if self.skill_observer and self.skill_observer.is_alive(): return
+        self.skill_observer = Observer()
+        self.skill_observer.schedule(SkillFileWatcher(self), self.skills_dir, recursive=False)
+        self.skill_observer.daemon = True
+        self.skill_observer.start()
+        self.log(f"Skill hot-reload watcher started on: {os.path.abspath(self.skills_dir)}")
+
+    def stop_skill_watcher(self):
+        if self.skill_observer and self.skill_observer.is_alive():
+            self.skill_observer.stop()
+            self.skill_observer.join(timeout=1)
+        self.skill_observer = None
+
+    @staticmethod
+    def _tool_info(name, data):
+        """Formats one command as a Router AI tool, or None if it has no description."""
+        # Only expose skills that have a description for the AI to understand
+        if not data.get('description'):
+            return None
+        tool_info = {
+            "name": name,
+            "description": data['description'],
+            "parameters": {
+                "type": "object",
+                "properties": {param: {"type": "string"} for param in data.get('params', [])}
+            }
+        }
+        # If there are parameters, specify which are required.
+        if data.get('params'):
+            tool_info["parameters"]["required"] = data.get('params', [])
+        return tool_info
+
+    def warm_skill(self, name):
+        """
+        Prepares a tool the Router AI has just named, while its parameters are still streaming:
+        imports a lazily loaded skill module and resolves the hosts it declares in 'warm_hosts'.
+        Runs on a daemon thread; failures are ignored, the real call will report them.
+        """
+        cmd_data = self.command_map.get(name)
+        if not cmd_data:
+            return
+        def warm():
+            start = time.perf_counter()
+            try:
+                resolve = getattr(cmd_data['handler'], 'resolve', None)
+                if resolve: resolve()
+                for host in cmd_data.get('warm_hosts', []):
+                    socket.getaddrinfo(host, 443, proto=socket.IPPROTO_TCP)
+            except Exception as e:
+                self.log(f"Warm-up of '{name}' failed (ignored): {e}", "WARNING")
+                return
+            self.log(f"Warmed up skill '{name}' in {(time.perf_counter() - start) * 1000:.0f} ms.")
+        threading.Thread(target=warm, name=f"warm-{name}", daemon=True).start()
+
     def get_tools_for_ai(self):
         """Generates a list of all available skills formatted as tools for the AI."""
-        tools = []
-        for name, data in self.command_map.items():
-            # Only expose skills that have a description for the AI to understand
-            if data.get('description'):
-                tool_info = {
-                    "name": name,
-                    "description": data['description'],
-                    "parameters": {
-                        "type": "object",
-                        "properties": {param: {"type": "string"} for param in data.get('params', [])}
-                    }
-                }
-                # If there are parameters, specify which are required.
-                if data.get('params'):
-                    tool_info["parameters"]["required"] = data.get('params', [])
-                
-                tools.append(tool_info)
-        return tools
+        return [tool_info for _, tool_info in self.tool_schemas.values() if tool_info is not None]
 
     def handle(self, command, attached_file=None):
         """
@@ -63,29 +261,32 @@ class CommandHandler:
         Returns a response string if a match is found, otherwise returns None.
         """
         command_lower = command.lower().strip()
-        
-        for cmd_name in sorted(self.command_map.keys()):
-            cmd_data = self.command_map[cmd_name]
-            regex_pattern = cmd_data.get('regex')
-            
-            if not regex_pattern:
-                continue
+        dispatcher = self.dispatcher
+
+        start = 0
+        while True:
+            result = dispatcher.match(command_lower, start)
+            if result is None:
+                return None
+            position, cmd_name, cmd_data, groups = result
 
             try:
-                if re.match(r'^\s*' + regex_pattern.lstrip('^'), command_lower, re.IGNORECASE):
-                    self.log(f"Hybrid Engine: Direct regex match found for skill '{cmd_name}'.")
-                    
-                    handler_func = cmd_data['handler']
-                    param_names = cmd_data.get('params', [])
-                    
-                    match = re.search(regex_pattern, command_lower, re.IGNORECASE)
-                    kwargs = {name: match.group(i + 1) for i, name in enumerate(param_names)}
-                    kwargs['command'] = command
-                    kwargs['attached_file'] = attached_file
-                    
-                    return handler_func(self.app, **kwargs)
+                self.log(f"Hybrid Engine: Direct regex match found for skill '{cmd_name}'.")
+
+                param_names = cmd_data.get('params', [])
+                kwargs = {name: groups[i] for i, name in enumerate(param_names)}
+                kwargs['command'] = command
+                kwargs['attached_file'] = attached_file
+
+                result = self.executor.run(cmd_name, cmd_data, kwargs)
+                if isinstance(result, dict) and 'error' in result:
+                    return result['error']  # Structured errors are spoken as-is
+                return result
+            except SkillTimeoutError:
+                return self.executor.fallback_message(cmd_name, cmd_data)
+            except SkillCancelledError:
+                return ""
             except Exception as e:
                 self.log(f"ERROR executing regex-matched skill '{cmd_name}': {e}\n{traceback.format_exc()}", "ERROR")
-                continue
-        
-        return None
\ No newline at end of file
+                # Same as before: a failing skill falls through to the next matching one.
+                start = position + 1
@@ -0,0 +1,143 @@
+# command_queue.py
+import heapq
+import itertools
+import threading
+import time
+import traceback
+
+from router_cache import normalize_utterance
+
+# Lower runs first. User input always outranks background sources.
+SOURCE_PRIORITIES = {
+    "user": 0,          # Voice and chat input
+    "routine": 1,       # Steps queued by a running routine
+    "reminder": 2,      # Scheduled reminders
+    "file_watcher": 3,  # "New file detected" announcements
+}
+
+
+class CommandScheduler:
+    """
+    Bounded priority queue of commands and announcements, drained by a single worker thread.
+    - Duplicates of a waiting item (or of the running one, within a short window) are coalesced.
+    - When full, the least urgent item is dropped to make room for a more urgent one.
+    - Optionally, user input preempts a running interaction from a lower-priority source.
+    """
+    def __init__(self, app_controller, execute_callback):
+        self.app = app_controller
+        self.log = self.app.queue_log
+        self.execute = execute_callback  # execute(text, attached_file) runs one command to completion
+        self.heap = []                   # [priority, seq, item]
+        self.seq = itertools.count()
+        self.condition = threading.Condition()
+        self.current = None
+        self.worker = None
+        self.is_running = True
+        self.stats = {"executed": 0, "coalesced": 0, "dropped": 0, "preempted": 0}
+        self.total_wait_ms = 0.0
+
+    def _settings(self):
+        settings = self.app.config.get("command_queue", {})
+        return (
+            max(1, int(settings.get("max_size", 16))),
+            settings.get("preempt", True),
+            float(settings.get("coalesce_window", 2.0)),
+        )
+
+    @staticmethod
+    def _key(kind, text, attached_file):
+        return (kind, normalize_utterance(text), attached_file or None)
+
+    def submit(self, text, source="user", attached_file=None, kind="command"):
+        """Queues a command (or an announcement to speak). Returns False if it was dropped or coalesced."""
+        max_size, preempt, coalesce_window = self._settings()
+        priority = SOURCE_PRIORITIES.get(source, SOURCE_PRIORITIES["user"])
+        key = self._key(kind, text, attached_file)
+        item = {"kind": kind, "text": text, "attached_file": attached_file, "source": source,
+                "key": key, "priority": priority, "enqueued_at": time.monotonic()}
+
+        with self.condition:
+            current = self.current
+            if current and current["key"] == key and time.monotonic() - current["started_at"] <= coalesce_window:
+                self.stats["coalesced"] += 1
+                self.log(f"Command queue: '{text}' is already running. Ignoring the duplicate.")
+                return False
+            for entry in self.heap:
+                if entry[2]["key"] == key:
+                    if priority < entry[0]:
+                        entry[0] = entry[2]["priority"] = priority
+                        heapq.heapify(self.heap)
+                    self.stats["coalesced"] += 1
+                    self.log(f"Command queue: '{text}' is already queued. Coalesced.")
+                    return False
+
+            if len(self.heap) >= max_size:
+                worst = max(self.heap)
+                if worst[0] <= priority:
+                    self.stats["dropped"] += 1
+                    self.log(f"Command queue full ({max_size}). Dropping '{text}' from {source}.", "WARNING")
+                    return False
+                self.heap.remove(worst)
+                heapq.heapify(self.heap)
+                self.stats["dropped"] += 1
+                self.log(f"Command queue full ({max_size}). Dropped '{worst[2]['text']}' for '{text}'.", "WARNING")
+
+            heapq.heappush(self.heap, [priority, next(self.seq), item])
+            self._ensure_worker()
+            self.condition.notify()
+            # Signalled while still holding the condition `current` was read under: the worker can't
+            # finish it and start the next item (which clears the stop event) in between, so the stop
+            # lands on `current` and never on the command that preempts it.
+            should_preempt = preempt and current is not None and priority < current["priority"]
+            if should_preempt:
+                self.stats["preempted"] += 1
+                self.log(f"Command queue: '{text}' preempts '{current['text']}' ({current['source']}).")
+                self.app.signal_stop()
+
+        if should_preempt:
+            # Queued on the Tk thread ahead of anything the preempting command will say.
+            self.app.root.after(0, self.app.stop_speech_and_idle)
+        return True
+
+    def _ensure_worker(self):
+        if self.worker is None or not self.worker.is_alive():
+            self.worker = threading.Thread(target=self._worker_loop, name="command-worker", daemon=True)
+            self.worker.start()
+
+    def _worker_loop(self):
+        while True:
+            with self.condition:
+                while not self.heap and self.is_running:
+                    self.condition.wait()
+                if not self.is_running:
+                    return
+                _, _, item = heapq.heappop(self.heap)
+                item["started_at"] = time.monotonic()
+                self.current = item
+                self.total_wait_ms += (item["started_at"] - item["enqueued_at"]) * 1000
+
+            try:
+                if item["kind"] == "announcement":
+                    self.app.root.after(0, self.app.speak_response, item["text"])
+                else:
+                    self.execute(item["text"], item["attached_file"])
+            except Exception as e:
+                self.log(f"Command worker error: {e}\n{traceback.format_exc()}", "ERROR")
+            finally:
+                with self.condition:
+                    self.current = None
+                    self.stats["executed"] += 1
+
+    def shutdown(self):
+        with self.condition:
+            self.is_running = False
+            self.heap.clear()
+            self.condition.notify_all()
+
+    def stats_line(self):
+        with self.condition:
+            waiting = len(self.heap)
+        executed = self.stats["executed"]
+        avg_wait = self.total_wait_ms / executed if executed else 0.0
+        return (f"Command queue: {waiting} waiting, {executed} run (avg wait {avg_wait:.0f} ms), "
+                f"{self.stats['coalesced']} coalesced, {self.stats['dropped']} dropped, {self.stats['preempted']} preempted")
@@ -0,0 +1,12 @@
+# connectivity.py
+import socket
+
+def is_online(log_callback=None):
+    """Checks for a live internet connection."""
+    try:
+        socket.create_connection(("8.8.8.8", 53), timeout=3)
+        if log_callback: log_callback("Connectivity check: Online.")
+        return True
+    except OSError:
+        if log_callback: log_callback("Connectivity check: Offline.")
+        return False
@@ -0,0 +1,152 @@
+# conversation_history.py
+import math
+import threading
+import traceback
+
+CHARS_PER_TOKEN = 4  # Rough average for English text with Llama-family tokenizers
+DEFAULT_SETTINGS = {
+    "router_budget": 512,        # History tokens the Router AI sees
+    "chat_budget": 2048,         # History tokens (summary included) the Chat model sees
+    "max_message_tokens": 768,   # Longer messages (tool dumps, long answers) are clipped when stored
+    "summarize": True,           # Compress evicted turns into a running summary
+}
+
+
+def estimate_tokens(text):
+    """Cheap token estimate; good enough for budgeting without loading a tokenizer."""
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+def messages_tokens(messages):
+    return sum(estimate_tokens(message["content"]) + 4 for message in messages)  # +4 for role/template overhead
+
+
+def clip_text(text, max_tokens):
+    """Keeps the head and tail of an oversized message."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    head = max_chars * 3 // 4
+    tail = max_chars - head
+    return f"{text[:head]}\n[... {len(text) - max_chars} characters omitted ...]\n{text[-tail:]}"
+
+
+class ConversationHistory:
+    """
+    Conversation memory with token budgets instead of a fixed message count.
+    - Messages are clipped to max_message_tokens when stored, so one tool dump can't take over a prompt.
+    - The chat prompt gets the running summary plus the stored turns. When they exceed chat_budget the
+      oldest turns are evicted down to half the budget in one go, so the prompt prefix (and Ollama's
+      cache of it) stays stable between evictions.
+    - Evicted turns are folded into the summary on a background thread, never on the command path.
+    - The router prompt gets only the newest turns that fit router_budget.
+    """
+    def __init__(self, app_controller, summarize_callback):
+        self.app = app_controller
+        self.log = self.app.queue_log
+        self.summarize = summarize_callback  # summarize(previous_summary, messages) -> new summary text
+        self.lock = threading.Lock()
+        self.messages = []
+        self.summary = ""
+        self.pending = []  # Evicted messages not yet folded into the summary
+        self.summarizing = False
+        self.generation = 0  # Bumped by clear() so a running summary is discarded
+
+    def _settings(self):
+        return {**DEFAULT_SETTINGS, **self.app.config.get("conversation_history", {})}
+
+    def __len__(self):
+        return len(self.messages)
+
+    def add_turn(self, user_message, assistant_message):
+        settings = self._settings()
+        max_tokens = settings["max_message_tokens"]
+        with self.lock:
+            self.messages.append({"role": "user", "content": clip_text(user_message, max_tokens)})
+            self.messages.append({"role": "assistant", "content": clip_text(assistant_message, max_tokens)})
+            evicted = self._evict(settings["chat_budget"])
+            if evicted and settings["summarize"]:
+                self.pending.extend(evicted)
+                start_summary = not self.summarizing
+                self.summarizing = True
+            else:
+                start_summary = False
+        if evicted:
+            self.log(f"History over the {settings['chat_budget']}-token chat budget: evicted {len(evicted)} messages "
+                     f"({messages_tokens(evicted)} tokens){' for summarization' if settings['summarize'] else ''}.")
+        if start_summary:
+            threading.Thread(target=self._summarize_pending, name="history-summary", daemon=True).start()
+
+    def _evict(self, budget):
+        """Drops whole turns from the front until history and summary fit half the budget. Caller holds the lock."""
+        summary_tokens = estimate_tokens(self.summary)
+        if summary_tokens + messages_tokens(self.messages) <= budget:
+            return []
+        evicted = []
+        while len(self.messages) > 2 and summary_tokens + messages_tokens(self.messages) > budget // 2:
+            evicted.extend(self.messages[:2])
+            del self.messages[:2]
+        return evicted
+
+    def _summarize_pending(self):
+        while True:
+            with self.lock:
+                batch, self.pending = self.pending, []
+                previous, generation = self.summary, self.generation
+                if not batch:
+                    self.summarizing = False
+                    return
+            try:
+                summary = (self.summarize(previous, batch) or "").strip()
+            except Exception as e:
+                self.log(f"History summarization failed: {e}\n{traceback.format_exc()}", "ERROR")
+                summary = None
+            with self.lock:
+                if generation != self.generation:
+                    continue  # Cleared while summarizing
+                if summary:
+                    self.summary = clip_text(summary, self._settings()["max_message_tokens"])
+            if summary:
+                self.log(f"History summary updated ({estimate_tokens(summary)} tokens, {len(batch)} messages folded in).")
+            else:
+                self.log(f"History summarization returned nothing; {len(batch)} evicted messages were dropped.", "WARNING")
+
+    def chat_messages(self):
+        """History for the Chat model: the running summary (if any) followed by the stored turns."""
+        with self.lock:
+            messages = list(self.messages)
+            summary = self.summary
+        if summary:
+            return [{"role": "system", "content": f"Summary of the earlier conversation: {summary}"}] + messages
+        return messages
+
+    def router_messages(self):
+        """The newest whole turns that fit the router budget."""
+        budget = self._settings()["router_budget"]
+        with self.lock:
+            messages = list(self.messages)
+        used = 0
+        start = len(messages)
+        while start >= 2:
+            turn_tokens = messages_tokens(messages[start - 2:start])
+            if used + turn_tokens > budget:
+                break
+            used += turn_tokens
+            start -= 2
+        return messages[start:]
+
+    def clear(self):
+        with self.lock:
+            self.messages.clear()
+            self.pending.clear()
+            self.summary = ""
+            self.generation += 1
+
+    def stats_line(self):
+        settings = self._settings()
+        with self.lock:
+            history_tokens = messages_tokens(self.messages)
+            summary_tokens = estimate_tokens(self.summary)
+            count = len(self.messages)
+        return (f"History: {count} messages, ~{history_tokens} tokens + {summary_tokens}-token summary "
+                f"(chat budget {settings['chat_budget']}, router budget {settings['router_budget']})")
@@ -194,6 +194,7 @@ class GUI:
         self.mic_level_var = tk.DoubleVar(value=0.0)
         self.meeting_volume_var = tk.DoubleVar(value=0.0)
         self.wakeword_score_var = tk.DoubleVar(value=0.0)
+        self.perf_stats_var = tk.StringVar(value="No activity yet.")
         self.chat_ai_engine_var = tk.StringVar()
         self.stt_engine_var = tk.StringVar()
         self.continuous_listening_var = tk.BooleanVar()
@@ -912,6 +913,10 @@ class GUI:
         self.wakeword_meter = ttk.Progressbar(meter_frame, variable=self.wakeword_score_var, maximum=0.05, style="Accent.Horizontal.TProgressbar")
         self.wakeword_meter.pack(fill="x", expand=True, padx=10, pady=10)
 
+        stats_frame = ttk.Labelframe(view_frame, text="Performance Counters", style='TLabelframe')
+        stats_frame.pack(side="top", fill="x", pady=(0, 10), padx=20)
+        ttk.Label(stats_frame, textvariable=self.perf_stats_var, justify="left", font=("Consolas", 10)).pack(anchor="w", padx=10, pady=5)
+
         logs_container = tk.Frame(view_frame, bg=self.COLOR_CONTENT_BOX)
         logs_container.pack(side="top", expand=True, fill="both", padx=20, pady=(0, 20))
         self.logs_display = tk.Text(logs_container, wrap=tk.WORD, state='disabled', relief="flat", font=("Consolas", 10), bg=self.COLOR_CONTENT_BOX, fg=self.COLOR_FG_MUTED, padx=10, pady=10)
@@ -997,6 +1002,9 @@ class GUI:
             style = "Active.Control.TButton" if is_listening else "Control.TButton"
             self.listen_button.config(style=style)
 
+    def update_perf_stats(self, text):
+        self.perf_stats_var.set(text)
+
     def add_log(self, message):
         if hasattr(self, 'logs_display') and self.logs_display.winfo_exists():
             log_entry = f"[{self.app.get_timestamp()}] {message}\n"
@@ -0,0 +1,306 @@
+# llm_backend.py
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import CancelledError
+
+# Lower is more urgent. Foreground tiers (below BACKGROUND) preempt background requests.
+PRIORITIES = {
+    "interactive": 0,   # Router and chat for the user's current turn
+    "meeting_qna": 0,   # A question typed in the meeting view
+    "speculative": 1,   # Chat answer generated while the Router AI decides
+    "background": 2,    # Meeting summaries, session titles, history summaries, model warm-up
+}
+BACKGROUND = PRIORITIES["background"]
+DEFAULT_MAX_IN_FLIGHT = {"ollama": 2, "gemini": 4}
+DEFAULT_MAX_IDLE_HOLD = 30.0  # Seconds a stream may sit unread while holding a slot others are waiting for
+
+
+class PreemptedError(Exception):
+    """A background stream was cut off by a foreground request after it had already produced output."""
+
+
+class _Ticket:
+    """One admitted (or waiting) request."""
+    def __init__(self, group, seq):
+        self.group = group
+        self.priority = PRIORITIES.get(group, BACKGROUND)
+        self.seq = seq
+        self.tag = f"{group}-{seq}"
+        self.cancel = None  # Set by the backend when the request can be cancelled server-side
+        self.preempted = False
+        self.idle_since = None  # Monotonic time a stream handed out a chunk and the caller hasn't asked for the next
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class RequestScheduler:
+    """
+    Admission control in front of one backend.
+    - At most `max_in_flight` requests run at once; waiting ones start in priority order, then FIFO.
+    - Background requests don't start while a foreground request is running or waiting, and with
+      `preempt_background` a foreground arrival cancels the running ones (the backend retries them).
+    - A stream whose caller stopped reading it (and didn't close it) loses its slot, and is
+      cancelled, once it has sat unread for `max_idle_hold` seconds while others wait.
+    - Records how long each group waited for a slot.
+    """
+    def __init__(self, name, log_callback):
+        self.name = name
+        self.log = log_callback
+        self.condition = threading.Condition()
+        self.waiting = []      # heap of _Ticket
+        self.running = set()
+        self.seq = itertools.count()
+        self.max_in_flight = 1
+        self.preempt_background = True
+        self.max_idle_hold = DEFAULT_MAX_IDLE_HOLD
+        self.waits = {}        # group -> [count, total ms, max ms]
+        self.preemptions = 0
+        self.reclaimed = 0
+
+    def configure(self, max_in_flight, preempt_background=True, max_idle_hold=DEFAULT_MAX_IDLE_HOLD):
+        with self.condition:
+            self.max_in_flight = max(1, int(max_in_flight))
+            self.preempt_background = preempt_background
+            self.max_idle_hold = float(max_idle_hold)
+            self.condition.notify_all()
+
+    def _can_start(self, ticket):
+        """Caller holds the condition."""
+        if len(self.running) >= self.max_in_flight or self.waiting[0] is not ticket:
+            return False
+        return ticket.priority < BACKGROUND or all(t.priority >= BACKGROUND for t in self.running)
+
+    def _preempt_background(self):
+        """Caller holds the condition."""
+        for ticket in self.running:
+            if ticket.priority >= BACKGROUND and ticket.cancel and not ticket.preempted:
+                ticket.preempted = True
+                self.preemptions += 1
+                self.log(f"LLM {self.name}: preempting a background request ({ticket.tag}) for foreground work.")
+                ticket.cancel()
+
+    def _reclaim_idle(self):
+        """Frees the slots of streams nobody has read for max_idle_hold seconds. Caller holds the condition."""
+        now = time.monotonic()
+        for ticket in list(self.running):
+            if ticket.idle_since is not None and now - ticket.idle_since >= self.max_idle_hold:
+                self.running.discard(ticket)
+                self.reclaimed += 1
+                self.log(f"LLM {self.name}: stream {ticket.tag} unread for {now - ticket.idle_since:.0f} s; "
+                         f"taking its slot back (close streams, e.g. `with backend.chat_stream(...) as chunks:`).", "WARNING")
+                if ticket.cancel:
+                    ticket.cancel()
+
+    def acquire(self, group):
+        """Blocks until the request may start. Returns its ticket; pass it to release()."""
+        ticket = _Ticket(group, next(self.seq))
+        start = time.perf_counter()
+        with self.condition:
+            heapq.heappush(self.waiting, ticket)
+            if ticket.priority < BACKGROUND and self.preempt_background:
+                self._preempt_background()
+            while not self._can_start(ticket):
+                self._reclaim_idle()
+                if self._can_start(ticket):
+                    break
+                self.condition.wait(timeout=1.0)  # Wakes up now and then to check for abandoned streams
+            heapq.heappop(self.waiting)
+            self.running.add(ticket)
+            wait_ms = (time.perf_counter() - start) * 1000
+            stats = self.waits.setdefault(group, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += wait_ms
+            stats[2] = max(stats[2], wait_ms)
+            self.condition.notify_all()  # The next waiter may be able to start too
+        if wait_ms >= 100:
+            self.log(f"LLM {self.name}: '{group}' request waited {wait_ms:.0f} ms for a slot.")
+        return ticket
+
+    def release(self, ticket):
+        with self.condition:
+            self.running.discard(ticket)
+            self.condition.notify_all()
+
+    def stats_line(self):
+        with self.condition:
+            running, waiting = len(self.running), len(self.waiting)
+            waits = ", ".join(f"{group} avg {total / count:.0f} ms max {worst:.0f} ms (n={count})"
+                              for group, (count, total, worst) in sorted(self.waits.items(), key=lambda item: PRIORITIES.get(item[0], BACKGROUND)))
+        return (f"LLM {self.name}: {running}/{self.max_in_flight} in flight, {waiting} waiting, "
+                f"{self.preemptions} preemptions, {self.reclaimed} unread streams reclaimed; queue wait: {waits or 'no requests yet'}")
+
+
+class SlotStream:
+    """
+    The chunks of a streaming request. It holds a scheduler slot until it is exhausted or closed,
+    so use it as a context manager (`with backend.chat_stream(...) as chunks:`) whenever the
+    caller may stop early: a break or an exception then releases the slot right away.
+    """
+    def __init__(self, chunks, transform=None):
+        self.chunks = iter(chunks)
+        self.transform = transform
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        chunk = next(self.chunks)
+        return self.transform(chunk) if self.transform else chunk
+
+    def close(self):
+        close = getattr(self.chunks, "close", None)
+        if close:
+            close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LLMBackend:
+    """
+    Common interface for the AI engines: chat() and chat_stream() over role/content messages.
+    Every request goes through the backend's RequestScheduler.
+    """
+    name = "base"
+
+    def __init__(self, app_controller):
+        self.app = app_controller
+        self.log = self.app.queue_log
+        self.scheduler = RequestScheduler(self.name, self.log)
+        self.configure()
+
+    def configure(self):
+        settings = self.app.config.get("llm_backends", {})
+        self.scheduler.configure(settings.get(self.name, {}).get("max_in_flight", DEFAULT_MAX_IN_FLIGHT.get(self.name, 1)),
+                                 settings.get("preempt_background", True),
+                                 settings.get("max_idle_hold", DEFAULT_MAX_IDLE_HOLD))
+
+    def _run(self, group, request):
+        """Calls request(ticket) in a slot. A preempted request is queued again and retried."""
+        while True:
+            ticket = self.scheduler.acquire(group)
+            try:
+                return request(ticket)
+            except CancelledError:
+                if not ticket.preempted:
+                    raise
+                self.log(f"LLM {self.name}: retrying preempted request ({ticket.tag}).")
+            finally:
+                self.scheduler.release(ticket)
+
+    def _run_stream(self, group, open_stream, transform=None):
+        """
+        A SlotStream over open_stream(ticket), run while holding a slot. A stream preempted before
+        its first chunk is retried; one preempted mid-way raises PreemptedError (its output can't be resumed).
+        """
+        return SlotStream(self._stream_in_slot(group, open_stream), transform)
+
+    def _stream_in_slot(self, group, open_stream):
+        while True:
+            ticket = self.scheduler.acquire(group)
+            produced = False
+            chunks = None
+            try:
+                chunks = open_stream(ticket)
+                for chunk in chunks:
+                    produced = True
+                    ticket.idle_since = time.monotonic()
+                    yield chunk
+                    ticket.idle_since = None
+                if not ticket.preempted:
+                    return
+                if produced:
+                    raise PreemptedError(f"{self.name} stream ({ticket.tag}) preempted by foreground work")
+                self.log(f"LLM {self.name}: retrying preempted stream ({ticket.tag}).")
+            finally:
+                if chunks is not None and hasattr(chunks, "close"):
+                    chunks.close()  # Closing early drops the connection instead of leaving it streaming
+                self.scheduler.release(ticket)
+
+    def chat(self, messages, model_name, temperature=0.7, output_format=None, group="interactive"):
+        raise NotImplementedError
+
+    def chat_stream(self, messages, model_name, temperature=0.6, output_format=None, group="interactive"):
+        raise NotImplementedError
+
+    def stats_line(self):
+        return self.scheduler.stats_line()
+
+
+class OllamaBackend(LLMBackend):
+    """Local Ollama server, through the shared OllamaClient. Requests can be cancelled and preempted."""
+    name = "ollama"
+
+    def __init__(self, app_controller, client):
+        self.client = client
+        super().__init__(app_controller)
+
+    def _apply_keep_alive(self, payload):
+        """Pins how long Ollama keeps the model (and its prompt cache) loaded, if configured."""
+        keep_alive = self.app.config.get("ollama", {}).get("keep_alive")
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+
+    def _arm(self, ticket):
+        """Makes the request preemptible. False if it was preempted before it could be sent."""
+        ticket.cancel = lambda: self.client.cancel_tag(ticket.tag)
+        return not ticket.preempted
+
+    def post(self, path, payload, group="interactive"):
+        """Non-streaming POST to any Ollama endpoint; returns the decoded JSON."""
+        def request(ticket):
+            if not self._arm(ticket):
+                raise CancelledError()
+            return self.client.post_json(path, payload, group=group, tag=ticket.tag)
+        return self._run(group, request)
+
+    def stream(self, path, payload, group="interactive", transform=None):
+        """Streaming POST to any Ollama endpoint: a SlotStream of decoded JSON lines (passed through `transform`)."""
+        def open_stream(ticket):
+            if not self._arm(ticket):
+                return iter([])
+            return self.client.stream(path, payload, group=group, tag=ticket.tag)
+        return self._run_stream(group, open_stream, transform)
+
+    def chat(self, messages, model_name, temperature=0.7, output_format=None, group="interactive"):
+        payload = {"model": model_name, "messages": messages, "stream": False, "options": {"temperature": temperature}}
+        if output_format:
+            payload["format"] = output_format
+        self._apply_keep_alive(payload)
+        return self.post("/api/chat", payload, group).get("message", {}).get("content", "")
+
+    def chat_stream(self, messages, model_name, temperature=0.6, output_format=None, group="interactive"):
+        payload = {"model": model_name, "messages": messages, "stream": True, "options": {"temperature": temperature}}
+        if output_format:
+            payload["format"] = output_format
+        self._apply_keep_alive(payload)
+        return self.stream("/api/chat", payload, group, transform=lambda chunk: chunk.get("message", {}).get("content", ""))
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini via the app's answer_model. The model is fixed, so model_name is ignored."""
+    name = "gemini"
+
+    def _model(self):
+        if not self.app.answer_model:
+            raise RuntimeError("Gemini model is not initialized.")
+        return self.app.answer_model
+
+    @staticmethod
+    def _prompt(messages):
+        return "\n\n".join(message["content"] for message in messages)
+
+    def chat(self, messages, model_name=None, temperature=0.7, output_format=None, group="interactive"):
+        return self._run(group, lambda ticket: self._model().generate_content(self._prompt(messages)).text)
+
+    def chat_stream(self, messages, model_name=None, temperature=0.6, output_format=None, group="interactive"):
+        def open_stream(ticket):
+            for chunk in self._model().generate_content(self._prompt(messages), stream=True):
+                if chunk.text: yield chunk.text
+        return self._run_stream(group, open_stream)
@@ -0,0 +1,482 @@
+# meeting_index.py
+import os
+import json
+import time
+import queue
+import shutil
+import threading
+import traceback
+from collections import deque
+
+import faiss
+import numpy as np
+
+import ai_logic
+
+DEFAULT_SETTINGS = {
+    "batch_size": 16,    # Chunks encoded together
+    "max_wait_ms": 500,  # How long the first chunk of a batch may wait for more to arrive
+}
+INDEX_DEFAULTS = {
+    "upgrade_at": 20000,     # Vectors before the exact (linear scan) index is rebuilt as an approximate one; 0 never
+    "upgrade_to": "hnsw",    # "hnsw" or "ivf"
+    "hnsw_m": 32,            # Graph neighbours per vector
+    "hnsw_ef_search": 64,    # Candidates explored per search: higher is slower with better recall
+    "ivf_nlist": 0,          # Clusters; 0 picks about sqrt(vectors)
+    "ivf_nprobe": 16,        # Clusters scanned per search
+}
+MANIFEST_VERSION = 1
+VECTORS_FILE = "vectors.f32"    # Row-major float32, appended as chunks are embedded
+CHUNKS_FILE = "chunks.jsonl"    # [timestamp, text] per row, same order
+SUMMARY_FILE = "summary.json"
+TRANSCRIPT_FILE = "transcript.txt"
+INDEX_FILE = "index.faiss"      # The approximate index once built; rows added after it are re-added on load
+SWAP_CATCH_UP_ROWS = 64         # Rows added during a rebuild that may be copied over while holding the lock
+_STOP = object()
+
+
+def build_index(kind, dim, vectors, settings):
+    """An approximate index ("hnsw" or "ivf") holding `vectors`, trained on them where the type needs it."""
+    if kind == "ivf":
+        nlist = int(settings["ivf_nlist"]) or max(1, int(np.sqrt(len(vectors))))
+        index = faiss.IndexIVFFlat(faiss.IndexFlatL2(dim), dim, min(nlist, len(vectors)))
+        index.train(vectors)
+        index.make_direct_map()  # So a later rebuild can read the vectors back out
+    elif kind == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, int(settings["hnsw_m"]))
+    else:
+        raise ValueError(f"Unknown meeting index type '{kind}'")
+    index.add(vectors)
+    return index
+
+
+def index_kind(index):
+    if isinstance(index, faiss.IndexHNSWFlat):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFFlat):
+        return "ivf"
+    return "flat"
+
+
+def apply_search_settings(index, settings):
+    """Per-search knobs, which can change while the index exists."""
+    kind = index_kind(index)
+    if kind == "hnsw":
+        index.hnsw.efSearch = int(settings["hnsw_ef_search"])
+    elif kind == "ivf":
+        index.nprobe = int(settings["ivf_nprobe"])
+
+
+class MeetingIndex:
+    """
+    A meeting session's transcript vectors plus the chunk (timestamp, text) each row came from.
+    All access goes through the lock: the embedding worker appends while Q&A reads.
+    With a `path`, every add() is also appended to the session's vector and chunk files, so
+    nothing has to be re-embedded after a restart or crash.
+
+    It starts as an exact flat index. Past `upgrade_at` vectors an HNSW or IVF index is built from
+    a snapshot on a background thread while searches keep using the flat one; the rows added
+    meanwhile are copied over and the two are swapped under the lock. The index is rebuilt again
+    each time it doubles (IVF clusters trained on the first rows would otherwise go stale).
+    """
+    def __init__(self, dim, path=None, get_settings=None, log_callback=None):
+        self.dim = dim
+        self.path = path
+        self.get_settings = get_settings or dict
+        self.log = log_callback or (lambda message, level='INFO': None)
+        self.lock = threading.Lock()
+        self.index = faiss.IndexFlatL2(dim)
+        self.chunks = []  # (timestamp, text) per row, in index order
+        self.upgrading = False
+        self.next_upgrade_at = 0  # Rows before another rebuild, after one was built (or failed)
+
+    def _settings(self):
+        return {**INDEX_DEFAULTS, **self.get_settings()}
+
+    @classmethod
+    def open(cls, dim, path, get_settings=None, log_callback=None):
+        """
+        Loads a persisted index. The index lives in RAM: the vector file is mapped only so faiss
+        can copy it in without an intermediate buffer. Call it off the Tk thread.
+        A crash between the two appends can leave one file a row ahead; both are cut back to the
+        rows they have in common so later appends stay aligned. A saved approximate index is
+        reused, with the rows added after it was built appended from the vector file.
+        """
+        meeting_index = cls(dim, path, get_settings, log_callback)
+        chunks = []
+        torn = False
+        chunks_path = os.path.join(path, CHUNKS_FILE)
+        if os.path.exists(chunks_path):
+            with open(chunks_path, 'r', encoding='utf-8', newline='') as f:
+                lines = f.read().split("\n")
+            torn = lines.pop() != ""  # Text after the last newline is an unfinished append
+            for line in lines:
+                try:
+                    timestamp, text = json.loads(line)
+                except (json.JSONDecodeError, ValueError):
+                    torn = True
+                    break
+                chunks.append((timestamp, text))
+        vectors_path = os.path.join(path, VECTORS_FILE)
+        row_bytes = dim * 4
+        vector_rows = os.path.getsize(vectors_path) // row_bytes if os.path.exists(vectors_path) else 0
+        rows = min(len(chunks), vector_rows)
+
+        if os.path.exists(vectors_path) and os.path.getsize(vectors_path) != rows * row_bytes:
+            with open(vectors_path, 'r+b') as f:
+                f.truncate(rows * row_bytes)
+        if len(chunks) != rows or torn:
+            chunks = chunks[:rows]
+            with open(chunks_path, 'w', encoding='utf-8', newline='') as f:
+                f.writelines(json.dumps(chunk) + "\n" for chunk in chunks)
+        if rows:
+            vectors = np.memmap(vectors_path, dtype='float32', mode='r', shape=(rows, dim))  # Copied by add()
+            saved = meeting_index._read_saved_index(rows)
+            if saved is not None:
+                saved.add(vectors[saved.ntotal:])
+                meeting_index.index = saved
+            else:
+                meeting_index.index.add(vectors)
+        meeting_index.chunks = chunks
+        with meeting_index.lock:
+            meeting_index._maybe_upgrade()
+        return meeting_index
+
+    def _read_saved_index(self, rows):
+        index_path = os.path.join(self.path, INDEX_FILE)
+        if not os.path.exists(index_path):
+            return None
+        try:
+            index = faiss.read_index(index_path)
+        except RuntimeError as e:
+            self.log(f"Saved meeting index unreadable, rebuilding it: {e}", "WARNING")
+            return None
+        if index.d != self.dim or index.ntotal > rows or index_kind(index) == "flat":
+            return None  # Vectors were cut back after a crash, or it belongs to another model
+        self.next_upgrade_at = 2 * index.ntotal
+        return index
+
+    @property
+    def ntotal(self):
+        with self.lock:
+            return self.index.ntotal
+
+    def add(self, vectors, chunks):
+        with self.lock:
+            self.index.add(vectors)
+            self.chunks.extend(chunks)
+            if self.path:
+                with open(os.path.join(self.path, VECTORS_FILE), 'ab') as f:
+                    f.write(np.ascontiguousarray(vectors, dtype='float32').tobytes())
+                with open(os.path.join(self.path, CHUNKS_FILE), 'a', encoding='utf-8', newline='') as f:
+                    f.writelines(json.dumps(list(chunk)) + "\n" for chunk in chunks)
+            self._maybe_upgrade()
+
+    @property
+    def kind(self):
+        with self.lock:
+            return index_kind(self.index)
+
+    # --- Flat -> approximate index ---
+    def _maybe_upgrade(self):
+        """Starts a background rebuild when the index has grown enough. Caller holds the lock."""
+        settings = self._settings()
+        rows = self.index.ntotal
+        if self.upgrading or not settings["upgrade_at"] or rows < max(settings["upgrade_at"], self.next_upgrade_at):
+            return
+        self.upgrading = True
+        threading.Thread(target=self._upgrade, args=(rows, settings), name="meeting-index-upgrade", daemon=True).start()
+
+    def _upgrade(self, rows, settings):
+        kind = settings["upgrade_to"]
+        try:
+            start = time.perf_counter()
+            with self.lock:
+                vectors = self.index.reconstruct_n(0, rows)  # Snapshot; appends continue on the current index
+            new_index = build_index(kind, self.dim, vectors, settings)
+            apply_search_settings(new_index, settings)
+            build_ms = (time.perf_counter() - start) * 1000
+            self._save_index(new_index)
+
+            copied = rows
+            while True:  # Catch up on rows added meanwhile outside the lock, until only a few are left
+                with self.lock:
+                    pending = self.index.ntotal - copied
+                    if pending <= SWAP_CATCH_UP_ROWS:
+                        swap_start = time.perf_counter()
+                        if pending:
+                            new_index.add(self.index.reconstruct_n(copied, pending))
+                        old_kind = index_kind(self.index)
+                        self.index = new_index
+                        self.next_upgrade_at = 2 * rows
+                        self.upgrading = False
+                        total = new_index.ntotal
+                        swap_ms = (time.perf_counter() - swap_start) * 1000
+                        break
+                    tail = self.index.reconstruct_n(copied, pending)
+                new_index.add(tail)
+                copied += pending
+            action = f"upgraded from {old_kind} to {kind}" if old_kind == "flat" else f"rebuilt as {kind}"
+            self.log(f"Meeting index {action} at {total} vectors: built in {build_ms:.0f} ms in the background, "
+                     f"swapped in {swap_ms:.1f} ms.")
+        except Exception as e:
+            with self.lock:
+                self.next_upgrade_at = 2 * rows  # Don't retry on every add
+                self.upgrading = False
+            self.log(f"Meeting index upgrade to {kind} failed, staying on {self.kind}: {e}\n{traceback.format_exc()}", "ERROR")
+
+    def _save_index(self, index):
+        """Saves a freshly built index so reopening the session doesn't rebuild it. Best effort."""
+        with self.lock:
+            path = self.path
+        if not path:
+            return
+        tmp_path = os.path.join(path, INDEX_FILE + ".tmp")
+        try:
+            faiss.write_index(index, tmp_path)
+            os.replace(tmp_path, os.path.join(path, INDEX_FILE))
+        except (RuntimeError, OSError) as e:
+            self.log(f"Could not save the meeting index (it will be rebuilt on load): {e}", "WARNING")
+
+    def search(self, query, k):
+        """Rows of the k chunks nearest to a (1, dim) query vector, nearest first."""
+        with self.lock:
+            if not self.index.ntotal:
+                return []
+            apply_search_settings(self.index, self._settings())
+            _, rows = self.index.search(query, min(k, self.index.ntotal))
+        return [int(row) for row in rows[0] if row >= 0]
+
+    def chunk_range(self, start, end):
+        """The (timestamp, text) chunks of rows start..end-1."""
+        with self.lock:
+            return self.chunks[max(0, start):end]
+
+    def detach(self):
+        """Stops writing to disk (the session is being deleted)."""
+        with self.lock:
+            self.path = None
+
+
+class MeetingStore:
+    """
+    On-disk meeting sessions: one directory per session (vectors, chunks, transcript, summary)
+    plus manifest.json with each session's header (title, creation time, dimension, row count).
+    Startup reads only the manifest; a session's files are read when it is first opened.
+    """
+    def __init__(self, root, log_callback, get_settings=None):
+        self.root = root
+        self.log = log_callback
+        self.get_settings = get_settings  # Index type settings, read each time an index checks them
+        self.lock = threading.Lock()
+        self.headers = {}  # session id -> header, in creation order
+        self._load_manifest()
+
+    def _manifest_path(self):
+        return os.path.join(self.root, "manifest.json")
+
+    def _load_manifest(self):
+        if not os.path.exists(self._manifest_path()):
+            return
+        try:
+            with open(self._manifest_path(), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            self.log(f"Meeting manifest unreadable, saved sessions won't be listed: {e}", "WARNING")
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.headers = {session_id: header for session_id, header in data.get("sessions", {}).items()
+                            if os.path.isdir(self.session_dir(session_id))}
+
+    def _save_manifest(self):
+        """Caller holds the lock."""
+        tmp_path = self._manifest_path() + ".tmp"
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": MANIFEST_VERSION, "sessions": self.headers}, f, indent=2)
+            os.replace(tmp_path, self._manifest_path())
+        except OSError as e:
+            self.log(f"Could not write meeting manifest: {e}", "WARNING")
+
+    def session_dir(self, session_id):
+        return os.path.join(self.root, session_id)
+
+    def create(self, session_id, title, dim):
+        """Registers a new session and returns its (empty, persistent) index."""
+        os.makedirs(self.session_dir(session_id), exist_ok=True)
+        with self.lock:
+            self.headers[session_id] = {"title": title, "created": time.time(), "dim": dim, "rows": 0}
+            self._save_manifest()
+        return MeetingIndex(dim, self.session_dir(session_id), self.get_settings, self.log)
+
+    def load(self, session_id):
+        """Reads a saved session: {"transcript", "summary", "summary_state", "faiss_index"}."""
+        start = time.perf_counter()
+        path = self.session_dir(session_id)
+        header = self.headers[session_id]
+        transcript, summary = "", {}
+        try:
+            if os.path.exists(os.path.join(path, TRANSCRIPT_FILE)):
+                with open(os.path.join(path, TRANSCRIPT_FILE), 'r', encoding='utf-8') as f:
+                    transcript = f.read()
+            if os.path.exists(os.path.join(path, SUMMARY_FILE)):
+                with open(os.path.join(path, SUMMARY_FILE), 'r', encoding='utf-8') as f:
+                    summary = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            self.log(f"Meeting session '{header['title']}' is partly unreadable: {e}", "WARNING")
+        meeting_index = MeetingIndex.open(header["dim"], path, self.get_settings, self.log)
+        self.log(f"Loaded meeting session '{header['title']}' ({meeting_index.ntotal} indexed chunks, {meeting_index.kind} index) "
+                 f"in {(time.perf_counter() - start) * 1000:.0f} ms.")
+        return {"transcript": transcript, "summary": summary.get("summary", ""),
+                "summary_state": summary.get("summary_state"), "faiss_index": meeting_index}
+
+    def save(self, session):
+        """Writes a session's transcript and summary (vectors are already on disk) and refreshes its header."""
+        session_id = session['id']
+        if session_id not in self.headers:
+            return
+        path = self.session_dir(session_id)
+        summary = {"summary": session.get('summary', ""), "summary_state": session.get('summary_state')}
+        try:
+            for filename, write in ((TRANSCRIPT_FILE, lambda f: f.write(session.get('transcript', ""))),
+                                    (SUMMARY_FILE, lambda f: json.dump(summary, f))):
+                tmp_path = os.path.join(path, filename + ".tmp")
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    write(f)
+                os.replace(tmp_path, os.path.join(path, filename))
+        except OSError as e:
+            self.log(f"Could not save meeting session '{session.get('title')}': {e}", "WARNING")
+            return
+        with self.lock:
+            header = self.headers.get(session_id)
+            if header is None:
+                return  # Deleted meanwhile
+            header["title"] = session.get('title', header["title"])
+            if session.get('faiss_index') is not None:
+                header["rows"] = session['faiss_index'].ntotal
+            self._save_manifest()
+
+    def delete(self, session_id):
+        with self.lock:
+            if self.headers.pop(session_id, None) is None:
+                return
+            self._save_manifest()
+        shutil.rmtree(self.session_dir(session_id), ignore_errors=True)
+
+
+class EmbeddingWorker:
+    """
+    Embeds live transcript chunks off the Tk thread. submit() only enqueues; one worker thread
+    collects chunks into micro-batches (up to batch_size, or whatever arrived within max_wait_ms of
+    the first one), encodes each batch in a single call and appends the vectors to their sessions'
+    indexes. Index lag is how long a chunk waits between submit() and being searchable.
+    """
+    def __init__(self, app_controller):
+        self.app = app_controller
+        self.log = self.app.queue_log
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.pending = deque()    # Submit times (monotonic) of chunks not yet in an index, oldest first
+        self.embedded = 0
+        self.batches = 0
+        self.encode_ms = 0.0
+        self.lag_ms = 0.0         # Total, for the average
+        self.max_lag_ms = 0.0
+
+    def _settings(self):
+        return {**DEFAULT_SETTINGS, **self.app.config.get("meeting_embedding", {})}
+
+    def start(self):
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self._run, name="meeting-embedder", daemon=True)
+            self.thread.start()
+
+    def submit(self, meeting_index, text, timestamp=None):
+        """Queues a chunk (spoken at `timestamp`, default now) for embedding. Safe on the Tk thread: it never encodes."""
+        with self.lock:
+            self.pending.append(time.monotonic())
+        self.queue.put((meeting_index, (time.time() if timestamp is None else timestamp, text)))
+        self.start()
+
+    def _next_batch(self):
+        """Blocks for the first chunk, then gathers more until the batch is full or max_wait_ms has passed."""
+        first = self.queue.get()
+        if first is _STOP:
+            return None
+        settings = self._settings()
+        batch = [first]
+        deadline = time.monotonic() + settings["max_wait_ms"] / 1000
+        while len(batch) < max(1, int(settings["batch_size"])):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self.queue.put(_STOP)  # Finish this batch, stop on the next call
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            start = time.perf_counter()
+            try:
+                vectors = ai_logic.EMBEDDING_MODEL.encode([text for _, (_, text) in batch], normalize_embeddings=True).astype('float32')
+                groups = {}  # One add per session, rows in arrival order
+                for row, (meeting_index, chunk) in enumerate(batch):
+                    rows, chunks = groups.setdefault(meeting_index, ([], []))
+                    rows.append(row)
+                    chunks.append(chunk)
+                for meeting_index, (rows, chunks) in groups.items():
+                    meeting_index.add(vectors[rows], chunks)
+            except Exception as e:
+                self.log(f"Meeting embedding failed for {len(batch)} chunks (they won't be searchable): {e}\n{traceback.format_exc()}", "ERROR")
+            self._record(len(batch), (time.perf_counter() - start) * 1000)
+
+    def _record(self, count, encode_ms):
+        now = time.monotonic()
+        with self.lock:
+            lags = [(now - self.pending.popleft()) * 1000 for _ in range(count)]  # Batches are taken in submit order
+            self.embedded += count
+            self.batches += 1
+            self.encode_ms += encode_ms
+            self.lag_ms += sum(lags)
+            self.max_lag_ms = max(self.max_lag_ms, max(lags))
+            if not self.pending:
+                self.idle.notify_all()
+
+    def current_lag_ms(self):
+        """How long the oldest chunk not yet in an index has been waiting (0 when caught up)."""
+        with self.lock:
+            oldest = self.pending[0] if self.pending else None
+        return (time.monotonic() - oldest) * 1000 if oldest is not None else 0.0
+
+    def flush(self, timeout=None):
+        """Waits until every submitted chunk is indexed. Returns False on timeout."""
+        with self.lock:
+            return self.idle.wait_for(lambda: not self.pending, timeout)
+
+    def shutdown(self):
+        if self.thread and self.thread.is_alive():
+            self.queue.put(_STOP)
+
+    def stats_line(self):
+        with self.lock:
+            embedded, batches, encode_ms, lag_ms, max_lag_ms, pending = (
+                self.embedded, self.batches, self.encode_ms, self.lag_ms, self.max_lag_ms, len(self.pending))
+        if not batches:
+            return "Meeting embeddings: none yet"
+        return (f"Meeting embeddings: {embedded} chunks in {batches} batches (avg {embedded / batches:.1f}/batch, "
+                f"encode avg {encode_ms / batches:.0f} ms); index lag avg {lag_ms / embedded:.0f} ms, max {max_lag_ms:.0f} ms, "
+                f"now {self.current_lag_ms():.0f} ms with {pending} pending")
@@ -0,0 +1,200 @@
+# model_warmup.py
+import re
+import time
+import threading
+import traceback
+
+import ai_logic
+
+DEFAULT_KEEP_ALIVE_SECONDS = 300  # Ollama's own default when a request sets no keep_alive
+DEFAULT_SETTINGS = {
+    "heartbeat": True,             # Ping preloaded models before Ollama's keep_alive unloads them
+    "heartbeat_fraction": 0.8,     # Ping after this fraction of keep_alive has passed without a request
+    "min_heartbeat_seconds": 30,
+    "release_after_minutes": 30,   # Stop pinging a model nothing has used for this long (0: never), so Ollama can free its memory
+}
+_DURATION_PART = re.compile(r"(-?\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+
+
+def parse_keep_alive(value):
+    """
+    Ollama keep_alive ("30m", "1h30m", "300", 300, "-1") in seconds.
+    None means Ollama's default; returns None for "forever" (negative values).
+    """
+    if value is None:
+        return DEFAULT_KEEP_ALIVE_SECONDS
+    text = str(value).strip()
+    try:
+        seconds = float(text)
+    except ValueError:
+        parts = _DURATION_PART.findall(text)
+        if not parts or "".join(number + unit for number, unit in parts) != text:
+            return DEFAULT_KEEP_ALIVE_SECONDS
+        seconds = sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+    return None if seconds < 0 else seconds
+
+
+class ModelWarmupService:
+    """
+    Keeps the models AURA needs loaded, so the first command after a quiet period doesn't pay a cold load.
+    - start() loads the router and chat models (as chosen by 'preload_models') and runs a first
+      embedding, all in parallel.
+    - A heartbeat sends Ollama an empty chat request (it loads the model and generates nothing)
+      before keep_alive runs out. Models that served a request since then are skipped: that request
+      already reset their timer. A model no real request has used for release_after_minutes is no
+      longer pinged, so an idle assistant doesn't keep it in (V)RAM indefinitely.
+    - A ping that takes longer than cold_load_ms found the model unloaded; those are counted.
+    Cold versus warm first-token latency of real requests is tracked by OllamaClient.
+    """
+    def __init__(self, app_controller):
+        self.app = app_controller
+        self.log = self.app.queue_log
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.last_ping = {}          # model -> monotonic time of its last ping
+        self.startup_ms = {}         # label -> warm-up time at startup
+        self.startup_total_ms = None
+        self.warmed_at = time.monotonic()
+        self.released = set()        # Models left to unload for lack of use
+        self.pings = 0
+        self.cold_pings = 0
+
+    def _settings(self):
+        return {**DEFAULT_SETTINGS, **self.app.config.get("model_warmup", {})}
+
+    def models(self):
+        """The Ollama models to keep warm, per the 'preload_models' setting."""
+        preload_setting = self.app.config.get("preload_models", "None")
+        models = {}
+        if preload_setting in ["Router Model Only", "Both"]:
+            models["router"] = self.app.config.get("router_model", "nexusraven:latest")
+        if preload_setting in ["Chat Model Only", "Both"]:
+            models["chat"] = self.app.config.get("chat_model", "llama3.1")
+        return models
+
+    def heartbeat_interval(self):
+        """Seconds between pings, or None when no heartbeat is needed."""
+        settings = self._settings()
+        keep_alive = parse_keep_alive(self.app.config.get("ollama", {}).get("keep_alive"))
+        if not settings["heartbeat"] or not keep_alive:
+            return None  # Disabled, kept forever (None) or unloaded right away (0)
+        return max(settings["min_heartbeat_seconds"], keep_alive * settings["heartbeat_fraction"])
+
+    # --- Warm-up ---
+    def start(self):
+        """Warms every model in parallel on background threads, then starts the heartbeat."""
+        threading.Thread(target=self._warm_all, name="model-warmup", daemon=True).start()
+
+    def warm_now(self):
+        """Re-warms after the model settings changed; the running heartbeat picks up the new models."""
+        self.start()
+
+    def _warm_all(self):
+        models = self.models()
+        tasks = {label: (lambda model=model: self.ping(model) is not None) for label, model in models.items()}
+        tasks["embedding"] = self._warm_embedding
+        self.log(f"Warming up in parallel: {', '.join([f'{label} ({model})' for label, model in models.items()] + ['embedding'])}...")
+
+        start = time.perf_counter()
+        self.warmed_at = time.monotonic()
+        self.released.clear()
+        results = {}
+        def run(label, task):
+            task_start = time.perf_counter()
+            ok = task()
+            results[label] = ((time.perf_counter() - task_start) * 1000, ok)
+        threads = [threading.Thread(target=run, args=item, name=f"warmup-{item[0]}", daemon=True) for item in tasks.items()]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+
+        self.startup_ms = {label: elapsed for label, (elapsed, ok) in results.items() if ok}
+        self.startup_total_ms = (time.perf_counter() - start) * 1000
+        failed = [label for label, (_, ok) in results.items() if not ok]
+        self.log(f"Warm-up finished in {self.startup_total_ms:.0f} ms "
+                 f"({', '.join(f'{label} {elapsed:.0f} ms' for label, elapsed in self.startup_ms.items())})."
+                 + (f" Failed: {', '.join(failed)}. Ensure Ollama is running." if failed else ""), "WARNING" if failed else "INFO")
+        self._start_heartbeat()
+
+    def _warm_embedding(self):
+        """The first encode() initializes the model's kernels; do it now rather than on the first real query."""
+        if ai_logic.EMBEDDING_MODEL is None:
+            return False
+        try:
+            ai_logic.EMBEDDING_MODEL.encode(["warm-up"])
+            return True
+        except Exception as e:
+            self.log(f"Embedding warm-up failed: {e}", "WARNING")
+            return False
+
+    def ping(self, model):
+        """Loads the model (or resets its keep_alive) with an empty request. Returns its time in ms, None on failure."""
+        payload = {"model": model, "messages": []}
+        keep_alive = self.app.config.get("ollama", {}).get("keep_alive")
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        start = time.perf_counter()
+        try:
+            ai_logic.get_backend(self.app, "ollama_offline").post("/api/chat", payload, group="background")
+        except Exception as e:
+            self.log(f"Warm-up ping to {model} failed: {e}", "WARNING")
+            return None
+        self.last_ping[model] = time.monotonic()
+        return (time.perf_counter() - start) * 1000
+
+    # --- Keep-alive heartbeat ---
+    def _start_heartbeat(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._heartbeat_loop, name="model-heartbeat", daemon=True)
+        self.thread.start()
+
+    def _heartbeat_loop(self):
+        while not self.stop_event.is_set():
+            interval = self.heartbeat_interval()
+            if interval is None:
+                self.stop_event.wait(self._settings()["min_heartbeat_seconds"])  # Settings may turn it on later
+                continue
+            try:
+                client = ai_logic.get_ollama_client(self.app)
+                release_after = self._settings()["release_after_minutes"] * 60
+                next_due = interval
+                for model in set(self.models().values()):
+                    unused = time.monotonic() - client.last_used.get(model, self.warmed_at)
+                    if release_after and unused >= release_after:
+                        if model not in self.released:
+                            self.released.add(model)
+                            self.log(f"Model heartbeat: {model} unused for {unused / 60:.0f} min; no longer keeping it loaded.")
+                        continue
+                    self.released.discard(model)
+                    last_active = max(self.last_ping.get(model, 0), client.last_used.get(model, 0))
+                    idle = time.monotonic() - last_active
+                    if idle >= interval:
+                        elapsed_ms = self.ping(model)
+                        if elapsed_ms is None:
+                            continue
+                        self.pings += 1
+                        if elapsed_ms >= client.settings["cold_load_ms"]:
+                            self.cold_pings += 1
+                            self.log(f"Keep-alive ping found {model} unloaded after {idle:.0f} s idle; "
+                                     f"reloading took {elapsed_ms:.0f} ms.", "WARNING")
+                        else:
+                            self.log(f"Keep-alive ping to {model} after {idle:.0f} s idle ({elapsed_ms:.0f} ms).")
+                    else:
+                        next_due = min(next_due, interval - idle)
+            except Exception as e:
+                self.log(f"Model heartbeat error: {e}\n{traceback.format_exc()}", "ERROR")
+                next_due = interval
+            self.stop_event.wait(max(1.0, next_due))
+
+    def stop(self):
+        self.stop_event.set()
+
+    def stats_line(self):
+        startup = (", ".join(f"{label} {elapsed:.0f} ms" for label, elapsed in self.startup_ms.items())
+                   + f" (parallel, {self.startup_total_ms:.0f} ms total)") if self.startup_total_ms is not None else "not run"
+        interval = self.heartbeat_interval()
+        heartbeat = ((f"every {interval / 60:.1f} min" if interval >= 60 else f"every {interval:.0f} s") + " when idle") if interval else "off"
+        return (f"Model warm-up: {startup}; heartbeat {heartbeat}, {self.pings} pings, "
+                f"{self.cold_pings} found the model unloaded, {len(self.released)} released for lack of use")
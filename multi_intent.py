@@ -0,0 +1,151 @@
+# multi_intent.py
+import re
+import time
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from skill_executor import SkillTimeoutError, SkillCancelledError
+
+# "X and Y", "X, then Y", "X; Y", "X and also Y"... The separator is kept so parts can be re-joined.
+_SEPARATOR = re.compile(r'(\s*;\s*|,?\s+(?:and then|and also|and|then|also)\s+)', re.IGNORECASE)
+
+
+class MultiIntentRunner:
+    """
+    Splits compound commands ("set volume to 30 and what's the weather in Paris") into
+    independent sub-intents and runs their skills concurrently on a bounded thread pool.
+    A split is only tried when a conjunction is present and at least one part matches a skill
+    regex, and only used when every part resolves locally (regex skill or semantic fast path),
+    so "add milk and eggs to my list" is never torn apart.
+    """
+    def __init__(self, app_controller, initializer=None):
+        self.app = app_controller
+        self.log = self.app.queue_log
+        self.initializer = initializer  # Per-thread setup, e.g. COM initialization on Windows
+        self.pool = None
+        self.pool_size = 0
+        self.pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        max_workers = max(1, int(self.app.config.get("multi_intent", {}).get("max_workers", 4)))
+        with self.pool_lock:
+            if self.pool is None or self.pool_size != max_workers:
+                if self.pool is not None:
+                    self.pool.shutdown(wait=False)
+                self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="intent",
+                                               initializer=self.initializer)
+                self.pool_size = max_workers
+            return self.pool
+
+    def shutdown(self):
+        with self.pool_lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=False)
+            self.pool = None
+
+    # --- Splitting ---
+    def _regex_resolution(self, part):
+        if self.app.command_handler.dispatcher.match(part.lower().strip()) is not None:
+            return ("regex", None)
+        return None
+
+    def _resolve(self, part):
+        """Returns ("regex", None) or ("routed", decision) if the part can run without the Router AI."""
+        resolution = self._regex_resolution(part)
+        if resolution is None:
+            decision = self.app.command_handler.semantic_router.peek([part])[0]
+            resolution = ("routed", decision) if decision is not None else None
+        return resolution
+
+    def split(self, command):
+        """
+        Returns [(part, resolution)] for a compound command, or None when it should be handled
+        as a single command. A part that doesn't resolve on its own is glued back onto the
+        previous one ("buy milk" + "eggs" -> "buy milk and eggs") and re-checked.
+        Parts no regex matches are checked against the semantic router in one batched encode,
+        which also encodes the whole command for the normal flow if the split is rejected.
+        """
+        pieces = _SEPARATOR.split(command.strip())
+        if len(pieces) < 3:
+            return None
+        parts = [(piece, pieces[i - 1] if i else "") for i, piece in enumerate(pieces) if i % 2 == 0 and piece.strip()]
+        regex_resolutions = [self._regex_resolution(piece) for piece, _ in parts]
+        if not any(regex_resolutions):
+            return None  # Cheap exit: most conjunctions are inside a single request
+
+        unresolved = [piece for (piece, _), resolution in zip(parts, regex_resolutions) if resolution is None]
+        decisions = iter(self.app.command_handler.semantic_router.peek(unresolved, remember=command))
+        segments = []  # [text, resolution]
+        for (piece, separator), resolution in zip(parts, regex_resolutions):
+            if resolution is None:
+                decision = next(decisions)
+                resolution = ("routed", decision) if decision is not None else None
+            if resolution is None and segments:
+                merged = segments[-1][0] + separator + piece
+                segments[-1] = [merged, self._resolve(merged)]
+            else:
+                segments.append([piece, resolution])
+
+        if len(segments) < 2 or any(resolution is None for _, resolution in segments):
+            return None
+        return [(text.strip(), resolution) for text, resolution in segments]
+
+    # --- Execution ---
+    def _run_part(self, part, resolution, attached_file):
+        kind, decision = resolution
+        if kind == "regex":
+            return self.app.command_handler.handle(part, attached_file=attached_file)
+
+        tool_name = decision["tool_name"]
+        command_handler = self.app.command_handler
+        tool_data = command_handler.command_map.get(tool_name)
+        if tool_data is None:
+            return None
+        try:
+            result = command_handler.executor.run(tool_name, tool_data, decision.get("parameters", {}))
+        except SkillTimeoutError:
+            return command_handler.executor.fallback_message(tool_name, tool_data)
+        except SkillCancelledError:
+            return None
+        if isinstance(result, dict) and 'error' in result:
+            return result['error']
+        return result
+
+    def try_execute(self, command, attached_file=None):
+        """
+        Runs a compound command and speaks each sub-result as soon as it is ready.
+        Returns True if the command was handled here, False to fall through to the normal flow.
+        """
+        parts = self.split(command)
+        if parts is None:
+            return False
+
+        self.log(f"Multi-intent: split into {len(parts)} parts: {[part for part, _ in parts]}")
+        start = time.perf_counter()
+        pool = self._get_pool()
+        futures = {pool.submit(self._run_part, part, resolution, attached_file): i
+                   for i, (part, resolution) in enumerate(parts)}
+
+        results = [None] * len(parts)
+        spoke_any = False
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                response = future.result()
+            except Exception as e:
+                self.log(f"Multi-intent part '{parts[i][0]}' failed: {e}\n{traceback.format_exc()}", "ERROR")
+                response = f"I couldn't do '{parts[i][0]}'."
+            results[i] = str(response).strip() if response is not None else ""
+            self.log(f"Multi-intent part {i + 1}/{len(parts)} done after {(time.perf_counter() - start) * 1000:.0f} ms.")
+            if results[i] and not self.app.stop_generating_event.is_set():
+                # Completion order, not command order: the first finished result is heard first.
+                self.app.root.after(0, self.app.speak_response, results[i])
+                spoke_any = True
+
+        merged = " ".join(result for result in results if result)
+        self.log(f"Multi-intent: {len(parts)} parts finished in {(time.perf_counter() - start) * 1000:.0f} ms.")
+        if merged:
+            self.app.root.after(0, self.app.gui.add_chat_message, "AURA", merged)
+        if not spoke_any:
+            self.app.root.after(0, self.app.return_to_idle_state)
+        return True
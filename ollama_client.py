@@ -0,0 +1,274 @@
+# ollama_client.py
+import json
+import time
+import queue
+import asyncio
+import threading
+from collections import deque
+
+import aiohttp
+
+DEFAULT_SETTINGS = {
+    "base_url": "http://localhost:11434",
+    "connect_timeout": 3.0,
+    "read_timeout": 120.0,
+    "retries": 2,
+    "backoff": 0.5,
+    "pool_size": 4,
+    "cold_load_ms": 500,  # A request whose model took longer than this to load counts as a cold start
+}
+RETRY_STATUSES = (502, 503, 504)
+_END = object()  # Marks the end of a stream in the hand-off queue
+
+
+class OllamaClient:
+    """
+    Shared asyncio client for the Ollama server, running on its own event loop thread.
+    Router, chat, summary and title calls all go through one pooled keep-alive aiohttp session.
+    Cancelling a request (stop button, or a consumer closing a stream) cancels its task, which
+    closes the connection mid-stream so Ollama stops generating.
+    Connection failures and 502/503/504 are retried with exponential backoff (never once a
+    response has started). Each request records TTFB, TTFT and tokens/sec from Ollama's counters,
+    and its TTFT is filed as cold or warm by how long Ollama spent loading the model (load_duration,
+    only reported in the final chunk, so streams closed early aren't filed).
+    The public methods are blocking, for the worker threads that call them.
+    """
+    def __init__(self, settings=None, log_callback=None):
+        self.log = log_callback or (lambda message, level='INFO': None)
+        self.settings = None
+        self.session = None           # aiohttp.ClientSession; only used on the loop thread
+        self.session_settings = None  # The settings `session` was built with
+        self.lock = threading.Lock()
+        self.metrics = deque(maxlen=50)  # Most recent request metrics, newest last
+        self.request_count = 0
+        self.ttft_by_load = {}  # "cold"/"warm" -> [count, total TTFT ms, total load ms]
+        self.last_used = {}     # model -> monotonic time its last real (not warm-up) request finished
+        self.connections = 0
+        self.in_flight = {}  # concurrent Future -> (cancel group, request tag)
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever, name="ollama-loop", daemon=True)
+        self.loop_thread.start()
+        self.configure(settings or {})
+
+    def configure(self, settings):
+        """Applies settings (config['ollama']); the session is rebuilt on next use when they change."""
+        merged = {**DEFAULT_SETTINGS, **(settings or {})}
+        merged["base_url"] = merged["base_url"].rstrip("/")
+        with self.lock:
+            if merged != self.settings:
+                self.settings = merged
+
+    def url(self, path):
+        return f"{self.settings['base_url']}/{path.lstrip('/')}"
+
+    def connections_opened(self):
+        """TCP connections opened so far to the Ollama server (stays at 1 with keep-alive)."""
+        return self.connections
+
+    # --- Event loop side ---
+    async def _get_session(self):
+        settings = self.settings
+        if self.session is None or self.session_settings is not settings:
+            if self.session is not None:
+                await self.session.close()
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(self._on_connection_created)
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=settings["pool_size"]),
+                timeout=aiohttp.ClientTimeout(sock_connect=settings["connect_timeout"], sock_read=settings["read_timeout"]),
+                trace_configs=[trace],
+            )
+            self.session_settings = settings
+        return self.session
+
+    async def _on_connection_created(self, session, context, params):
+        self.connections += 1
+
+    async def _open(self, method, path, payload=None):
+        """Sends a request and returns the response once its headers arrive, retrying with backoff."""
+        settings = self.settings
+        session = await self._get_session()
+        attempt = 0
+        while True:
+            try:
+                response = await session.request(method, self.url(path), json=payload)
+            except (aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError) as e:
+                if attempt >= settings["retries"]:
+                    raise
+                error = e
+            else:
+                if response.status not in RETRY_STATUSES or attempt >= settings["retries"]:
+                    return response
+                response.release()
+                error = f"HTTP {response.status}"
+            delay = settings["backoff"] * (2 ** attempt)
+            self.log(f"Ollama request to {path} failed ({error}). Retrying in {delay:.1f}s...", "WARNING")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _get_json(self, path):
+        async with await self._open("GET", path) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def _post_json(self, path, payload):
+        start = time.perf_counter()
+        async with await self._open("POST", path, payload) as response:
+            ttfb = time.perf_counter() - start
+            response.raise_for_status()
+            data = await response.json(content_type=None)
+        self._record(path, payload.get("model"), start, ttfb, time.perf_counter() - start, data)
+        return data
+
+    async def _stream(self, path, payload, out_queue):
+        start = time.perf_counter()
+        ttfb = ttft = None
+        final = {}
+        try:
+            response = await self._open("POST", path, payload)
+            ttfb = time.perf_counter() - start
+            try:
+                response.raise_for_status()
+                async for line in response.content:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if ttft is None and (chunk.get("response") or chunk.get("message", {}).get("content")):
+                        ttft = time.perf_counter() - start
+                    if chunk.get("done"):
+                        final = chunk
+                    out_queue.put(chunk)
+            except asyncio.CancelledError:
+                # Drop the connection rather than draining it: Ollama stops generating on disconnect.
+                response.close()
+                self.log(f"Ollama stream to {path} ({payload.get('model')}) cancelled mid-stream.")
+                raise
+            finally:
+                response.release()
+        finally:
+            if ttfb is not None:
+                self._record(path, payload.get("model"), start, ttfb, ttft, final)
+
+    # --- Blocking API for worker threads ---
+    def _submit(self, coro, group, tag=None):
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        with self.lock:
+            self.in_flight[future] = (group, tag)
+        future.add_done_callback(self._forget)
+        return future
+
+    def _forget(self, future):
+        with self.lock:
+            self.in_flight.pop(future, None)
+
+    def get_json(self, path):
+        return self._submit(self._get_json(path), "background").result()
+
+    def post_json(self, path, payload, group="interactive", tag=None):
+        """Non-streaming POST. Returns the decoded JSON body (raises CancelledError if cancelled)."""
+        return self._submit(self._post_json(path, payload), group, tag).result()
+
+    def stream(self, path, payload, group="interactive", tag=None):
+        """
+        Streaming POST. Yields each decoded JSON line. Closing the generator early, or cancel()
+        on its group (or cancel_tag() on its tag), closes the connection; a cancelled stream just ends.
+        """
+        out_queue = queue.Queue()
+        future = self._submit(self._stream(path, payload, out_queue), group, tag)
+        future.add_done_callback(lambda _: out_queue.put(_END))
+        try:
+            while True:
+                item = out_queue.get()
+                if item is _END:
+                    break
+                yield item
+            if not future.cancelled() and future.exception() is not None:
+                raise future.exception()
+        finally:
+            future.cancel()  # No-op once the stream has finished
+
+    def cancel(self, group="interactive"):
+        """Cancels every in-flight request in a group. Returns how many were cancelled."""
+        with self.lock:
+            futures = [future for future, (future_group, _) in self.in_flight.items() if future_group == group]
+        for future in futures:
+            future.cancel()
+        return len(futures)
+
+    def cancel_tag(self, tag):
+        """Cancels the in-flight request(s) submitted with this tag (see llm_backend preemption)."""
+        with self.lock:
+            futures = [future for future, (_, future_tag) in self.in_flight.items() if future_tag == tag]
+        for future in futures:
+            future.cancel()
+        return len(futures)
+
+    def shutdown(self):
+        async def _close():
+            if self.session is not None:
+                await self.session.close()
+        asyncio.run_coroutine_threadsafe(_close(), self.loop).result(timeout=2)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    # --- Metrics ---
+    def _record(self, path, model, start, ttfb, ttft, final):
+        eval_count = final.get("eval_count", 0)
+        eval_seconds = final.get("eval_duration", 0) / 1e9
+        metric = {
+            "endpoint": path.rsplit("/", 1)[-1],
+            "model": model,
+            "ttfb_ms": ttfb * 1000,
+            "ttft_ms": ttft * 1000 if ttft is not None else None,
+            "total_ms": (time.perf_counter() - start) * 1000,
+            "prompt_tokens": final.get("prompt_eval_count", 0),
+            "eval_tokens": eval_count,
+            "tokens_per_sec": eval_count / eval_seconds if eval_seconds else 0.0,
+            "load_ms": final.get("load_duration", 0) / 1e6,
+        }
+        # load_duration only comes in the final chunk: a stream closed before it (every Router call, stopped
+        # chats) can't tell a cold load from a warm one, so it isn't filed as either.
+        finished = bool(final.get("done"))
+        cold = finished and metric["load_ms"] >= self.settings["cold_load_ms"]
+        generated = finished and metric["ttft_ms"] is not None and final.get("done_reason") != "load"  # Not a warm-up ping
+        with self.lock:
+            self.metrics.append(metric)
+            self.request_count += 1
+            if final.get("done_reason") != "load":
+                self.last_used[model] = time.monotonic()
+            if generated:
+                stats = self.ttft_by_load.setdefault("cold" if cold else "warm", [0, 0.0, 0.0])
+                stats[0] += 1
+                stats[1] += metric["ttft_ms"]
+                stats[2] += metric["load_ms"]
+        if cold and generated:
+            self.log(f"Ollama {model} was cold: loading it took {metric['load_ms']:.0f} ms of the "
+                     f"{metric['ttft_ms']:.0f} ms to the first token (unloaded after keep_alive?).", "WARNING")
+        ttft_text = f"{metric['ttft_ms']:.0f} ms" if metric["ttft_ms"] is not None else "n/a"
+        self.log(f"Ollama {metric['endpoint']} ({model}): TTFB {metric['ttfb_ms']:.0f} ms, TTFT {ttft_text}, "
+                 f"{metric['prompt_tokens']} prompt + {eval_count} generated tokens at {metric['tokens_per_sec']:.1f} tok/s, "
+                 f"total {metric['total_ms']:.0f} ms.")
+        return metric
+
+    def stats_line(self):
+        with self.lock:
+            last = self.metrics[-1] if self.metrics else None
+            count = self.request_count
+        if last is None:
+            return "Ollama: no requests yet"
+        ttft = f"{last['ttft_ms']:.0f} ms" if last["ttft_ms"] is not None else "n/a"
+        return (f"Ollama: {count} requests on {self.connections_opened()} connection(s); last {last['endpoint']} ({last['model']}) "
+                f"TTFB {last['ttfb_ms']:.0f} ms, TTFT {ttft}, {last['tokens_per_sec']:.1f} tok/s")
+
+    def load_stats_line(self):
+        """First-token latency of requests that found their model loaded (warm) versus had to load it (cold)."""
+        with self.lock:
+            stats = {state: list(values) for state, values in self.ttft_by_load.items()}
+        parts = []
+        if "warm" in stats:
+            count, total, _ = stats["warm"]
+            parts.append(f"warm avg {total / count:.0f} ms (n={count})")
+        if "cold" in stats:
+            count, total, load = stats["cold"]
+            parts.append(f"cold avg {total / count:.0f} ms (n={count}, model load avg {load / count:.0f} ms)")
+        return "Ollama TTFT: " + (", ".join(parts) or "no requests yet")
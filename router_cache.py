@@ -0,0 +1,114 @@
+# router_cache.py
+import re
+import time
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def normalize_utterance(text):
+    """Lowercases, collapses whitespace and drops trailing punctuation so trivial variants share a key."""
+    text = re.sub(r'\s+', ' ', str(text).lower()).strip()
+    return text.rstrip(' .!?')
+
+
+def hash_tool_schema(tools):
+    """Stable hash of the tool list handed to the Router AI."""
+    ordered = sorted(tools, key=lambda tool: tool.get("name", ""))
+    return hashlib.sha1(json.dumps(ordered, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class RouterDecisionCache:
+    """
+    Bounded LRU cache with a TTL for Router AI tool decisions.
+    Keys are (normalized utterance, tool schema hash), so a changed tool list never
+    serves a stale decision even before the cache is explicitly cleared.
+    """
+    def __init__(self, max_entries=256, ttl_seconds=600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()   # key -> (stored_at, decision)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, max_entries, ttl_seconds):
+        with self.lock:
+            self.max_entries = max(1, int(max_entries))
+            self.ttl_seconds = float(ttl_seconds)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get(self, utterance, schema_hash):
+        key = (normalize_utterance(utterance), schema_hash)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl_seconds:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(entry[1])
+            if entry is not None:
+                del self.entries[key]  # Expired
+            self.misses += 1
+            return None
+
+    def put(self, utterance, schema_hash, decision):
+        """Stores a decision, but only if it can be reproduced from the utterance alone."""
+        if not self.is_cacheable(utterance, decision):
+            return False
+        key = (normalize_utterance(utterance), schema_hash)
+        with self.lock:
+            # Stored as JSON so callers can never mutate the cached copy.
+            self.entries[key] = (time.monotonic(), json.dumps(decision))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return True
+
+    @staticmethod
+    def is_cacheable(utterance, decision):
+        """
+        True for tool decisions whose every parameter value appears verbatim in the utterance.
+        Parameters the Router AI inferred from history or invented are not safe to replay.
+        Null decisions are skipped too: the Router returns the same shape when it fails.
+        """
+        if not isinstance(decision, dict) or not decision.get("tool_name"):
+            return False
+        parameters = decision.get("parameters") or {}
+        if not isinstance(parameters, dict):
+            return False
+        haystack = re.sub(r'\s+', ' ', str(utterance).lower())
+        for value in parameters.values():
+            needle = re.sub(r'\s+', ' ', str(value).lower()).strip()
+            if not needle or needle not in haystack:
+                return False
+        return True
+
+    def rekey(self, old_schema_hash, new_schema_hash, affected_tools):
+        """
+        Carries entries over to a new tool schema after a partial skill reload. Decisions for
+        the affected tools are dropped; every other decision stays valid. Returns the drop count.
+        """
+        dropped = 0
+        with self.lock:
+            for key in list(self.entries):
+                utterance, schema_hash = key
+                stored_at, decision_json = self.entries[key]
+                if json.loads(decision_json).get("tool_name") in affected_tools or schema_hash != old_schema_hash:
+                    del self.entries[key]
+                    dropped += 1
+                elif new_schema_hash != old_schema_hash:
+                    # Re-insert in place of the old key, keeping LRU order and original timestamp.
+                    del self.entries[key]
+                    self.entries[(utterance, new_schema_hash)] = (stored_at, decision_json)
+        return dropped
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats_line(self):
+        total = self.hits + self.misses
+        hit_rate = (self.hits / total * 100) if total else 0.0
+        return f"Router cache: {self.hits} hits / {self.misses} misses ({hit_rate:.0f}%), {len(self.entries)}/{self.max_entries} entries"
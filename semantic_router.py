@@ -0,0 +1,223 @@
+# semantic_router.py
+import re
+import threading
+import time
+import faiss
+
+import ai_logic
+
+
+def _example_from_regex(regex_pattern):
+    """Turns a skill regex into a rough example phrase (same idea as the help skill)."""
+    if not regex_pattern:
+        return ""
+    # Keep the first option of every (a|b) / (?:a|b) group; routable tools take no params.
+    example = re.sub(r'\((?:\?:)?([^|)]+)[^)]*\)\??', r'\1', regex_pattern)
+    example = example.split('|')[0]
+    example = re.sub(r'\\[bsd]', ' ', example)
+    example = re.sub(r'[\^\$\?\*\+\\]', '', example)
+    return re.sub(r'\s+', ' ', example).strip()
+
+
+class SemanticRouter:
+    """
+    Embedding-based fast path in front of the Router AI.
+    Each tool's description and example phrasings are embedded once into an in-memory
+    FAISS index; an utterance that is close enough to a single tool is routed directly.
+    The same index ranks tools for the Router AI, so its prompt only lists the top k.
+    """
+    def __init__(self, app_controller):
+        self.app = app_controller
+        self.log = self.app.queue_log
+        self.index = None
+        self.row_tools = []     # FAISS row -> tool name
+        self.tool_vectors = {}  # tool name -> (phrasings, unit embeddings), reused across rebuilds
+        self.routable = set()   # Tools the fast path may run directly (no params, not opted out)
+        self.last_query = (None, None, None)  # (utterance, index, ranking), shared by route() and select_tools()
+        self.lock = threading.Lock()
+        self.llm_router_avg_ms = None  # Running average of the Router AI call, for "latency saved"
+        self.stats = {"fast_path": 0, "fallback": 0, "retrieved": 0}
+
+    def _settings(self):
+        settings = self.app.config.get("semantic_router", {})
+        return (
+            settings.get("enabled", True),
+            float(settings.get("threshold", 0.72)),
+            float(settings.get("margin", 0.05)),
+        )
+
+    def _retrieval_settings(self):
+        settings = self.app.config.get("router_tool_retrieval", {})
+        return settings.get("enabled", True), int(settings.get("top_k", 8))
+
+    def rebuild(self, command_map, tools):
+        """Embeds every tool. `tools` is the output of CommandHandler.get_tools_for_ai()."""
+        model = ai_logic.EMBEDDING_MODEL
+        if model is None:
+            self.log("Semantic router disabled: embedding model is not loaded.", "WARNING")
+            with self.lock:
+                self.index, self.row_tools, self.routable = None, [], set()
+            return
+
+        start = time.perf_counter()
+        tool_phrasings = {}
+        routable = set()
+        for tool in tools:
+            name = tool["name"]
+            cmd_data = command_map.get(name, {})
+            # Only tools without parameters can be run without the Router AI extracting arguments.
+            if not cmd_data.get('params') and cmd_data.get('semantic_route', True):
+                routable.add(name)
+            phrasings = [tool["description"]] + list(cmd_data.get('examples', []))
+            regex_example = _example_from_regex(cmd_data.get('regex'))
+            if regex_example:
+                phrasings.append(regex_example)
+            tool_phrasings[name] = tuple(phrasings)
+
+        # Only tools whose phrasings changed (e.g. a hot-reloaded skill) are re-embedded.
+        stale = [name for name, phrasings in tool_phrasings.items()
+                 if self.tool_vectors.get(name, (None,))[0] != phrasings]
+        if stale:
+            texts = [phrase for name in stale for phrase in tool_phrasings[name]]
+            embeddings = model.encode(texts, normalize_embeddings=True).astype('float32')
+            offset = 0
+            for name in stale:
+                count = len(tool_phrasings[name])
+                self.tool_vectors[name] = (tool_phrasings[name], embeddings[offset:offset + count])
+                offset += count
+        self.tool_vectors = {name: self.tool_vectors[name] for name in tool_phrasings}
+
+        if not self.tool_vectors:
+            with self.lock:
+                self.index, self.row_tools, self.routable = None, [], set()
+            return
+
+        index = None
+        row_tools = []
+        for name, (phrasings, vectors) in self.tool_vectors.items():
+            if index is None:
+                index = faiss.IndexFlatIP(vectors.shape[1])  # Inner product on unit vectors == cosine
+            index.add(vectors)
+            row_tools.extend([name] * len(phrasings))
+        with self.lock:
+            self.index, self.row_tools, self.routable = index, row_tools, routable
+        self.log(f"Semantic router indexed {len(row_tools)} phrasings for {len(self.tool_vectors)} tools "
+                 f"({len(routable)} routable, {len(stale)} re-embedded) in {(time.perf_counter() - start) * 1000:.0f} ms.")
+
+    def _rank(self, utterance):
+        """
+        Returns [(tool name, best cosine score)] for every indexed tool, best first, or None when
+        no index is available. The last ranking is memoized so routing and retrieval embed once.
+        """
+        with self.lock:
+            index, row_tools = self.index, self.row_tools
+            last_utterance, last_index, last_ranking = self.last_query
+        if index is None or ai_logic.EMBEDDING_MODEL is None:
+            return None
+        if last_utterance == utterance and last_index is index:
+            return last_ranking
+        ranking = self._rank_many(index, row_tools, [utterance])[0]
+        with self.lock:
+            self.last_query = (utterance, index, ranking)
+        return ranking
+
+    def _rank_many(self, index, row_tools, utterances):
+        """Rankings for several utterances from a single batched encode."""
+        queries = ai_logic.EMBEDDING_MODEL.encode(list(utterances), normalize_embeddings=True).astype('float32')
+        # A flat index over a few hundred phrasings is cheap to scan completely.
+        scores, rows = index.search(queries, index.ntotal)
+
+        rankings = []
+        for query_scores, query_rows in zip(scores, rows):
+            # Collapse phrasings to the best score per tool.
+            best_per_tool = {}
+            for score, row in zip(query_scores, query_rows):
+                if row < 0: continue
+                name = row_tools[row]
+                best_per_tool[name] = max(best_per_tool.get(name, -1.0), float(score))
+            rankings.append(sorted(best_per_tool.items(), key=lambda item: item[1], reverse=True))
+        return rankings
+
+    def _decide(self, ranked, threshold, margin):
+        """(decision or None, top name, top score, runner-up score) for a ranking."""
+        top_name, top_score = ranked[0]
+        # The runner-up may be a tool with parameters: being close to one of those is ambiguity too.
+        runner_up = ranked[1][1] if len(ranked) > 1 else -1.0
+        if top_name in self.routable and top_score >= threshold and top_score - runner_up >= margin:
+            return {"tool_name": top_name, "parameters": {}}, top_name, top_score, runner_up
+        return None, top_name, top_score, runner_up
+
+    def peek(self, utterances, remember=None):
+        """
+        The decision route() would make for each utterance, from one batched encode, without
+        counting it in the routing stats or logging it. Used to test candidate sub-intents.
+        `remember` is encoded in the same batch and memoized, so a later route() or
+        select_tools() on it (the whole command, if the split is rejected) doesn't encode again.
+        """
+        enabled, threshold, margin = self._settings()
+        with self.lock:
+            index, row_tools = self.index, self.row_tools
+        if not enabled or not utterances or index is None or ai_logic.EMBEDDING_MODEL is None:
+            return [None] * len(utterances)
+        batch = list(utterances) + ([remember] if remember is not None else [])
+        rankings = self._rank_many(index, row_tools, batch)
+        if remember is not None:
+            with self.lock:
+                self.last_query = (remember, index, rankings.pop())
+        return [self._decide(ranked, threshold, margin)[0] if ranked else None for ranked in rankings]
+
+    def route(self, utterance):
+        """
+        Returns a Router-style decision {"tool_name", "parameters"} when one tool clears the
+        similarity threshold by a clear margin, otherwise None (ask the Router AI).
+        """
+        enabled, threshold, margin = self._settings()
+        if not enabled:
+            return None
+
+        start = time.perf_counter()
+        ranked = self._rank(utterance)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if not ranked:
+            return None
+        decision, top_name, top_score, runner_up = self._decide(ranked, threshold, margin)
+        if decision is not None:
+            self.stats["fast_path"] += 1
+            saved = f", saved ~{self.llm_router_avg_ms - elapsed_ms:.0f} ms" if self.llm_router_avg_ms else ""
+            self.log(f"Semantic router: '{top_name}' (cos={top_score:.2f}, margin={top_score - runner_up:.2f}) in {elapsed_ms:.0f} ms{saved}.")
+            return decision
+
+        self.stats["fallback"] += 1
+        self.log(f"Semantic router: ambiguous (best '{top_name}' cos={top_score:.2f}, runner-up {runner_up:.2f}). Falling back to Router AI.")
+        return None
+
+    def select_tools(self, utterance, tools):
+        """
+        Narrows `tools` to the top-k most similar to the utterance for the Router AI prompt.
+        The subset keeps the original tool order so identical subsets give identical prompts.
+        Returns `tools` unchanged when retrieval is disabled or unavailable.
+        """
+        enabled, top_k = self._retrieval_settings()
+        if not enabled or top_k <= 0 or len(tools) <= top_k:
+            return tools
+
+        start = time.perf_counter()
+        ranked = self._rank(utterance)
+        if not ranked:
+            return tools
+        selected = {name for name, _ in ranked[:top_k]}
+        subset = [tool for tool in tools if tool["name"] in selected]
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.stats["retrieved"] += 1
+        self.log(f"Tool retrieval: {len(subset)}/{len(tools)} tools for the Router AI in {elapsed_ms:.0f} ms "
+                 f"({', '.join(name for name, _ in ranked[:top_k])}).")
+        return subset
+
+    def record_llm_router_latency(self, elapsed_ms):
+        """Feeds the running average used to report how much the fast path saves."""
+        if self.llm_router_avg_ms is None:
+            self.llm_router_avg_ms = elapsed_ms
+        else:
+            self.llm_router_avg_ms = 0.8 * self.llm_router_avg_ms + 0.2 * elapsed_ms
@@ -0,0 +1,118 @@
+# skill_cache.py
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+from router_cache import normalize_utterance
+
+CACHE_VERSION = 1
+
+
+class SkillResultCache:
+    """
+    Per-skill TTL cache of skill results, for skills that declare one in register():
+
+        'cache': {'ttl': 600, 'max_entries': 32, 'persist': False, 'config_keys': ['default_location']}
+
+    Keys are built from the skill's declared params (normalized like utterances) plus any config
+    values the result depends on. Structured errors ({"error": ...}) are never cached.
+    Entries of skills with 'persist': True are also written to disk and survive restarts.
+    """
+    def __init__(self, log_callback, path="skill_cache.json"):
+        self.log = log_callback
+        self.path = path
+        self.entries = {}  # skill name -> OrderedDict(key -> (stored_at, result)), oldest first
+        self.persistent = set()  # Skills whose entries go to disk
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            self.log(f"Skill result cache unreadable, starting empty: {e}", "WARNING")
+            return
+        if data.get("version") != CACHE_VERSION:
+            return
+        for name, entries in data.get("skills", {}).items():
+            self.entries[name] = OrderedDict((key, (stored_at, result)) for key, stored_at, result in entries)
+            self.persistent.add(name)
+
+    def _save(self):
+        """Writes the persistent skills' entries. Caller holds the lock."""
+        skills = {name: [[key, stored_at, result] for key, (stored_at, result) in self.entries.get(name, {}).items()]
+                  for name in self.persistent}
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": CACHE_VERSION, "skills": skills}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.log(f"Could not write skill result cache: {e}", "WARNING")
+
+    @staticmethod
+    def make_key(cmd_data, kwargs, config):
+        spec = cmd_data['cache']
+        params = {name: normalize_utterance(kwargs.get(name) or "") for name in cmd_data.get('params', [])}
+        depends_on = {key: config.get(key) for key in spec.get('config_keys', [])}
+        return json.dumps([params, depends_on], sort_keys=True)
+
+    def get(self, name, key, spec):
+        """Returns (result, age in seconds) for a fresh entry, else None."""
+        with self.lock:
+            entries = self.entries.get(name)
+            entry = entries.get(key) if entries else None
+            if entry is not None:
+                age = time.time() - entry[0]
+                if age <= spec.get('ttl', 60):
+                    entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1], age
+                del entries[key]  # Expired
+            self.misses += 1
+            return None
+
+    def put(self, name, key, spec, result):
+        """Stores a result unless it is an error or can't be cached. Returns True if stored."""
+        if result is None or (isinstance(result, dict) and 'error' in result):
+            return False
+        persist = spec.get('persist', False) and bool(self.path)
+        if persist:
+            try:
+                json.dumps(result)
+            except (TypeError, ValueError):
+                persist = False
+        with self.lock:
+            entries = self.entries.setdefault(name, OrderedDict())
+            entries[key] = (time.time(), result)
+            entries.move_to_end(key)
+            while len(entries) > max(1, int(spec.get('max_entries', 32))):
+                entries.popitem(last=False)
+            if persist:
+                self.persistent.add(name)
+                self._save()
+        return True
+
+    def invalidate(self, names):
+        """Drops the entries of reloaded skills: their code (and so their results) may have changed."""
+        with self.lock:
+            dropped = sum(len(self.entries.pop(name, {})) for name in names)
+            if self.persistent & set(names):
+                self.persistent -= set(names)
+                self._save()
+        return dropped
+
+    def stats_line(self):
+        with self.lock:
+            total = sum(len(entries) for entries in self.entries.values())
+            on_disk = sum(len(self.entries.get(name, {})) for name in self.persistent)
+        lookups = self.hits + self.misses
+        hit_rate = (self.hits / lookups * 100) if lookups else 0.0
+        return f"Skill result cache: {self.hits} hits / {self.misses} misses ({hit_rate:.0f}%), {total} entries ({on_disk} on disk)"
@@ -0,0 +1,76 @@
+# skill_dispatcher.py
+import re
+
+
+class SkillDispatcher:
+    """
+    Precompiled regex index over the command map.
+    All skill patterns are folded into one anchored alternation (one named group per
+    skill, in priority order), so a command is matched against every skill in a single pass.
+    """
+    def __init__(self, command_map, log_callback=None):
+        self.log = log_callback or (lambda *args, **kwargs: None)
+        self.entries = []       # [(cmd_name, compiled_pattern, cmd_data)] in priority order
+        self.group_map = {}     # outer group index -> (entry position, first param group index)
+        self.combined = None
+        self._build(command_map)
+
+    def _build(self, command_map):
+        alternatives = []
+        # Priority is the same as the old per-command loop: alphabetical by command name.
+        for cmd_name in sorted(command_map.keys()):
+            cmd_data = command_map[cmd_name]
+            regex_pattern = cmd_data.get('regex')
+            if not regex_pattern:
+                continue
+
+            body = regex_pattern.lstrip('^')
+            try:
+                compiled = re.compile(r'^\s*' + body, re.IGNORECASE)
+            except re.error as e:
+                self.log(f"ERROR compiling regex for skill '{cmd_name}': {e}", "ERROR")
+                continue
+
+            self.entries.append((cmd_name, compiled, cmd_data))
+            alternatives.append((len(self.entries) - 1, body, compiled.groups))
+
+        if not alternatives:
+            return
+
+        # Each skill becomes (?P<_sN>...) and its own capture groups follow right after it.
+        parts = []
+        group_index = 1
+        for position, body, inner_groups in alternatives:
+            parts.append(f"(?P<_s{position}>{body})")
+            self.group_map[group_index] = (position, group_index + 1)
+            group_index += 1 + inner_groups
+
+        try:
+            self.combined = re.compile(r'^\s*(?:' + '|'.join(parts) + ')', re.IGNORECASE)
+        except re.error as e:
+            # Fall back to scanning the individually compiled patterns.
+            self.log(f"Could not build combined skill regex, using per-skill matching: {e}", "WARNING")
+            self.combined = None
+
+    def match(self, command_lower, start=0):
+        """
+        Finds the highest-priority skill (at or after entry `start`) whose regex matches.
+        Returns (position, cmd_name, cmd_data, groups) or None, where `groups` holds only
+        that skill's own capture groups.
+        """
+        if start == 0 and self.combined is not None:
+            match = self.combined.match(command_lower)
+            if not match:
+                return None
+            # The skill's outer group closes last, so lastindex identifies the winner.
+            position, first_group = self.group_map[match.lastindex]
+            cmd_name, compiled, cmd_data = self.entries[position]
+            groups = tuple(match.group(g) for g in range(first_group, first_group + compiled.groups))
+            return position, cmd_name, cmd_data, groups
+
+        for position in range(start, len(self.entries)):
+            cmd_name, compiled, cmd_data = self.entries[position]
+            match = compiled.match(command_lower)
+            if match:
+                return position, cmd_name, cmd_data, match.groups()
+        return None
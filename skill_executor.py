@@ -0,0 +1,181 @@
+# skill_executor.py
+import time
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import pythoncom
+
+from skill_cache import SkillResultCache
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class SkillTimeoutError(Exception):
+    """A skill did not finish within its timeout budget."""
+
+
+class SkillCancelledError(Exception):
+    """The interaction was stopped while a skill was still running."""
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram for one skill."""
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total = 0
+        self.max_ms = 0.0
+        self.timeouts = 0
+
+    def record(self, elapsed_ms):
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if elapsed_ms <= bound), len(LATENCY_BUCKETS_MS))
+        self.counts[bucket] += 1
+        self.total += 1
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of calls, capped at the slowest call seen."""
+        if not self.total:
+            return 0.0
+        target = fraction * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(LATENCY_BUCKETS_MS[i], self.max_ms) if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+
+class SkillExecutor:
+    """
+    Runs skill handlers on a bounded, COM-initialized thread pool with a per-skill timeout budget
+    (the 'timeout' key in register(), else config['skill_executor']['default_timeout']).
+    'timeout': None means no deadline, for skills that wait on the user (routines, OAuth consent).
+    The budget starts when the handler does: time queued behind other skills isn't charged to it.
+    The caller waits until the skill finishes, its budget runs out, or `stop_generating_event`
+    is set. Python threads can't be killed: a skill that overruns keeps its worker until it
+    returns, and long-running skills can check `app.stop_generating_event` to exit early.
+    Skills that declare a 'cache' entry are answered from the result cache while it is fresh.
+    """
+    def __init__(self, app_controller, log_callback):
+        self.app = app_controller
+        self.log = log_callback
+        self.pool = None
+        self.pool_size = 0
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.histograms = {}  # skill name -> LatencyHistogram
+        cache_settings = self.app.config.get("skill_cache", {})
+        self.result_cache = SkillResultCache(self.log, cache_settings.get("path", "skill_cache.json"))
+
+    def _settings(self):
+        settings = self.app.config.get("skill_executor", {})
+        return max(1, int(settings.get("max_workers", 4))), float(settings.get("default_timeout", 30))
+
+    def _get_pool(self, max_workers):
+        with self.lock:
+            if self.pool is None or self.pool_size != max_workers:
+                if self.pool is not None:
+                    self.pool.shutdown(wait=False)
+                self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="skill",
+                                               initializer=pythoncom.CoInitialize)
+                self.pool_size = max_workers
+            return self.pool
+
+    def shutdown(self):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    def _invoke(self, name, handler, kwargs, abandoned, started):
+        with self.lock:
+            self.queued -= 1
+            self.running += 1
+        start = time.perf_counter()
+        started.append(start)
+        try:
+            return handler(self.app, **kwargs)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self.lock:
+                self.running -= 1
+                self.histograms.setdefault(name, LatencyHistogram()).record(elapsed_ms)
+            if abandoned.is_set():
+                self.log(f"Skill '{name}' finished after being abandoned ({elapsed_ms:.0f} ms). Result discarded.", "WARNING")
+
+    def run(self, name, cmd_data, kwargs):
+        """
+        Calls the skill's handler and returns its result.
+        Raises SkillTimeoutError or SkillCancelledError instead of waiting any longer.
+        """
+        cache_key = None
+        if cmd_data.get('cache') and self.app.config.get("skill_cache", {}).get("enabled", True):
+            cache_key = self.result_cache.make_key(cmd_data, kwargs, self.app.config)
+            cached = self.result_cache.get(name, cache_key, cmd_data['cache'])
+            if cached is not None:
+                result, age = cached
+                self.log(f"Skill '{name}' served from cache (age {age:.0f}s).")
+                return result
+
+        max_workers, default_timeout = self._settings()
+        timeout = cmd_data.get('timeout', default_timeout)
+        timeout = float(timeout) if timeout is not None else None
+        cancel_event = self.app.stop_generating_event
+        abandoned = threading.Event()
+        started = []  # Start time, once a worker picks the skill up
+
+        with self.lock:
+            self.queued += 1
+        try:
+            future = self._get_pool(max_workers).submit(self._invoke, name, cmd_data['handler'], kwargs, abandoned, started)
+        except RuntimeError:  # Pool shut down (app exiting)
+            with self.lock:
+                self.queued -= 1
+            raise SkillCancelledError(name)
+
+        while True:
+            remaining = started[0] + timeout - time.perf_counter() if started and timeout is not None else 0.1
+            if remaining <= 0:
+                abandoned.set()
+                self._abandon(future)
+                with self.lock:
+                    self.histograms.setdefault(name, LatencyHistogram()).timeouts += 1
+                self.log(f"Skill '{name}' exceeded its {timeout:g}s budget.", "WARNING")
+                raise SkillTimeoutError(name)
+            try:
+                result = future.result(timeout=min(0.1, remaining))
+            except FutureTimeoutError:
+                if cancel_event.is_set():
+                    abandoned.set()
+                    self._abandon(future)
+                    self.log(f"Skill '{name}' cancelled by the user.")
+                    raise SkillCancelledError(name)
+            else:
+                if cache_key is not None:
+                    self.result_cache.put(name, cache_key, cmd_data['cache'], result)
+                return result
+
+    def _abandon(self, future):
+        # A skill that hasn't started yet never will; one that has runs to completion unobserved.
+        if future.cancel():
+            with self.lock:
+                self.queued -= 1
+
+    def fallback_message(self, name, cmd_data):
+        """What to say when a skill runs out of time."""
+        return cmd_data.get('timeout_message') or self.app.config.get("skill_executor", {}).get(
+            "timeout_message", "Sorry, that's taking longer than expected. Please try again in a moment.")
+
+    def stats_lines(self):
+        """Queue depth plus p50/p95 for the slowest skills, for the performance panel."""
+        with self.lock:
+            queued, running = self.queued, self.running
+            histograms = [(name, h) for name, h in self.histograms.items() if h.total or h.timeouts]
+        lines = [f"Skill pool: {running} running, {queued} queued", self.result_cache.stats_line()]
+        histograms.sort(key=lambda item: item[1].percentile(0.95), reverse=True)
+        for name, h in histograms[:5]:
+            lines.append(f"  {name}: n={h.total} p50<={h.percentile(0.5):.0f} ms p95<={h.percentile(0.95):.0f} ms "
+                         f"max {h.max_ms:.0f} ms, {h.timeouts} timeouts")
+        return lines
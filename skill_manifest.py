@@ -0,0 +1,148 @@
+# skill_manifest.py
+import os
+import sys
+import json
+import time
+import threading
+import importlib
+
+MANIFEST_VERSION = 1
+
+
+class LazySkillHandler:
+    """
+    Stands in for a skill handler until it is first called.
+    The skill module (and its heavy dependencies) is only imported at that point.
+    """
+    def __init__(self, manifest, module_name, func_name):
+        self.manifest = manifest
+        self.module_name = module_name
+        self.func_name = func_name
+        self.__name__ = func_name
+
+    def resolve(self):
+        """Imports the skill module if needed and returns the real handler function."""
+        module = self.manifest.import_skill(self.module_name)
+        return getattr(module, self.func_name)
+
+    def __call__(self, app, **kwargs):
+        return self.resolve()(app, **kwargs)
+
+    def __repr__(self):
+        return f"<LazySkillHandler {self.module_name}.{self.func_name}>"
+
+
+class SkillManifest:
+    """
+    Generated cache of every skill's register() metadata (regex, params, description...).
+    Entries are keyed by skill filename and invalidated by the file's mtime and size, so
+    only new or edited skills are imported at startup.
+    """
+    def __init__(self, skills_dir, log_callback, manifest_path=None):
+        self.skills_dir = skills_dir
+        self.log = log_callback
+        self.manifest_path = manifest_path or os.path.join(skills_dir, "skill_manifest.json")
+        self.skills = {}          # filename -> {"fingerprint": [...], "commands": {...}}
+        self.import_timings = {}  # module_name -> milliseconds spent importing it
+        self.import_lock = threading.Lock()
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.skills = data.get("skills", {})
+        except (json.JSONDecodeError, OSError) as e:
+            self.log(f"Skill manifest unreadable, it will be regenerated: {e}", "WARNING")
+
+    def save(self):
+        """Writes the manifest if anything changed. Uses a temp file so a crash never leaves it half-written."""
+        if not self.dirty:
+            return
+        tmp_path = self.manifest_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": MANIFEST_VERSION, "skills": self.skills}, f, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+            self.dirty = False
+        except OSError as e:
+            self.log(f"Could not write skill manifest: {e}", "WARNING")
+
+    def _fingerprint(self, filename):
+        stat = os.stat(os.path.join(self.skills_dir, filename))
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def import_skill(self, module_name, reload=False):
+        """Imports (or reloads) a skill module and records how long it took."""
+        with self.import_lock:
+            module = sys.modules.get(module_name)
+            if module is not None and not reload:
+                return module
+            start = time.perf_counter()
+            module = importlib.reload(module) if module is not None else importlib.import_module(module_name)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.import_timings[module_name] = elapsed_ms
+        self.log(f"Imported skill module '{module_name}' in {elapsed_ms:.0f} ms.")
+        return module
+
+    @staticmethod
+    def _serialize(module, commands):
+        """
+        Converts a register() result into JSON metadata, replacing handlers by their names.
+        Returns None when the skill can't be described that way (e.g. handlers defined elsewhere).
+        """
+        serialized = {}
+        for cmd_name, cmd_data in commands.items():
+            handler = cmd_data.get('handler')
+            if handler is None or getattr(module, getattr(handler, '__name__', ''), None) is not handler:
+                return None
+            entry = {key: value for key, value in cmd_data.items() if key != 'handler'}
+            try:
+                json.dumps(entry)
+            except (TypeError, ValueError):
+                return None
+            entry['handler'] = handler.__name__
+            serialized[cmd_name] = entry
+        return serialized
+
+    def get_commands(self, filename):
+        """
+        Returns this skill's command entries. Uses cached metadata with lazy handlers when the
+        file is unchanged; otherwise imports the module, calls register() and refreshes the cache.
+        """
+        module_name = f"skills.{filename[:-3]}"
+        fingerprint = self._fingerprint(filename)
+        cached = self.skills.get(filename)
+
+        if cached and cached.get("fingerprint") == fingerprint and cached.get("commands") is not None:
+            commands = {}
+            for cmd_name, entry in cached["commands"].items():
+                cmd_data = {'handler': LazySkillHandler(self, module_name, entry['handler'])}
+                cmd_data.update((key, value) for key, value in entry.items() if key != 'handler')
+                commands[cmd_name] = cmd_data
+            return commands
+
+        # New or edited skill: import it now (reloading picks up edits) and re-describe it.
+        module = self.import_skill(module_name, reload=True)
+        commands = module.register() if hasattr(module, 'register') else {}
+        self.skills[filename] = {"fingerprint": fingerprint, "commands": self._serialize(module, commands)}
+        self.dirty = True
+        return commands
+
+    def prune(self, present_filenames):
+        """Drops manifest entries for skill files that no longer exist."""
+        for filename in list(self.skills):
+            if filename not in present_filenames:
+                del self.skills[filename]
+                self.dirty = True
+
+    def timings_line(self):
+        if not self.import_timings:
+            return "Skill imports: none yet (all skills served from manifest)"
+        slowest = sorted(self.import_timings.items(), key=lambda item: item[1], reverse=True)[:5]
+        total = sum(self.import_timings.values())
+        return "Skill imports: " + ", ".join(f"{name.split('.')[-1]} {ms:.0f} ms" for name, ms in slowest) + f" (total {total:.0f} ms)"
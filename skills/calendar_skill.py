@@ -64,6 +64,8 @@ def register():
             'handler': get_upcoming_events,
             'regex': r'\bwhat(?:\'s| is) on my calendar\b|\bdo i have any meetings\b|\bwhat are my upcoming events\b',
             'params': [],
-            'description': "Checks the user's Google Calendar for upcoming events or meetings."
+            'description': "Checks the user's Google Calendar for upcoming events or meetings.",
+            'examples': ["what's my schedule", "am i busy today", "what meetings do i have"],
+            'timeout': None  # The first run waits for the user to finish the OAuth consent page
         }
     }
\ No newline at end of file
@@ -3,7 +3,12 @@ from docx import Document
 from pptx import Presentation
 from openpyxl import Workbook
 import traceback
-from ai_logic import get_ai_response
+import ai_logic
+
+def _generate(app, prompt):
+    """One complete answer from the configured AI engine (skills run on a worker thread, so this may block)."""
+    messages = [{"role": "user", "content": prompt}]
+    return ai_logic.get_backend(app).chat(messages, app.config.get("chat_model", "llama3.1"))
 
 def summarize_document(app, command, attached_file=None, **kwargs):
     if not attached_file or not attached_file.endswith('.docx'):
@@ -15,8 +20,7 @@ def summarize_document(app, command, attached_file=None, **kwargs):
         if not full_text.strip(): return "The document appears to be empty."
         
         summary_prompt = f"Please provide a concise summary of the following document:\n\n{full_text[:15000]}"
-        response_stream, _ = get_ai_response(app, [], summary_prompt)
-        return "".join(list(response_stream))
+        return _generate(app, summary_prompt)
     except Exception as e:
         app.queue_log(f"Failed to process document {attached_file}: {e}")
         return "I'm sorry, I ran into an error reading that document."
@@ -37,8 +41,7 @@ def create_document(app, doc_type, topic, **kwargs):
                              f"--- INFORMATION ---\n{search_results}\n\n--- DOCUMENT CONTENT ---")
 
         app.queue_log(f"Generating content for {doc_type} on '{topic}' using AI...")
-        response_stream, _ = get_ai_response(app, [], formatting_prompt)
-        final_content = "".join(list(response_stream))
+        final_content = _generate(app, formatting_prompt)
 
         if not final_content.strip():
             return "I wasn't able to generate content for your document. The AI did not produce any text."
@@ -100,12 +103,14 @@ def register():
             'handler': summarize_document,
             'regex': r'summarize(?: this)? document',
             'params': [],
-            'description': "Summarizes a .docx document that the user has attached."
+            'description': "Summarizes a .docx document that the user has attached.",
+            'timeout': 120
         },
         'create_document': {
             'handler': create_document,
             'regex': r'create an? (word|powerpoint) (?:document|presentation|sheet|file) (?:on|about) (.+)', # Removed excel for now
             'params': ['doc_type', 'topic'],
-            'description': "Creates a new Word or PowerPoint file on a topic by researching the web. Note: Excel file creation is not yet supported."
+            'description': "Creates a new Word or PowerPoint file on a topic by researching the web. Note: Excel file creation is not yet supported.",
+            'timeout': 180
         },
     }
\ No newline at end of file
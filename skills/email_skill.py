@@ -141,7 +141,8 @@ def register():
             'handler': get_latest_emails,
             'regex': r'\b(read|check)\b my(?: latest)? emails?',
             'params': [],
-            'description': "Reads a summary of the most recent emails from the user's Gmail inbox."
+            'description': "Reads a summary of the most recent emails from the user's Gmail inbox.",
+            'timeout': None  # The first run waits for the user to finish the OAuth consent page
         },
         'start_email_conversation': {
             'handler': start_email_conversation,
@@ -28,6 +28,9 @@ def register():
             'handler': get_stock_price,
             'regex': r'^\s*what(?:\'s| is) the(?: current)? stock price for (.+)',
             'params': ['ticker'],
-            'description': "Gets the current stock price for a given company ticker symbol."
+            'description': "Gets the current stock price for a given company ticker symbol.",
+            'timeout': 10,
+            'warm_hosts': ['query1.finance.yahoo.com'],
+            'cache': {'ttl': 60, 'max_entries': 32}
         }
     }
\ No newline at end of file
@@ -1,12 +1,19 @@
 # skills/memory_skill.py
 import os
 import json
-import re
+import threading
 
-# This import is now needed to call the main AI from within the skill
-from ai_logic import get_ai_response
+import faiss
+import numpy as np
+
+import ai_logic
 
 MEMORY_FILE = "memory.json"
+VECTORS_FILE = "memory_vectors.npz"  # Each fact's embedding, keyed by its text; derived from MEMORY_FILE
+DEFAULT_SETTINGS = {
+    "top_k": 5,        # Facts put in the recall prompt
+    "min_score": 0.2,  # Cosine similarity below which a fact is not considered relevant
+}
 
 def _load_memory():
     """Loads the memory list from the JSON file."""
@@ -23,36 +30,125 @@ def _save_memory(data):
     with open(MEMORY_FILE, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=4)
 
+# --- Vector index over the facts ---
+class _MemoryIndex:
+    """
+    Inner-product index over the normalized fact embeddings, row i being fact i of memory.json.
+    The vectors are saved next to memory.json keyed by fact text, so a restart only re-embeds facts
+    that have none (added by hand, or saved before this index existed) and a crash between the two
+    writes can't misalign them: the index is always rebuilt in memory.json's order.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.facts = None  # What the index was built from; None until first loaded
+        self.index = None
+
+    def _encode(self, facts):
+        return ai_logic.EMBEDDING_MODEL.encode(facts, normalize_embeddings=True).astype('float32')
+
+    def sync(self, app, facts):
+        """Makes the index match `facts` (memory.json's list), embedding only facts it has no vector for. Caller holds the lock."""
+        if facts == self.facts:
+            return
+        known = dict(zip(self.facts, self.index.reconstruct_n(0, self.index.ntotal))) if self.facts else self._read_vectors(app)
+        missing = sorted({fact for fact in facts if fact not in known})
+        if missing:
+            app.queue_log(f"Embedding {len(missing)} memory facts.")
+            known.update(zip(missing, self._encode(missing)))
+        dim = ai_logic.EMBEDDING_MODEL.get_sentence_embedding_dimension()
+        self.index = faiss.IndexFlatIP(dim)
+        if facts:
+            self.index.add(np.stack([known[fact] for fact in facts]))
+        self.facts = list(facts)
+        if missing or len(known) != len(set(facts)):
+            self._write_vectors(app)
+
+    def _read_vectors(self, app):
+        if not os.path.exists(VECTORS_FILE):
+            return {}
+        try:
+            with np.load(VECTORS_FILE) as data:
+                return dict(zip(data["facts"].tolist(), data["vectors"]))
+        except (OSError, ValueError, KeyError) as e:
+            app.queue_log(f"Memory vectors unreadable, re-embedding all facts: {e}", "WARNING")
+            return {}
+
+    def _write_vectors(self, app):
+        unique = list(dict.fromkeys(self.facts))
+        vectors = self.index.reconstruct_n(0, self.index.ntotal) if self.facts else np.zeros((0, self.index.d), dtype='float32')
+        rows = [self.facts.index(fact) for fact in unique]
+        tmp_path = VECTORS_FILE + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, facts=np.array(unique, dtype=str), vectors=vectors[rows])
+            os.replace(tmp_path, VECTORS_FILE)
+        except OSError as e:
+            app.queue_log(f"Could not save memory vectors (they will be recomputed): {e}", "WARNING")
+
+    def search(self, app, facts, query, k):
+        """[(fact number, fact, score)] of the k facts most similar to the query, best first."""
+        with self.lock:
+            self.sync(app, facts)
+            if not self.index.ntotal:
+                return []
+            scores, rows = self.index.search(self._encode([query]), min(k, self.index.ntotal))
+        return [(int(row) + 1, facts[row], float(score)) for score, row in zip(scores[0], rows[0]) if row >= 0]
+
+    def update(self, app, facts):
+        with self.lock:
+            self.sync(app, facts)
+
+_INDEX = _MemoryIndex()
+
+def _index_memory(app, memory):
+    """Keeps the vector index in step after memory.json changed. Best effort: recall re-syncs anyway."""
+    if ai_logic.EMBEDDING_MODEL is None:
+        return
+    try:
+        _INDEX.update(app, memory)
+    except Exception as e:
+        app.queue_log(f"Could not update the memory index: {e}", "WARNING")
+
 def remember_fact(app, fact, **kwargs):
     """Stores a piece of information that the user provides."""
     memory = _load_memory()
     memory.append(fact.strip())
     _save_memory(memory)
+    _index_memory(app, memory)  # Embedded now, so recall only embeds the question
     app.queue_log(f"Memory saved: '{fact}'")
     return f"Okay, I'll remember that: {fact}."
 
 def intelligent_recall(app, query, **kwargs):
-    """Uses the main AI to answer a question based on stored memories."""
+    """Answers a question from the stored memories most relevant to it (not the whole list)."""
     memory = _load_memory()
     if not memory:
         return "I don't have any memories stored yet."
-    
-    memory_context = "\n".join([f"- {fact}" for fact in memory])
-    
-    # This prompt asks the main AI to act as a memory expert
-    prompt = (
-        "You are an expert at recalling information from a specific list of facts. "
-        "Based ONLY on the facts in the 'MEMORY' section below, answer the user's question. "
-        "If the answer isn't in the memory, say that you don't have that information stored.\n\n"
-        f"--- MEMORY ---\n{memory_context}\n\n"
-        f"--- QUESTION ---\n{query}\n\n"
-        "--- ANSWER ---"
-    )
-    
-    # Use the main AI logic to get a response, but don't stream it for a direct return
-    response_stream, _ = get_ai_response(app, [], prompt)
-    full_response = "".join(list(response_stream))
-    return full_response
+    settings = {**DEFAULT_SETTINGS, **app.config.get("memory", {})}
+
+    if ai_logic.EMBEDDING_MODEL is None:
+        app.queue_log("Embedding model not loaded; recalling from the most recent memories.", "WARNING")
+        relevant = [(number, fact) for number, fact in enumerate(memory, 1)][-settings["top_k"]:]
+    else:
+        hits = _INDEX.search(app, memory, query, settings["top_k"])
+        relevant = [(number, fact) for number, fact, score in hits if score >= settings["min_score"]]
+        app.queue_log(f"Memory recall: {len(relevant)} of {len(memory)} facts relevant "
+                      f"(scores {', '.join(f'{score:.2f}' for _, _, score in hits)}).")
+        if not relevant:
+            return "I don't have anything stored about that."
+
+    memory_context = "\n".join(f"- {fact}" for _, fact in relevant)
+    messages = [
+        {"role": "system", "content": "You are an expert at recalling information from a specific list of facts. "
+                                      "Based ONLY on the facts in the 'MEMORY' section, answer the user's question. "
+                                      "If the answer isn't in the memory, say that you don't have that information stored."},
+        {"role": "user", "content": f"--- MEMORY ---\n{memory_context}\n\n--- QUESTION ---\n{query}\n\n--- ANSWER ---"}
+    ]
+    backend = ai_logic.get_backend(app)
+    try:
+        return backend.chat(messages, app.config.get("chat_model", "llama3.1"), temperature=0.2).strip()
+    except Exception as e:
+        app.queue_log(f"Memory recall error ({backend.name}): {e}", "ERROR")
+        return f"I found {len(relevant)} related memories but couldn't reach the AI to answer: {e}"
 
 def forget_fact(app, item_number, **kwargs):
     """Deletes a specific memory by its number from the list."""
@@ -68,6 +164,7 @@ def forget_fact(app, item_number, **kwargs):
 
     forgotten_fact = memory.pop(item_index)
     _save_memory(memory)
+    _index_memory(app, memory)  # Drops its vector and renumbers the rows after it
     app.queue_log(f"Memory forgotten: '{forgotten_fact}'")
     return f"Okay, I have forgotten memory number {item_index + 1}."
 
@@ -5,7 +5,7 @@ def find_movie_info(app, movie_title, **kwargs):
     """Finds information about a movie using The Movie Database (TMDB)."""
     api_key = app.config.get("tmdb_api_key")
     if not api_key or "YOUR" in api_key:
-        return "The Movie Database API key is missing from my settings."
+        return {"error": "The Movie Database API key is missing from my settings."}
 
     try:
         # First, search for the movie to get its ID
@@ -35,7 +35,7 @@ def find_movie_info(app, movie_title, **kwargs):
 
     except Exception as e:
         app.queue_log(f"TMDB Error: {e}")
-        return "I had trouble looking up that movie information."
+        return {"error": "I had trouble looking up that movie information."}
 
 def register():
     """Registers movie database commands."""
@@ -44,6 +44,9 @@ def register():
             'handler': find_movie_info,
             'regex': r'\b(?:tell me about|what is|find)\b(?: the)? movie (.+)',
             'params': ['movie_title'],
-            'description': "Looks up details about a specific movie, such as its summary, release date, and rating."
+            'description': "Looks up details about a specific movie, such as its summary, release date, and rating.",
+            'timeout': 10,
+            'warm_hosts': ['api.themoviedb.org'],
+            'cache': {'ttl': 86400, 'max_entries': 64, 'persist': True}
         }
     }
\ No newline at end of file
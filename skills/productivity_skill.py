@@ -192,6 +192,7 @@ def register():
             'handler': clear_clipboard_history,
             'regex': r'\bclear(?: my)? clipboard history\b',
             'params': [],
-            'description': "Clears all items from the clipboard history."
+            'description': "Clears all items from the clipboard history.",
+            'semantic_route': False  # Destructive: always confirm intent through the Router AI
         },
     }
\ No newline at end of file
@@ -40,6 +40,7 @@ def register():
             'handler': find_recipe,
             'regex': r'\b(?:find|get|search for) a recipe for (.+)\b',
             'params': ['dish_name'],
-            'description': "Finds a recipe for a specific dish or ingredient."
+            'description': "Finds a recipe for a specific dish or ingredient.",
+            'timeout': 10
         }
     }
\ No newline at end of file
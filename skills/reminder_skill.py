@@ -9,7 +9,7 @@ REMINDER_FILE = "reminders.json"
 
 def _trigger_reminder(app, reminder_id, message):
     """The function that gets called by the scheduler. Speaks and then cleans up."""
-    app.speak_response(f"This is a reminder: {message}")
+    app.announce(f"This is a reminder: {message}", source="reminder")
     
     if not os.path.exists(REMINDER_FILE):
         return
@@ -56,6 +56,7 @@ def register():
             'handler': run_routine,
             'regex': r'\b(run|start|execute)\b(?: routine)? (.+)',
             'params': ['verb', 'routine_name'], # 'verb' captures run/start/execute but is unused
-            'description': "Executes a pre-defined sequence of actions known as a routine."
+            'description': "Executes a pre-defined sequence of actions known as a routine.",
+            'timeout': None  # Speaks and waits between actions; stopped with the stop button, not a deadline
         }
     }
\ No newline at end of file
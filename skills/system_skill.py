@@ -238,7 +238,8 @@ def register():
             'handler': empty_recycle_bin,
             'regex': r'\bempty(?: the)? recycle bin\b',
             'params': [],
-            'description': "Permanently deletes all items in the Windows Recycle Bin."
+            'description': "Permanently deletes all items in the Windows Recycle Bin.",
+            'semantic_route': False  # Destructive: always confirm intent through the Router AI
         },
         'list_audio_sessions': {
             'handler': list_audio_sessions,
@@ -38,8 +38,8 @@ def get_time_for_city(app, city, **kwargs):
         app.queue_log(f"WorldTimeAPI Error for '{city}': {e}")
         # Fallback for a common case where the city name is not a valid timezone
         if "unknown location" in str(e).lower() or "unknown timezone" in str(e).lower():
-            return f"I couldn't find a timezone for '{city}'. Please try a major city in that region."
-        return f"I had trouble finding the time for {city}."
+            return {"error": f"I couldn't find a timezone for '{city}'. Please try a major city in that region."}
+        return {"error": f"I had trouble finding the time for {city}."}
 
 def register():
     """Registers all time and date related commands."""
@@ -48,18 +48,22 @@ def register():
             'handler': get_current_time,
             'regex': r"\bwhat(?:\'s| is) the time\b$",
             'params': [],
-            'description': "Gets the user's current local time. Use only if no specific city is mentioned."
+            'description': "Gets the user's current local time. Use only if no specific city is mentioned.",
+            'examples': ["what time is it", "tell me the time", "do you know what time it is"]
         },
         'get_time_for_city': {
             'handler': get_time_for_city,
             'regex': r"\b(?:what(?:\'s| is)|tell me) the time in (.+)",
             'params': ['city'],
-            'description': "Gets the current time for a specific city or location."
+            'description': "Gets the current time for a specific city or location.",
+            'warm_hosts': ['worldtimeapi.org'],
+            'cache': {'ttl': 15, 'max_entries': 16}  # Short: the answer is only good to the minute
         },
         'get_date': {
             'handler': get_current_date,
             'regex': r"\bwhat(?:\'s| is) today(?:\'s)? date\b",
             'params': [],
-            'description': "Gets the current local date."
+            'description': "Gets the current local date.",
+            'examples': ["what day is it today", "what's the date"]
         }
     }
\ No newline at end of file
@@ -33,6 +33,7 @@ def register():
             'handler': translate_text,
             'regex': r'\b(?:translate|how do you say)\b\s(?:\'|")?(.+?)(?:\'|")?\s(?:in|to)\s(.+)',
             'params': ['text', 'to_lang'],
-            'description': "Translates a phrase from one language to another."
+            'description': "Translates a phrase from one language to another.",
+            'timeout': 10
         }
     }
\ No newline at end of file
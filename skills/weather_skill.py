@@ -8,7 +8,7 @@ def get_weather(app, city=None, **kwargs):
     """
     api_key = app.config.get("weather_api_key")
     if not api_key or "YOUR" in api_key:
-        return "The Weather API key is missing or not set in my settings."
+        return {"error": "The Weather API key is missing or not set in my settings."}
 
     if not city:
         city = app.config.get("default_location", "Dubai")
@@ -23,7 +23,7 @@ def get_weather(app, city=None, **kwargs):
         data = response.json()
 
         if data.get("cod") != 200:
-            return f"Sorry, I couldn't find the weather for {city}."
+            return {"error": f"Sorry, I couldn't find the weather for {city}."}
 
         main = data.get("main", {})
         temp = main.get("temp")
@@ -34,13 +34,13 @@ def get_weather(app, city=None, **kwargs):
 
     except requests.exceptions.HTTPError as e:
         if e.response.status_code == 404:
-            return f"I couldn't find a city named '{city}'. Please check the spelling."
+            return {"error": f"I couldn't find a city named '{city}'. Please check the spelling."}
         else:
             app.queue_log(f"Weather API HTTP Error: {e}")
-            return "I'm having trouble connecting to the weather service right now."
+            return {"error": "I'm having trouble connecting to the weather service right now."}
     except Exception as e:
         app.queue_log(f"An error occurred in the weather skill: {e}")
-        return "I'm sorry, I had trouble connecting to the weather service."
+        return {"error": "I'm sorry, I had trouble connecting to the weather service."}
 
 
 def register():
@@ -50,13 +50,20 @@ def register():
             'handler': get_weather,
             'regex': r'^\s*what(?:\'s| is) the (?:weather|temperature)(?: like)? in (.+)',
             'params': ['city'],
-            'description': "Gets the current weather for a specific city."
+            'description': "Gets the current weather for a specific city.",
+            'timeout': 10,
+            'warm_hosts': ['api.openweathermap.org'],
+            'cache': {'ttl': 600, 'max_entries': 32}
         },
         'get_weather_default': {
             'handler': get_weather,
             # FIX: Added '$' to anchor the match to the end of the string.
             'regex': r'^\s*what(?:\'s| is) the (?:weather|temperature)\s*$',
             'params': [],
-            'description': "Gets the current weather for the user's default location if no city is specified."
+            'description': "Gets the current weather for the user's default location if no city is specified.",
+            'examples': ["how's the weather", "is it hot outside", "what's it like outside today"],
+            'timeout': 10,
+            'warm_hosts': ['api.openweathermap.org'],
+            'cache': {'ttl': 600, 'max_entries': 4, 'config_keys': ['default_location']}
         }
     }
\ No newline at end of file
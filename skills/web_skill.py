@@ -1,22 +1,11 @@
 # skills/web_skill.py
 import re
 import webbrowser
-import socket
 import requests
 import urllib.parse
 from bs4 import BeautifulSoup
 from duckduckgo_search import DDGS
 
-def is_online(log_callback=None):
-    """Checks for a live internet connection."""
-    try:
-        socket.create_connection(("8.8.8.8", 53), timeout=3)
-        if log_callback: log_callback("Connectivity check: Online.")
-        return True
-    except OSError:
-        if log_callback: log_callback("Connectivity check: Offline.")
-        return False
-
 def perform_web_search(app, query, **kwargs):
     """Performs a web search using DuckDuckGo and returns a summary of results."""
     app.queue_log(f"Performing web search for: {query}")
@@ -48,13 +37,13 @@ def get_news_headlines(app, **kwargs):
         soup = BeautifulSoup(response.text, 'html.parser')
         # This selector is specific to BBC News and may need updating if their site changes
         headlines = soup.find_all('h2', {'data-testid': 'card-headline'})
-        if not headlines: return "I couldn't find the headlines on the page."
+        if not headlines: return {"error": "I couldn't find the headlines on the page."}
         # Get the text of the first 3 headlines
         headline_texts = [h.get_text() for h in headlines[:3]]
         return "Here are the top headlines from BBC News. First: " + ". Next: ".join(headline_texts)
     except Exception as e:
         app.queue_log(f"Error scraping news: {e}")
-        return "I'm sorry, I couldn't fetch the news headlines right now."
+        return {"error": "I'm sorry, I couldn't fetch the news headlines right now."}
 
 def search_in_browser(app, query, **kwargs):
     """Opens a search query in the default web browser."""
@@ -73,13 +62,18 @@ def register():
             'handler': perform_web_search,
             'regex': None,  # This skill is AI-only, it has no direct regex trigger
             'params': ['query'],
-            'description': "Use for questions about news, current events, facts, or any topic that requires up-to-date information from the internet."
+            'description': "Use for questions about news, current events, facts, or any topic that requires up-to-date information from the internet.",
+            'timeout': 15
         },
         'get_news_headlines': {
             'handler': get_news_headlines,
             'regex': r'\b(get|read|tell me the) news(?: headlines)?\b',
             'params': [],
-            'description': "Fetches and reads the latest news headlines."
+            'description': "Fetches and reads the latest news headlines.",
+            'examples': ["what's in the news today", "any news", "what's happening in the world"],
+            'timeout': 10,
+            'warm_hosts': ['www.bbc.com'],
+            'cache': {'ttl': 300, 'max_entries': 1}
         },
         'search_in_browser': {
             'handler': search_in_browser,
@@ -8,14 +8,15 @@ def get_wiki_summary(app, query, **kwargs):
         summary = wikipedia.summary(query, sentences=4, auto_suggest=True, redirect=True)
         return summary
     except wikipedia.exceptions.DisambiguationError as e:
-        # If the term is ambiguous, return the top options.
+        # If the term is ambiguous, return the top options. Returned as errors so the result
+        # cache doesn't keep serving them after the page is created or disambiguated.
         options = ", ".join(e.options[:3])
-        return f"That could mean a few things, like {options}. Please be more specific."
+        return {"error": f"That could mean a few things, like {options}. Please be more specific."}
     except wikipedia.exceptions.PageError:
-        return f"I'm sorry, I couldn't find a Wikipedia page for '{query}'."
+        return {"error": f"I'm sorry, I couldn't find a Wikipedia page for '{query}'."}
     except Exception as e:
         app.queue_log(f"Wikipedia Error: {e}")
-        return "I had trouble getting information from Wikipedia."
+        return {"error": "I had trouble getting information from Wikipedia."}
 
 def register():
     """Registers the Wikipedia skill. It has no direct regex trigger."""
@@ -24,6 +25,9 @@ def register():
             'handler': get_wiki_summary,
             'regex': None, # This skill is intended to be called by the AI, not by a direct regex match.
             'params': ['query'],
-            'description': "Gets a concise summary about a person, place, or topic from Wikipedia. Best for factual, encyclopedic queries."
+            'description': "Gets a concise summary about a person, place, or topic from Wikipedia. Best for factual, encyclopedic queries.",
+            'timeout': 10,
+            'warm_hosts': ['en.wikipedia.org'],
+            'cache': {'ttl': 86400, 'max_entries': 128, 'persist': True}
         }
     }
\ No newline at end of file
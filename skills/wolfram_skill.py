@@ -27,6 +27,7 @@ def register():
             'handler': ask_wolfram,
             'regex': r'\b(calculate|compute|ask wolfram) (.+)',
             'params': ['verb', 'query'], # 'verb' captures calculate/compute but is unused
-            'description': "Use ONLY for questions that require mathematical calculations, data analysis, or specific scientific computation. Do NOT use for general questions."
+            'description': "Use ONLY for questions that require mathematical calculations, data analysis, or specific scientific computation. Do NOT use for general questions.",
+            'timeout': 15
         }
     }
\ No newline at end of file
@@ -0,0 +1,61 @@
+# speculative_chat.py
+import time
+import queue
+import threading
+import traceback
+
+_END = object()
+
+
+class SpeculativeChatStream:
+    """
+    Starts the no-tool chat stream while the Router AI is still deciding.
+    Chunks are buffered on a background thread until the router's decision is known:
+    commit() replays the buffer and continues live; cancel() stops the request and discards it.
+    """
+    def __init__(self, stream_factory, cancel_callback, log_callback):
+        self.cancel_callback = cancel_callback  # Closes the underlying request (e.g. OllamaClient.cancel)
+        self.log = log_callback
+        self.chunks = queue.Queue()
+        self.cancelled = threading.Event()
+        self.committed = False
+        self.started_at = time.perf_counter()
+        self.first_chunk_at = None
+        self.buffered = 0
+        self.thread = threading.Thread(target=self._run, args=(stream_factory,), name="speculative-chat", daemon=True)
+        self.thread.start()
+
+    def _run(self, stream_factory):
+        try:
+            with stream_factory() as chunks:  # A cancelled stream is closed, freeing its backend slot
+                for chunk in chunks:
+                    if self.cancelled.is_set():
+                        break
+                    if self.first_chunk_at is None:
+                        self.first_chunk_at = time.perf_counter()
+                    self.buffered += 1
+                    self.chunks.put(chunk)
+        except Exception as e:
+            self.log(f"Speculative chat stream failed: {e}\n{traceback.format_exc()}", "ERROR")
+        finally:
+            self.chunks.put(_END)
+
+    def commit(self):
+        """Generator over the buffered chunks, then the rest of the stream as it arrives."""
+        self.committed = True
+        ahead = f"{(time.perf_counter() - self.first_chunk_at) * 1000:.0f} ms" if self.first_chunk_at else "no tokens yet"
+        self.log(f"Committing speculative chat stream ({self.buffered} chunks buffered, head start {ahead}).")
+        while True:
+            chunk = self.chunks.get()
+            if chunk is _END:
+                return
+            yield chunk
+
+    def cancel(self):
+        """Stops and discards the stream. Safe to call more than once."""
+        if self.cancelled.is_set() or self.committed:
+            return
+        self.cancelled.set()
+        self.cancel_callback()
+        self.log(f"Discarded speculative chat stream ({self.buffered} chunks) after "
+                 f"{(time.perf_counter() - self.started_at) * 1000:.0f} ms.")
@@ -0,0 +1,154 @@
+# streaming_json.py
+import json
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class IncrementalJSONParser:
+    """
+    Finds the first top-level JSON object in text that arrives in chunks.
+    - feed() returns True as soon as the object's closing brace arrives, so the caller can stop
+      the stream there; anything before the object or after it is ignored.
+    - Top-level scalar fields (e.g. "tool_name") are available in `fields` as soon as their
+      value is complete, before the rest of the object has streamed.
+    - result() parses the object, repairing a truncated one (unclosed string, dangling comma or
+      key, missing closing brackets) instead of failing.
+    - complete_keys holds the top-level keys whose value arrived in full, so a caller can tell a
+      repaired value (a string cut off mid-word) from one that was really sent.
+    """
+    def __init__(self):
+        self.buffer = []          # Characters from the opening brace on
+        self.stack = []           # Open '{' / '['
+        self.in_string = False
+        self.escaped = False
+        self.done = False
+        self.fields = {}          # Completed top-level scalar fields
+        self.complete_keys = set()  # Top-level keys whose value (scalar or nested) has closed
+        self._token_start = None  # Buffer index where the current top-level token began
+        self._key = None          # Last top-level key seen
+        self._expect = "key"      # At depth 1: "key", "colon" or "value"
+
+    def feed(self, text):
+        """Consumes a chunk. Returns True once the top-level object is complete."""
+        for char in text:
+            if self.done:
+                break
+            if not self.stack:
+                if char == "{":
+                    self.buffer.append(char)
+                    self.stack.append(char)
+                continue
+            self.buffer.append(char)
+            self._consume(char)
+        return self.done
+
+    def _consume(self, char):
+        depth = len(self.stack)
+        if self.in_string:
+            if self.escaped:
+                self.escaped = False
+            elif char == "\\":
+                self.escaped = True
+            elif char == '"':
+                self.in_string = False
+                if depth == 1:
+                    self._finish_token()
+            return
+
+        if char == '"':
+            self.in_string = True
+            if depth == 1:
+                self._token_start = len(self.buffer) - 1
+        elif char in "{[":
+            self.stack.append(char)
+            if depth == 1:
+                self._expect = "nested"
+        elif char in "}]":
+            if depth == 1 and self._token_start is not None:
+                self._finish_token(end=len(self.buffer) - 1)
+            self.stack.pop()
+            if not self.stack:
+                self.done = True
+            elif len(self.stack) == 1:
+                self._expect = "comma"
+                if isinstance(self._key, str):
+                    self.complete_keys.add(self._key)
+        elif depth == 1:
+            if char == ":":
+                self._expect = "value"
+            elif char == ",":
+                if self._token_start is not None:
+                    self._finish_token(end=len(self.buffer) - 1)
+                self._expect = "key"
+            elif not char.isspace() and self._token_start is None and self._expect == "value":
+                self._token_start = len(self.buffer) - 1  # Bare literal: number, true, false, null
+            elif char.isspace() and self._token_start is not None:
+                self._finish_token(end=len(self.buffer) - 1)
+
+    def _finish_token(self, end=None):
+        raw = "".join(self.buffer[self._token_start:end]).strip()
+        self._token_start = None
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            value = None
+        if self._expect == "key":
+            self._key = value
+            self._expect = "colon"
+        elif self._expect == "value":
+            if isinstance(self._key, str):
+                self.fields[self._key] = value
+                self.complete_keys.add(self._key)
+            self._expect = "comma"
+
+    def text(self):
+        return "".join(self.buffer)
+
+    def result(self):
+        """The parsed object (repaired if truncated), or None if no object was found."""
+        if not self.buffer:
+            return None
+        text = self.text()
+        if self.done:
+            try:
+                return json.loads(text)
+            except json.JSONDecodeError:
+                pass
+        return self._repair(text)
+
+    def _repair(self, text):
+        # Close what is still open; if that isn't valid JSON, drop the last (partial) element and retry.
+        candidate = text
+        while candidate:
+            try:
+                return json.loads(_close(candidate))
+            except json.JSONDecodeError:
+                cut = candidate.rfind(",")
+                if cut <= 0:
+                    break
+                candidate = candidate[:cut]
+        return dict(self.fields) or None
+
+
+def _close(text):
+    """Terminates an open string and appends the closing brackets a truncated JSON text is missing."""
+    stack, in_string, escaped = [], False, False
+    for char in text:
+        if in_string:
+            if escaped: escaped = False
+            elif char == "\\": escaped = True
+            elif char == '"': in_string = False
+        elif char == '"': in_string = True
+        elif char in "{[": stack.append(char)
+        elif char in "}]" and stack: stack.pop()
+    if in_string:
+        text += "\\" * escaped + '"'
+    text = text.rstrip().rstrip(",:").rstrip()
+    return text + "".join(_CLOSERS[opener] for opener in reversed(stack))
+
+
+def extract_json_object(text):
+    """Parses the first JSON object embedded in a string (balanced braces, not a greedy regex)."""
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    return parser.result()
@@ -0,0 +1,160 @@
+# tests/test_command_queue.py
+import threading
+
+import pytest
+
+from command_queue import CommandScheduler
+
+
+class FakeRoot:
+    def __init__(self):
+        self.calls = []
+
+    def after(self, delay, callback, *args):
+        self.calls.append((callback, args))
+
+
+class FakeApp:
+    """Just the parts of AURAApp (app_controller.py) the scheduler touches."""
+    def __init__(self, **settings):
+        self.config = {"command_queue": settings}
+        self.root = FakeRoot()
+        self.logs = []
+        self.stop_generating_event = threading.Event()
+        self.stopped_while_running = []
+        self.scheduler = None
+
+    def queue_log(self, message, level="INFO"):
+        self.logs.append((level, message))
+
+    def signal_stop(self):
+        current = self.scheduler.current
+        self.stopped_while_running.append(current["text"] if current else None)
+        self.stop_generating_event.set()
+
+    def stop_speech_and_idle(self):
+        pass
+
+    def speak_response(self, text):
+        pass
+
+
+class Recorder:
+    """Stands in for AURAApp._execute_command_task: blocks each command until released and records the run order."""
+    def __init__(self, app):
+        self.app = app
+        self.ran = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, text, attached_file):
+        self.app.stop_generating_event.clear()  # As _execute_command_task does when it starts a command
+        self.ran.append(text)
+        self.started.set()
+        # A preempted command returns as soon as the stop event is set.
+        while not self.release.is_set() and not self.app.stop_generating_event.is_set():
+            self.release.wait(0.01)
+
+
+def make_scheduler(**settings):
+    app = FakeApp(**settings)
+    recorder = Recorder(app)
+    scheduler = CommandScheduler(app, recorder)
+    app.scheduler = scheduler
+    return app, recorder, scheduler
+
+
+def wait_idle(scheduler, timeout=2.0):
+    done = threading.Event()
+
+    def poll():
+        while True:
+            with scheduler.condition:
+                if not scheduler.heap and scheduler.current is None:
+                    done.set()
+                    return
+            if done.wait(0.01):
+                return
+    thread = threading.Thread(target=poll, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert done.is_set(), "scheduler did not drain"
+
+
+@pytest.fixture
+def running_routine():
+    """A scheduler whose worker is busy with a routine step."""
+    app, recorder, scheduler = make_scheduler(max_size=4)
+    scheduler.submit("routine step", source="routine")
+    assert recorder.started.wait(2.0)
+    recorder.started.clear()
+    yield app, recorder, scheduler
+    recorder.release.set()
+    scheduler.shutdown()
+
+
+def test_user_input_preempts_lower_priority_current(running_routine):
+    app, recorder, scheduler = running_routine
+    assert scheduler.submit("what time is it", source="user")
+    assert recorder.started.wait(2.0)
+    recorder.release.set()
+    wait_idle(scheduler)
+
+    assert recorder.ran == ["routine step", "what time is it"]
+    assert app.stopped_while_running == ["routine step"]  # The stop landed on the preempted item only
+    assert scheduler.stats["preempted"] == 1
+    assert [call[0] for call in app.root.calls] == [app.stop_speech_and_idle]
+
+
+def test_equal_or_lower_priority_does_not_preempt(running_routine):
+    app, recorder, scheduler = running_routine
+    scheduler.submit("next routine step", source="routine")
+    scheduler.submit("new file detected", source="file_watcher")
+    assert not app.stopped_while_running
+    recorder.release.set()
+    wait_idle(scheduler)
+    assert recorder.ran == ["routine step", "next routine step", "new file detected"]
+
+
+def test_preempt_can_be_disabled():
+    app, recorder, scheduler = make_scheduler(preempt=False)
+    scheduler.submit("routine step", source="routine")
+    assert recorder.started.wait(2.0)
+    scheduler.submit("what time is it", source="user")
+    assert not app.stopped_while_running and scheduler.stats["preempted"] == 0
+    recorder.release.set()
+    wait_idle(scheduler)
+    scheduler.shutdown()
+
+
+def test_waiting_items_run_by_priority_then_arrival(running_routine):
+    app, recorder, scheduler = running_routine
+    for text, source in (("file a", "file_watcher"), ("reminder", "reminder"), ("file b", "file_watcher")):
+        scheduler.submit(text, source=source)
+    recorder.release.set()
+    wait_idle(scheduler)
+    assert recorder.ran == ["routine step", "reminder", "file a", "file b"]
+
+
+def test_duplicates_are_coalesced_and_keep_the_higher_priority(running_routine):
+    app, recorder, scheduler = running_routine
+    assert scheduler.submit("Routine Step.", source="routine") is False  # Same as the running item
+    scheduler.submit("file a", source="file_watcher")
+    scheduler.submit("file b", source="file_watcher")
+    assert scheduler.submit("file b", source="reminder") is False
+    recorder.release.set()
+    wait_idle(scheduler)
+    assert recorder.ran == ["routine step", "file b", "file a"]
+    assert scheduler.stats["coalesced"] == 2
+
+
+def test_full_queue_drops_the_least_urgent(running_routine):
+    app, recorder, scheduler = running_routine
+    for name in "abcd":
+        scheduler.submit(f"file {name}", source="file_watcher")
+    assert scheduler.submit("file e", source="file_watcher") is False  # Not more urgent than anything queued
+    assert scheduler.submit("reminder", source="reminder")              # Evicts the newest file announcement
+    recorder.release.set()
+    wait_idle(scheduler)
+    assert recorder.ran == ["routine step", "reminder", "file a", "file b", "file c"]
+    assert scheduler.stats["dropped"] == 2
@@ -0,0 +1,195 @@
+# tests/test_meeting_index.py
+import os
+import time
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("faiss")
+pytest.importorskip("sentence_transformers")  # meeting_index imports ai_logic
+
+import meeting_index
+from meeting_index import CHUNKS_FILE, INDEX_FILE, SWAP_CATCH_UP_ROWS, VECTORS_FILE, MeetingIndex
+
+DIM = 8
+
+
+def vectors(count, seed=0):
+    rng = np.random.default_rng(seed)
+    data = rng.standard_normal((count, DIM)).astype('float32')
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+def chunks(start, count):
+    return [(float(i), f"chunk {i}") for i in range(start, start + count)]
+
+
+def wait_for_upgrade(index, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while index.upgrading:
+        assert time.monotonic() < deadline, "upgrade did not finish"
+        time.sleep(0.01)
+
+
+def assert_rows_match(index, data):
+    """Every stored row is its own nearest neighbour, at the right row number."""
+    assert index.ntotal == len(data)
+    for row in range(0, len(data), max(1, len(data) // 50)):
+        assert index.search(data[row:row + 1], 1) == [row]
+
+
+@pytest.fixture
+def logs():
+    return []
+
+
+@pytest.fixture
+def log(logs):
+    return lambda message, level='INFO': logs.append((level, message))
+
+
+# --- Persistence and torn-write recovery ---
+def test_reopen_round_trip(tmp_path):
+    data = vectors(30)
+    index = MeetingIndex(DIM, str(tmp_path))
+    index.add(data[:10], chunks(0, 10))
+    index.add(data[10:], chunks(10, 20))
+
+    reopened = MeetingIndex.open(DIM, str(tmp_path))
+    assert reopened.chunk_range(0, 30) == [tuple(chunk) for chunk in chunks(0, 30)]
+    assert_rows_match(reopened, data)
+
+
+def test_unfinished_chunk_line_is_cut_back(tmp_path):
+    data = vectors(5)
+    MeetingIndex(DIM, str(tmp_path)).add(data, chunks(0, 5))
+    # Crash while writing row 5: its vector landed, its chunk line only partly.
+    with open(tmp_path / VECTORS_FILE, 'ab') as f:
+        f.write(vectors(1, seed=1).tobytes())
+    with open(tmp_path / CHUNKS_FILE, 'a', encoding='utf-8') as f:
+        f.write('[5.0, "chu')
+
+    reopened = MeetingIndex.open(DIM, str(tmp_path))
+    assert reopened.ntotal == 5
+    assert os.path.getsize(tmp_path / VECTORS_FILE) == 5 * DIM * 4
+    assert (tmp_path / CHUNKS_FILE).read_text(encoding='utf-8').endswith('"chunk 4"]\n')
+
+    # Later appends stay aligned with the files.
+    reopened.add(vectors(1, seed=2), chunks(5, 1))
+    again = MeetingIndex.open(DIM, str(tmp_path))
+    assert_rows_match(again, np.vstack([data, vectors(1, seed=2)]))
+    assert again.chunk_range(5, 6) == [(5.0, "chunk 5")]
+
+
+def test_partial_vector_row_is_cut_back(tmp_path):
+    data = vectors(4)
+    MeetingIndex(DIM, str(tmp_path)).add(data, chunks(0, 4))
+    with open(tmp_path / VECTORS_FILE, 'ab') as f:
+        f.write(b"\0" * (DIM * 4 - 3))  # Crash mid-row, before the chunk line
+
+    reopened = MeetingIndex.open(DIM, str(tmp_path))
+    assert reopened.ntotal == 4
+    assert os.path.getsize(tmp_path / VECTORS_FILE) == 4 * DIM * 4
+    assert_rows_match(reopened, data)
+
+
+def test_chunks_ahead_of_vectors_are_cut_back(tmp_path):
+    data = vectors(4)
+    MeetingIndex(DIM, str(tmp_path)).add(data, chunks(0, 4))
+    with open(tmp_path / VECTORS_FILE, 'r+b') as f:
+        f.truncate(3 * DIM * 4)
+
+    reopened = MeetingIndex.open(DIM, str(tmp_path))
+    assert reopened.ntotal == 3
+    assert len((tmp_path / CHUNKS_FILE).read_text(encoding='utf-8').splitlines()) == 3
+
+
+def test_corrupt_chunk_line_cuts_from_there(tmp_path):
+    MeetingIndex(DIM, str(tmp_path)).add(vectors(4), chunks(0, 4))
+    lines = (tmp_path / CHUNKS_FILE).read_text(encoding='utf-8').splitlines()
+    lines[2] = "not json"
+    (tmp_path / CHUNKS_FILE).write_text("\n".join(lines) + "\n", encoding='utf-8')
+
+    reopened = MeetingIndex.open(DIM, str(tmp_path))
+    assert reopened.ntotal == 2
+    assert os.path.getsize(tmp_path / VECTORS_FILE) == 2 * DIM * 4
+
+
+# --- Flat -> approximate upgrade and swap ---
+@pytest.mark.parametrize("kind", ["hnsw", "ivf"])
+def test_upgrade_past_threshold(tmp_path, log, logs, kind):
+    settings = {"upgrade_at": 200, "upgrade_to": kind}
+    data = vectors(240)
+    index = MeetingIndex(DIM, str(tmp_path), lambda: settings, log)
+    for start in range(0, 240, 40):
+        index.add(data[start:start + 40], chunks(start, 40))
+    wait_for_upgrade(index)
+
+    assert index.kind == kind
+    assert index.next_upgrade_at == 2 * 200
+    assert_rows_match(index, data)
+    assert (tmp_path / INDEX_FILE).exists()
+    assert any(f"upgraded from flat to {kind}" in message for _, message in logs)
+
+
+def test_rows_added_during_rebuild_are_caught_up(tmp_path, monkeypatch, log):
+    settings = {"upgrade_at": 100, "upgrade_to": "hnsw"}
+    building, release = threading.Event(), threading.Event()
+    real_build = meeting_index.build_index
+
+    def slow_build(*args):
+        building.set()
+        assert release.wait(10)
+        return real_build(*args)
+    monkeypatch.setattr(meeting_index, "build_index", slow_build)
+
+    data = vectors(100 + 3 * SWAP_CATCH_UP_ROWS)
+    index = MeetingIndex(DIM, str(tmp_path), lambda: settings, log)
+    index.add(data[:100], chunks(0, 100))
+    assert building.wait(10)
+    # Searches keep working on the flat index while the rebuild runs.
+    assert index.kind == "flat" and index.search(data[:1], 1) == [0]
+    for start in range(100, len(data), 16):
+        index.add(data[start:start + 16], chunks(start, 16))
+    release.set()
+    wait_for_upgrade(index)
+
+    assert index.kind == "hnsw"
+    assert_rows_match(index, data)
+    # The saved index holds the snapshot; the rest comes back from the vector file on open. It has
+    # more than doubled since the snapshot, so a rebuild starts right away.
+    monkeypatch.setattr(meeting_index, "build_index", real_build)
+    reopened = MeetingIndex.open(DIM, str(tmp_path), lambda: settings, log)
+    assert reopened.kind == "hnsw" and reopened.upgrading
+    assert_rows_match(reopened, data)
+    wait_for_upgrade(reopened)
+    assert reopened.next_upgrade_at == 2 * len(data)
+    assert_rows_match(reopened, data)
+
+
+def test_failed_upgrade_stays_flat_and_backs_off(tmp_path, monkeypatch, log, logs):
+    def broken_build(*args):
+        raise RuntimeError("out of memory")
+    monkeypatch.setattr(meeting_index, "build_index", broken_build)
+    settings = {"upgrade_at": 50, "upgrade_to": "hnsw"}
+    index = MeetingIndex(DIM, None, lambda: settings, log)
+    index.add(vectors(60), chunks(0, 60))
+    wait_for_upgrade(index)
+
+    assert index.kind == "flat" and index.next_upgrade_at == 120
+    assert [level for level, _ in logs] == ["ERROR"]
+    index.add(vectors(10, seed=1), chunks(60, 10))
+    assert not index.upgrading
+
+
+def test_saved_index_ahead_of_vectors_is_ignored(tmp_path):
+    settings = {"upgrade_at": 50, "upgrade_to": "hnsw"}
+    index = MeetingIndex(DIM, str(tmp_path), lambda: settings)
+    index.add(vectors(60), chunks(0, 60))
+    wait_for_upgrade(index)
+    with open(tmp_path / VECTORS_FILE, 'r+b') as f:
+        f.truncate(40 * DIM * 4)  # Rows the saved index has are gone
+
+    reopened = MeetingIndex.open(DIM, str(tmp_path), lambda: settings)
+    assert reopened.kind == "flat" and reopened.ntotal == 40
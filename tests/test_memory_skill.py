@@ -0,0 +1,151 @@
+# tests/test_memory_skill.py
+import json
+import zlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("faiss")
+pytest.importorskip("sentence_transformers")  # memory_skill imports ai_logic
+
+import ai_logic
+from skills import memory_skill
+
+
+class WordEmbedder:
+    """Deterministic bag-of-words embeddings standing in for the sentence model; counts what it encodes."""
+    dim = 64
+
+    def __init__(self):
+        self.encoded = []
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def encode(self, texts, normalize_embeddings=True):
+        self.encoded.extend(texts)
+        vectors = np.zeros((len(texts), self.dim), dtype='float32')
+        for row, text in enumerate(texts):
+            for word in text.lower().replace("?", "").split():
+                vectors[row, zlib.crc32(word.encode()) % self.dim] += 1.0
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-6)
+
+
+class FakeApp:
+    def __init__(self):
+        self.config = {"memory": {"top_k": 2, "min_score": 0.5}}
+        self.logs = []
+
+    def queue_log(self, message, level="INFO"):
+        self.logs.append((level, message))
+
+
+class RecordingBackend:
+    name = "test"
+
+    def __init__(self):
+        self.messages = None
+
+    def chat(self, messages, model, temperature=None):
+        self.messages = messages
+        return " answer "
+
+
+@pytest.fixture
+def embedder(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # memory.json and the vector file live in the working directory
+    model = WordEmbedder()
+    monkeypatch.setattr(ai_logic, "EMBEDDING_MODEL", model)
+    monkeypatch.setattr(memory_skill, "_INDEX", memory_skill._MemoryIndex())
+    return model
+
+
+@pytest.fixture
+def app():
+    return FakeApp()
+
+
+def search(app, query, k=10):
+    return memory_skill._INDEX.search(app, memory_skill._load_memory(), query, k)
+
+
+def restart(monkeypatch):
+    monkeypatch.setattr(memory_skill, "_INDEX", memory_skill._MemoryIndex())
+
+
+FACTS = ["my car is a blue honda", "the wifi password is hunter2", "my dentist is on main street"]
+
+
+def test_remember_embeds_each_fact_once(embedder, app):
+    for fact in FACTS:
+        memory_skill.remember_fact(app, fact)
+    assert embedder.encoded == FACTS
+    assert search(app, "wifi password")[0][:2] == (2, FACTS[1])
+    assert embedder.encoded[len(FACTS):] == ["wifi password"]  # Only the question
+
+
+def test_forget_renumbers_rows_without_re_embedding(embedder, app):
+    for fact in FACTS:
+        memory_skill.remember_fact(app, fact)
+    memory_skill.forget_fact(app, 1)
+    assert embedder.encoded == FACTS
+
+    assert memory_skill._INDEX.index.ntotal == 2
+    number, fact, _ = search(app, "dentist main street")[0]
+    assert (number, fact) == (2, FACTS[2])
+    assert memory_skill.forget_fact(app, number) == "Okay, I have forgotten memory number 2."
+    assert json.load(open(memory_skill.MEMORY_FILE)) == [FACTS[1]]
+    assert [hit[:2] for hit in search(app, "wifi")] == [(1, FACTS[1])]
+
+
+def test_restart_reuses_saved_vectors(embedder, app, monkeypatch):
+    for fact in FACTS:
+        memory_skill.remember_fact(app, fact)
+    memory_skill.forget_fact(app, 2)
+    restart(monkeypatch)
+    embedder.encoded.clear()
+
+    memory = memory_skill._load_memory()
+    memory.append("my cat is called felix")  # Added by hand while the app was closed
+    memory_skill._save_memory(memory)
+    hits = search(app, "cat called felix")
+    assert embedder.encoded == ["my cat is called felix", "cat called felix"]
+    assert hits[0][:2] == (3, "my cat is called felix")
+    with np.load(memory_skill.VECTORS_FILE) as data:
+        assert sorted(data["facts"].tolist()) == sorted(memory)
+
+
+def test_stale_vector_file_cannot_misalign_rows(embedder, app, monkeypatch):
+    for fact in FACTS:
+        memory_skill.remember_fact(app, fact)
+    # Crash after memory.json was rewritten but before the vectors were: the file still has all three.
+    memory_skill._save_memory([FACTS[2], FACTS[0]])
+    restart(monkeypatch)
+    embedder.encoded.clear()
+
+    assert search(app, "blue honda")[0][:2] == (2, FACTS[0])
+    assert search(app, "dentist")[0][:2] == (1, FACTS[2])
+    assert embedder.encoded == ["blue honda", "dentist"]
+    with np.load(memory_skill.VECTORS_FILE) as data:
+        assert sorted(data["facts"].tolist()) == sorted([FACTS[0], FACTS[2]])  # Rewritten without the stale fact
+
+
+def test_duplicate_facts_keep_their_own_numbers(embedder, app):
+    for fact in ("buy milk", "call mom", "buy milk"):
+        memory_skill.remember_fact(app, fact)
+    assert embedder.encoded == ["buy milk", "call mom"]
+    assert sorted(number for number, fact, _ in search(app, "buy milk") if fact == "buy milk") == [1, 3]
+    memory_skill.forget_fact(app, 1)
+    assert [(number, fact) for number, fact, _ in search(app, "buy milk")][0] == (2, "buy milk")
+
+
+def test_recall_prompts_with_only_the_relevant_facts(embedder, app, monkeypatch):
+    backend = RecordingBackend()
+    monkeypatch.setattr(ai_logic, "get_backend", lambda app: backend)
+    for fact in FACTS:
+        memory_skill.remember_fact(app, fact)
+
+    assert memory_skill.intelligent_recall(app, "what is my wifi password") == "answer"
+    prompt = backend.messages[-1]["content"]
+    assert FACTS[1] in prompt and FACTS[2] not in prompt
+    assert memory_skill.intelligent_recall(app, "xylophone quartz") == "I don't have anything stored about that."
@@ -0,0 +1,161 @@
+# tests/test_ollama_client.py
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from ollama_client import OllamaClient
+from ollama_stub import OllamaStubServer
+from streaming_json import IncrementalJSONParser
+
+CHAT_PAYLOAD = {"model": "stub:latest", "messages": [{"role": "user", "content": "hello"}], "stream": False}
+STREAM_PAYLOAD = {"model": "stub:latest", "messages": [{"role": "user", "content": "hello"}], "stream": True}
+ROUTER_PAYLOAD = {"model": "router:latest", "messages": [{"role": "user", "content": "search for cats"}],
+                  "stream": True, "format": "json"}
+
+
+@pytest.fixture
+def server():
+    stub = OllamaStubServer(first_token_delay=0.0, token_delay=0.0).start()
+    yield stub
+    stub.shutdown()
+    stub.server_close()
+
+
+@pytest.fixture
+def logs():
+    return []
+
+
+@pytest.fixture
+def client(server, logs):
+    ollama = OllamaClient({"base_url": server.base_url, "backoff": 0.01},
+                          log_callback=lambda message, level='INFO': logs.append((level, message)))
+    yield ollama
+    ollama.shutdown()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_requests_share_one_connection(server, client):
+    for i in range(10):
+        if i % 2:
+            chunks = list(client.stream("/api/chat", STREAM_PAYLOAD))
+            assert chunks[-1]["done"] and "".join(c["message"]["content"] for c in chunks) == server.reply
+        else:
+            assert client.post_json("/api/chat", CHAT_PAYLOAD)["message"]["content"] == server.reply
+    assert client.get_json("/api/tags")["models"]
+
+    assert server.requests == 10
+    assert server.connections == 1
+    assert client.connections_opened() == 1
+    assert client.request_count == 10
+
+
+def test_retries_503_with_backoff(server, client, logs):
+    server.fail_next(2)
+    assert client.post_json("/api/chat", CHAT_PAYLOAD)["message"]["content"] == server.reply
+    assert server.requests == 3
+    assert [level for level, message in logs if "Retrying" in message] == ["WARNING", "WARNING"]
+
+
+def test_gives_up_after_the_configured_retries(server, client):
+    server.fail_next(5)
+    with pytest.raises(Exception, match="503"):
+        client.post_json("/api/chat", CHAT_PAYLOAD)
+    assert server.requests == 1 + client.settings["retries"]
+
+
+def test_cancel_group_closes_the_stream(server, client):
+    server.reply = " ".join(f"token{i}" for i in range(500))
+    server.token_delay = 0.01
+    background = client.stream("/api/chat", STREAM_PAYLOAD, group="background")
+    first = next(background)
+    chunks = client.stream("/api/chat", STREAM_PAYLOAD, group="interactive")
+    received = [next(chunks)]
+
+    assert client.cancel("interactive") == 1
+    received.extend(chunks)  # A cancelled stream just ends
+    assert len(received) < 500
+    wait_for(lambda: server.aborted_streams == 1)  # The server saw the disconnect and stopped generating
+    assert server.tokens_after_abort > 0
+
+    # Other groups are untouched.
+    assert first["message"]["content"] == "token0"
+    assert next(background)["message"]["content"] == " token1"
+    background.close()
+    wait_for(lambda: server.aborted_streams == 2)
+
+
+def test_cancel_interrupts_a_blocking_post(server, client):
+    server.first_token_delay = 1.0
+    result = {}
+
+    def call():
+        try:
+            client.post_json("/api/chat", CHAT_PAYLOAD)
+        except BaseException as e:
+            result["error"] = e
+    thread = threading.Thread(target=call)
+    thread.start()
+    wait_for(lambda: server.requests == 1 and client.in_flight)
+    start = time.monotonic()
+    assert client.cancel("interactive") == 1
+    thread.join(5)
+    assert time.monotonic() - start < 0.5
+    assert type(result["error"]).__name__ == "CancelledError"
+
+
+# --- Cold versus warm first-token latency ---
+def read_router_decision(client):
+    """Reads a Router reply the way get_tool_decision does: closes the stream once the JSON object is complete."""
+    parser = IncrementalJSONParser()
+    chunks = client.stream("/api/chat", ROUTER_PAYLOAD)
+    for chunk in chunks:
+        if parser.feed(chunk["message"]["content"]):
+            break
+    chunks.close()
+    return parser.result()
+
+
+def test_router_stream_closed_early_is_not_filed_as_warm_or_cold(server, client):
+    server.load_delay = 0.6  # Over the client's 500 ms cold threshold
+    server.router_token_delay = 0.05  # The final chunk (with load_duration) comes well after the closing brace
+    server.script_router("cats", "web_search", {"query": "cats"})
+
+    assert read_router_decision(client) == {"tool_name": "web_search", "parameters": {"query": "cats"}}
+    wait_for(lambda: client.request_count == 1)
+    assert server.model_loads == 1
+    assert client.metrics[-1]["ttft_ms"] >= 600  # Still recorded, just not classified
+    assert client.ttft_by_load == {}
+    assert "router:latest" in client.last_used
+    assert client.load_stats_line() == "Ollama TTFT: no requests yet"
+
+
+def test_finished_streams_are_filed_cold_then_warm(server, client, logs):
+    server.load_delay = 0.6
+    list(client.stream("/api/chat", STREAM_PAYLOAD))
+    list(client.stream("/api/chat", STREAM_PAYLOAD))
+
+    cold_count, cold_ttft, cold_load = client.ttft_by_load["cold"]
+    assert cold_count == 1 and cold_ttft >= 600 and cold_load >= 500
+    assert client.ttft_by_load["warm"][0] == 1
+    assert [level for level, message in logs if "was cold" in message] == ["WARNING"]
+
+
+def test_warm_up_pings_are_not_filed(server, client):
+    server.load_delay = 0.6
+    client.post_json("/api/chat", {"model": "stub:latest", "messages": []})
+    assert client.ttft_by_load == {}
+    assert "stub:latest" not in client.last_used
@@ -0,0 +1,108 @@
+# tests/test_router_cache.py
+import pytest
+
+import router_cache
+from router_cache import RouterDecisionCache, hash_tool_schema, normalize_utterance
+
+SCHEMA = "schema-1"
+
+
+def decision(tool, **parameters):
+    return {"tool_name": tool, "parameters": parameters}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controls time.monotonic() as seen by the cache."""
+    now = [1000.0]
+    monkeypatch.setattr(router_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_normalize_utterance():
+    assert normalize_utterance("  What's   the WEATHER?! ") == "what's the weather"
+
+
+def test_schema_hash_ignores_tool_order():
+    tools = [{"name": "b", "description": "x"}, {"name": "a", "description": "y"}]
+    assert hash_tool_schema(tools) == hash_tool_schema(list(reversed(tools)))
+    assert hash_tool_schema(tools) != hash_tool_schema(tools[:1])
+
+
+def test_hit_on_normalized_variant_and_schema_scoping():
+    cache = RouterDecisionCache()
+    assert cache.put("Search for cats", SCHEMA, decision("web_search", query="cats"))
+    assert cache.get("search for   CATS.", SCHEMA) == decision("web_search", query="cats")
+    assert cache.get("search for cats", "other-schema") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_returned_decision_is_a_copy():
+    cache = RouterDecisionCache()
+    cache.put("search for cats", SCHEMA, decision("web_search", query="cats"))
+    cache.get("search for cats", SCHEMA)["parameters"]["query"] = "dogs"
+    assert cache.get("search for cats", SCHEMA) == decision("web_search", query="cats")
+
+
+def test_lru_evicts_least_recently_used():
+    cache = RouterDecisionCache(max_entries=2)
+    cache.put("open a", SCHEMA, decision("open", name="a"))
+    cache.put("open b", SCHEMA, decision("open", name="b"))
+    assert cache.get("open a", SCHEMA)  # a is now most recent
+    cache.put("open c", SCHEMA, decision("open", name="c"))
+    assert cache.get("open b", SCHEMA) is None
+    assert cache.get("open a", SCHEMA) and cache.get("open c", SCHEMA)
+
+
+def test_configure_shrinks_from_the_oldest_end():
+    cache = RouterDecisionCache(max_entries=3)
+    for name in "abc":
+        cache.put(f"open {name}", SCHEMA, decision("open", name=name))
+    cache.configure(max_entries=1, ttl_seconds=60)
+    assert len(cache.entries) == 1
+    assert cache.get("open c", SCHEMA)
+
+
+def test_ttl_expiry(clock):
+    cache = RouterDecisionCache(ttl_seconds=10)
+    cache.put("open a", SCHEMA, decision("open", name="a"))
+    clock[0] += 10
+    assert cache.get("open a", SCHEMA)
+    clock[0] += 0.5
+    assert cache.get("open a", SCHEMA) is None
+    assert not cache.entries  # Expired entry is dropped on lookup
+
+
+def test_hit_does_not_refresh_ttl(clock):
+    cache = RouterDecisionCache(ttl_seconds=10)
+    cache.put("open a", SCHEMA, decision("open", name="a"))
+    clock[0] += 8
+    assert cache.get("open a", SCHEMA)
+    clock[0] += 8
+    assert cache.get("open a", SCHEMA) is None
+
+
+@pytest.mark.parametrize("utterance, value", [
+    ("search for cats", None),                              # Null decision
+    ("search for cats", decision("web_search", query="dogs")),  # Parameter not in utterance
+    ("search for cats", decision("web_search", query="")),
+    ("search for cats", {"tool_name": "web_search", "parameters": ["cats"]}),
+])
+def test_uncacheable_decisions_are_not_stored(utterance, value):
+    cache = RouterDecisionCache()
+    assert cache.put(utterance, SCHEMA, value) is False
+    assert not cache.entries
+
+
+def test_rekey_drops_affected_tools_and_keeps_order_and_age(clock):
+    cache = RouterDecisionCache(ttl_seconds=10)
+    cache.put("open a", SCHEMA, decision("open", name="a"))
+    cache.put("search for cats", SCHEMA, decision("web_search", query="cats"))
+    cache.put("open b", "stale-schema", decision("open", name="b"))
+    clock[0] += 9
+
+    assert cache.rekey(SCHEMA, "schema-2", affected_tools={"web_search"}) == 2
+    assert [key for key in cache.entries] == [("open a", "schema-2")]
+    assert cache.get("open a", "schema-2")
+    clock[0] += 2
+    assert cache.get("open a", "schema-2") is None  # Original timestamp carried over
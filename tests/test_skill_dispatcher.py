@@ -0,0 +1,70 @@
+# tests/test_skill_dispatcher.py
+from skill_dispatcher import SkillDispatcher
+
+
+def command_map(**patterns):
+    return {name: {"regex": regex, "function": name} for name, regex in patterns.items()}
+
+
+def test_alphabetical_priority_across_overlapping_patterns():
+    dispatcher = SkillDispatcher(command_map(
+        b_weather=r"^what is the weather in (.+)",
+        a_generic=r"^what is (.+)",
+    ))
+    position, name, data, groups = dispatcher.match("what is the weather in paris")
+    assert (position, name, groups) == (0, "a_generic", ("the weather in paris",))
+    assert data["function"] == "a_generic"
+
+
+def test_lastindex_maps_to_the_skill_with_nested_groups():
+    # The earlier skills have nested and optional groups, so group numbers shift in the combined regex.
+    dispatcher = SkillDispatcher(command_map(
+        a_timer=r"^set (a )?timer for ((\d+) (minutes|seconds))",
+        b_open=r"^open (?:the )?(\w+)( app)?",
+        c_play=r"^play (.+) by (.+)",
+    ))
+    assert dispatcher.match("play yellow by coldplay") == (2, "c_play", dispatcher.entries[2][2], ("yellow", "coldplay"))
+    assert dispatcher.match("open the browser")[1:] == ("b_open", dispatcher.entries[1][2], ("browser", None))
+    assert dispatcher.match("set timer for 5 minutes")[3] == (None, "5 minutes", "5", "minutes")
+
+
+def test_combined_and_per_skill_matching_agree():
+    dispatcher = SkillDispatcher(command_map(
+        a_timer=r"^set (a )?timer for ((\d+) (minutes|seconds))",
+        b_open=r"^open (?:the )?(\w+)( app)?",
+        c_play=r"^play (.+) by (.+)",
+    ))
+    for command in ("set a timer for 10 seconds", "  open notes app", "play x by y", "nothing here"):
+        combined = dispatcher.match(command)
+        scanned = next(((i, name, data, m.groups()) for i, (name, compiled, data) in enumerate(dispatcher.entries)
+                        if (m := compiled.match(command))), None)
+        assert combined == scanned
+
+
+def test_start_resumes_after_a_rejected_match():
+    dispatcher = SkillDispatcher(command_map(a_generic=r"^open (.+)", b_app=r"^open (\w+) app"))
+    assert dispatcher.match("open mail app")[1] == "a_generic"
+    assert dispatcher.match("open mail app", start=1)[1:] == ("b_app", dispatcher.entries[1][2], ("mail",))
+    assert dispatcher.match("open mail app", start=2) is None
+
+
+def test_case_insensitive_and_leading_whitespace():
+    dispatcher = SkillDispatcher(command_map(a_stop=r"^stop"))
+    assert dispatcher.match("   STOP now")[1] == "a_stop"
+    assert dispatcher.match("please stop") is None
+
+
+def test_invalid_and_missing_patterns_are_skipped():
+    logs = []
+    commands = command_map(a_bad=r"^open (", c_ok=r"^close (\w+)")
+    commands["b_llm_only"] = {"function": "b_llm_only"}
+    dispatcher = SkillDispatcher(commands, lambda message, level="INFO": logs.append(level))
+    assert [entry[0] for entry in dispatcher.entries] == ["c_ok"]
+    assert logs == ["ERROR"]
+    assert dispatcher.match("close door")[1:] == ("c_ok", commands["c_ok"], ("door",))
+
+
+def test_empty_map():
+    dispatcher = SkillDispatcher({})
+    assert dispatcher.combined is None
+    assert dispatcher.match("anything") is None
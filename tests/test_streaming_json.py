@@ -0,0 +1,144 @@
+# tests/test_streaming_json.py
+from concurrent.futures import CancelledError
+
+import pytest
+
+from streaming_json import IncrementalJSONParser, extract_json_object
+
+
+def feed_in_chunks(text, size):
+    parser = IncrementalJSONParser()
+    done = False
+    for i in range(0, len(text), size):
+        done = parser.feed(text[i:i + size])
+        if done:
+            break
+    return parser, done
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_complete_object_any_chunking(size):
+    text = 'Sure! {"tool_name": "web_search", "parameters": {"query": "a \\"b\\" {c}"}} trailing'
+    parser, done = feed_in_chunks(text, size)
+    assert done
+    assert parser.result() == {"tool_name": "web_search", "parameters": {"query": 'a "b" {c}'}}
+
+
+def test_done_at_closing_brace_and_rest_ignored():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"a": 1}') is True
+    assert parser.feed('{"b": 2}') is True
+    assert parser.result() == {"a": 1}
+
+
+def test_scalar_fields_available_before_object_closes():
+    parser = IncrementalJSONParser()
+    parser.feed('{"tool_name": "get_weather", "confidence": 0.9, "ok": true, "parameters": {"city": "Par')
+    assert not parser.done
+    assert parser.fields == {"tool_name": "get_weather", "confidence": 0.9, "ok": True}
+
+
+def test_nested_values_are_not_top_level_fields():
+    parser = IncrementalJSONParser()
+    parser.feed('{"parameters": {"tool_name": "nested"}, "tool_name": null}')
+    assert parser.fields == {"tool_name": None}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"tool_name": "x", "parameters": {"q": "unfinished', {"tool_name": "x", "parameters": {"q": "unfinished"}}),
+    ('{"tool_name": "x",', {"tool_name": "x"}),
+    ('{"tool_name": "x", "param', {"tool_name": "x"}),
+    ('{"tool_name": "x", "parameters": [1, 2', {"tool_name": "x", "parameters": [1, 2]}),
+    ('{"tool_name": "x", "parameters":', {"tool_name": "x"}),
+])
+def test_truncated_object_is_repaired(text, expected):
+    parser = IncrementalJSONParser()
+    assert parser.feed(text) is False
+    assert parser.result() == expected
+
+
+def test_no_object():
+    parser = IncrementalJSONParser()
+    parser.feed("I don't know which tool to use.")
+    assert parser.result() is None
+
+
+def test_extract_json_object_is_not_greedy():
+    assert extract_json_object('x {"a": {"b": 1}} y {"c": 2} z') == {"a": {"b": 1}}
+
+
+@pytest.mark.parametrize("text, complete", [
+    ('{"tool_name": "web_search", "parameters": {"query": "weather in San', {"tool_name"}),
+    ('{"tool_name": "web_search", "parameters": {"query": "weather in Paris"}', {"tool_name", "parameters"}),
+    ('{"tool_name": "get_time", "count": 12', {"tool_name"}),  # 12 may be the start of 120
+    ('{"tool_name": "get_ti', set()),
+    ('{"tool_name": "x", "parameters": {"a": [1, {"b": 2}]}, "n": 3}', {"tool_name", "parameters", "n"}),
+])
+def test_complete_keys_only_lists_values_that_closed(text, complete):
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    assert parser.complete_keys == complete
+
+
+# --- get_tool_decision: how a truncated Router reply is used ---
+class ScriptedStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __enter__(self):
+        return iter(self.chunks)
+
+    def __exit__(self, *exc):
+        return False
+
+
+class ScriptedBackend:
+    def __init__(self, reply):
+        self.reply = reply
+
+    def chat_stream(self, messages, model_name, temperature, output_format=None, group="interactive"):
+        if isinstance(self.reply, BaseException):
+            raise self.reply
+        return ScriptedStream([self.reply[i:i + 5] for i in range(0, len(self.reply), 5)])
+
+
+class FakeApp:
+    config = {}
+
+    def __init__(self):
+        self.logs = []
+
+    def queue_log(self, message, level="INFO"):
+        self.logs.append((level, message))
+
+
+@pytest.fixture
+def decide(monkeypatch):
+    ai_logic = pytest.importorskip("ai_logic")
+
+    def run(reply):
+        monkeypatch.setattr(ai_logic, "get_backend", lambda app, engine=None: ScriptedBackend(reply))
+        return ai_logic.get_tool_decision(FakeApp(), [], "what's the weather in San Francisco", "router", [])
+    return run
+
+
+def test_tool_decision_complete_reply(decide):
+    assert decide('{"tool_name": "web_search", "parameters": {"query": "weather in San Francisco"}} trailing') == (
+        {"tool_name": "web_search", "parameters": {"query": "weather in San Francisco"}}, True)
+
+
+def test_tool_decision_cut_off_parameter_is_not_used(decide):
+    # Repairing would give query "weather in San", a prefix of the utterance that the cache would accept.
+    assert decide('{"tool_name": "web_search", "parameters": {"query": "weather in San') == (
+        {"tool_name": None, "parameters": {}}, False)
+    assert decide('{"tool_name": "web_se') == ({"tool_name": None, "parameters": {}}, False)
+
+
+def test_tool_decision_missing_only_the_closing_brace_is_used_but_not_complete(decide):
+    assert decide('{"tool_name": "web_search", "parameters": {"query": "weather in San Francisco"}') == (
+        {"tool_name": "web_search", "parameters": {"query": "weather in San Francisco"}}, False)
+
+
+@pytest.mark.parametrize("reply", ["I am not sure.", CancelledError(), ConnectionError("refused")])
+def test_tool_decision_failures_are_not_complete(decide, reply):
+    assert decide(reply) == ({"tool_name": None, "parameters": {}}, False)